@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import time
 import uuid
@@ -7,20 +8,42 @@ from typing import Optional
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from core.settings import AppSettings
-from repositories.db import init_db
+from core.metrics import REGISTRY, stage_timer
+from core.tracing import TimelineBuffer, begin_timeline, current_timeline, end_timeline
+from core.settings import AppSettings, ProviderEndpoint
+from repositories.async_db import configure_db_executor, shutdown_db_executor
+from repositories.db import close_db, configure_db, init_db
 from routers import (
     create_auth_router,
     create_chat_router,
+    create_debug_router,
+    create_health_router,
     create_ingest_router,
+    create_metrics_router,
+    create_ops_router,
     create_session_router,
+    create_usage_router,
 )
+from services.admission_controller import AdmissionController, AdmissionRejected
 from services.auth_service import AuthService
+from services.fair_scheduler import ANONYMOUS_CLASS, USER_CLASS, FairScheduler, FlowClass
+from services.history_retention import HistoryRetentionJob
 from services.ingest_job_service import IngestJobService
+from services.login_throttle import LoginThrottle
+from services.message_writer import MessageWriteBehind
+from services.password_hasher import PasswordHasher
+from services.provider_gateway import ProviderGateway
+from services.provider_scheduler import ProviderCallScheduler
 from services.rag_service import RagService
+from services.request_profiler import PROFILE_TOKEN_HEADER, RequestProfiler, code_label
 from services.session_service import SessionService
+from services.startup_warmup import StartupWarmup
+from services.usage_accounting import TokenPricing, configure_pricing
+from services.usage_service import UsageService
+from services.user_cache import UserIdentityCache
 
 load_dotenv()
 
@@ -28,6 +51,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 CHROMA_DIR = BASE_DIR / "chroma_db"
 settings = AppSettings.from_env()
+ARCHIVE_DIR = Path(settings.history_archive_dir) if settings.history_archive_dir else BASE_DIR / "history_archive"
+PROFILE_DIR = Path(settings.profile_artifact_dir) if settings.profile_artifact_dir else BASE_DIR / "profiles"
 
 bearer_scheme = HTTPBearer(auto_error=False)
 logger = logging.getLogger("rag_api")
@@ -41,28 +66,180 @@ auth_service = AuthService(
     jwt_secret=settings.jwt_secret,
     jwt_algorithm=settings.jwt_algorithm,
     access_token_expire_minutes=settings.access_token_expire_minutes,
+    password_hasher=PasswordHasher(
+        workers=settings.password_hash_workers,
+        max_pending=settings.password_hash_max_pending,
+        niceness=settings.password_hash_niceness,
+        logger=logger,
+    ),
+    login_throttle=LoginThrottle(
+        max_failures=settings.login_max_failures,
+        window_seconds=settings.login_failure_window_seconds,
+        username_backoff_after=settings.login_username_backoff_after,
+        max_backoff_seconds=settings.login_max_backoff_seconds,
+    ),
+    user_cache=UserIdentityCache(
+        ttl_seconds=settings.auth_user_cache_ttl_seconds,
+        max_entries=settings.auth_user_cache_max_entries,
+    ),
 )
-session_service = SessionService()
-rag_service = RagService(
-    data_dir=DATA_DIR,
-    chroma_dir=CHROMA_DIR,
-    api_key=settings.api_key,
-    base_url=settings.base_url,
-    model=settings.model,
-    embedding_model=settings.embedding_model,
+message_writer = MessageWriteBehind(
+    logger=logger,
+    enabled=settings.message_write_behind_enabled,
+    batch_size=settings.message_write_batch_size,
+    flush_interval_ms=settings.message_write_flush_ms,
+    max_queue=settings.message_write_queue_size,
+    memory_limit=SessionService.MEMORY_TURN_LIMIT,
+    dead_letter_path=(
+        Path(settings.message_write_dead_letter_file)
+        if settings.message_write_dead_letter_file
+        else BASE_DIR / "message_dead_letter.jsonl"
+    ),
+)
+session_service = SessionService(message_writer=message_writer, archive_dir=ARCHIVE_DIR)
+history_retention = HistoryRetentionJob(
+    logger=logger,
+    archive_dir=ARCHIVE_DIR,
+    retention_days=settings.history_retention_days,
+    interval_seconds=settings.history_retention_interval_minutes * 60,
+    batch_size=settings.history_retention_batch_size,
+)
+request_profiler = RequestProfiler(
+    artifact_dir=PROFILE_DIR,
+    admin_token=settings.profile_admin_token,
+    sample_rate=settings.profile_sample_rate,
+    interval_ms=settings.profile_interval_ms,
+    max_artifacts=settings.profile_max_artifacts,
+    trace_memory=settings.profile_trace_memory,
+    logger=logger,
+)
+provider_gateway = ProviderGateway(
+    endpoints=[
+        ProviderEndpoint(
+            name=settings.provider,
+            api_key=settings.api_key,
+            base_url=settings.base_url,
+            model=settings.model,
+            embedding_model=settings.embedding_model,
+        ),
+        *settings.hedge_providers,
+    ],
     ai_timeout_seconds=settings.ai_timeout_seconds,
     ai_max_retries=settings.ai_max_retries,
-    chroma_anonymized_telemetry=settings.chroma_anonymized_telemetry,
     app_name=settings.app_name,
     app_url=settings.app_url,
+    hedge_enabled=settings.hedge_enabled,
+    hedge_embeddings=settings.hedge_embeddings,
+    hedge_percentile=settings.hedge_percentile,
+    hedge_min_delay_ms=settings.hedge_min_delay_ms,
+    hedge_initial_delay_ms=settings.hedge_initial_delay_ms,
+    breaker_failure_threshold=settings.breaker_failure_threshold,
+    breaker_reset_seconds=settings.breaker_reset_seconds,
+    scheduler=ProviderCallScheduler(
+        rpm_limit=settings.provider_rpm_limit,
+        tpm_limit=settings.provider_tpm_limit,
+        background_reserve=settings.provider_background_reserve,
+        background_concurrency=settings.provider_background_concurrency,
+        interactive_timeout_seconds=settings.ai_timeout_seconds,
+    ),
+    embedding_batch_size=settings.provider_embedding_batch_size,
+)
+rag_service = RagService(
+    data_dir=DATA_DIR,
+    chroma_dir=CHROMA_DIR,
+    provider_gateway=provider_gateway,
+    chroma_anonymized_telemetry=settings.chroma_anonymized_telemetry,
     rerank_enabled=settings.rerank_enabled,
     rerank_fetch_k=settings.rerank_fetch_k,
+    chunk_size=settings.chunk_size,
+    chunk_overlap=settings.chunk_overlap,
+)
+configure_pricing(
+    TokenPricing(
+        prompt_per_1m=settings.token_price_prompt_per_1m,
+        completion_per_1m=settings.token_price_completion_per_1m,
+        embedding_per_1m=settings.token_price_embedding_per_1m,
+    )
+)
+usage_service = UsageService(logger=logger)
+ingest_job_service = IngestJobService(rag_service=rag_service, logger=logger, usage_service=usage_service)
+admission_controller = AdmissionController(
+    enabled=settings.admission_enabled,
+    initial_limit=settings.admission_initial_limit,
+    max_limit=settings.admission_max_limit,
+    queue_depth=settings.admission_queue_depth,
+    queue_timeout_seconds=settings.admission_queue_timeout_seconds,
+    latency_tolerance=settings.admission_latency_tolerance,
+)
+
+chat_scheduler = FairScheduler(
+    enabled=settings.fair_scheduler_enabled,
+    capacity=settings.fair_capacity,
+    classes={
+        USER_CLASS: FlowClass(
+            name=USER_CLASS,
+            weight=max(settings.fair_user_weight, 1),
+            concurrency=max(settings.fair_user_concurrency, 1),
+            rate_per_second=max(settings.fair_user_rate_per_minute, 0.01) / 60.0,
+            burst=max(settings.fair_user_burst, 1),
+        ),
+        ANONYMOUS_CLASS: FlowClass(
+            name=ANONYMOUS_CLASS,
+            weight=max(settings.fair_anonymous_weight, 1),
+            concurrency=max(settings.fair_anonymous_concurrency, 1),
+            rate_per_second=max(settings.fair_anonymous_rate_per_minute, 0.01) / 60.0,
+            burst=max(settings.fair_anonymous_burst, 1),
+        ),
+    },
+    queue_depth_per_flow=settings.fair_queue_depth_per_user,
+    queue_timeout_seconds=settings.fair_queue_timeout_seconds,
 )
-ingest_job_service = IngestJobService(rag_service=rag_service, logger=logger)
 
+startup_warmup = StartupWarmup(
+    logger=logger,
+    enabled=settings.startup_warmup_enabled,
+    steps=[
+        ("imports", rag_service.import_dependencies),
+        ("provider_clients", lambda: provider_gateway.warm_up(ping=settings.startup_warmup_ping)),
+        ("vectorstore", rag_service.warm_vectorstore),
+        ("agent", rag_service.warm_agent),
+    ],
+    # Heavy imports are deferred, so this is mostly interpreter start, FastAPI and module setup.
+    import_cpu_ms=round(time.process_time() * 1000, 2),
+)
 
 app = FastAPI(title="RAG API")
 
+
+# Registered before CORS/tracing so shed responses still get CORS headers and request IDs.
+@app.middleware("http")
+async def admission_middleware(request: Request, call_next):
+    limiter = admission_controller.limiter_for(request.method, request.url.path)
+    if limiter is None:
+        return await call_next(request)
+    try:
+        started = await limiter.acquire()
+    except AdmissionRejected as exc:
+        logger.warning(
+            "request_shed limiter=%s reason=%s retry_after=%s",
+            limiter.name,
+            exc.reason,
+            exc.retry_after_seconds,
+        )
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "Server is busy. Retry later."},
+            headers={"Retry-After": str(exc.retry_after_seconds)},
+        )
+    ok = False
+    try:
+        response = await call_next(request)
+        ok = response.status_code < 500
+        return response
+    finally:
+        limiter.release(started, ok=ok)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -72,21 +249,75 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "X-Trace-ID", "Server-Timing"],
+)
+
+
+timeline_buffer = TimelineBuffer(capacity=settings.request_timeline_capacity)
+timelines_enabled = settings.server_timing_enabled or timeline_buffer.capacity > 0
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "End-to-end request latency as seen by the trace middleware.",
+    ("method", "route", "status"),
 )
 
 
+def route_label(request: Request) -> str:
+    # Label by route template, not raw path, so ids in URLs don't explode series cardinality.
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+@app.middleware("http")
+async def profiling_middleware(request: Request, call_next):
+    # Registered inside the trace middleware, so the request id and timeline already exist.
+    session = None
+    if request_profiler.enabled and request_profiler.should_profile(
+        request.url.path, request.headers.get(PROFILE_TOKEN_HEADER)
+    ):
+        session = request_profiler.begin(request.state.trace_id)
+    if session is None:
+        return await call_next(request)
+    timeline = current_timeline()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        response.headers["X-Profile-Id"] = session.request_id
+        return response
+    finally:
+        endpoint_code = getattr(getattr(request.scope.get("route"), "endpoint", None), "__code__", None)
+        await asyncio.to_thread(
+            request_profiler.finish,
+            session,
+            timeline.thread_ids() if timeline is not None else set(),
+            code_label(endpoint_code) if endpoint_code is not None else None,
+            {"method": request.method, "path": request.url.path, "status_code": status_code},
+        )
+
+
 @app.middleware("http")
 async def request_trace_middleware(request: Request, call_next):
     request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
-    request.state.request_id = request_id
+    # Debug timelines and profiles are keyed by an id the client cannot choose.
+    trace_id = uuid.uuid4().hex
+    request.state.request_id, request.state.trace_id = request_id, trace_id
     started = time.perf_counter()
+    timeline, token = (
+        begin_timeline(trace_id, request.method, request.url.path, request_id) if timelines_enabled else (None, None)
+    )
     try:
         response = await call_next(request)
     except Exception:
         elapsed_ms = (time.perf_counter() - started) * 1000
+        if timeline is not None:
+            timeline.finish(500)
+            timeline_buffer.add(timeline)
+            end_timeline(token)
         logger.exception(
-            "request_failed request_id=%s method=%s path=%s duration_ms=%.2f",
+            "request_failed request_id=%s trace_id=%s method=%s path=%s duration_ms=%.2f",
             request_id,
+            trace_id,
             request.method,
             request.url.path,
             elapsed_ms,
@@ -95,9 +326,20 @@ async def request_trace_middleware(request: Request, call_next):
 
     elapsed_ms = (time.perf_counter() - started) * 1000
     response.headers["X-Request-ID"] = request_id
+    response.headers["X-Trace-ID"] = trace_id
+    if timeline is not None:
+        timeline.finish(response.status_code)
+        timeline_buffer.add(timeline)
+        end_timeline(token)
+        if settings.server_timing_enabled:
+            response.headers["Server-Timing"] = timeline.server_timing()
+    route = route_label(request)
+    HTTP_REQUEST_SECONDS.observe(elapsed_ms / 1000, method=request.method, route=route, status=response.status_code)
+    startup_warmup.observe_request(f"{request.method} {route}", elapsed_ms)
     logger.info(
-        "request_completed request_id=%s method=%s path=%s status_code=%s duration_ms=%.2f",
+        "request_completed request_id=%s trace_id=%s method=%s path=%s status_code=%s duration_ms=%.2f",
         request_id,
+        trace_id,
         request.method,
         request.url.path,
         response.status_code,
@@ -106,13 +348,14 @@ async def request_trace_middleware(request: Request, call_next):
     return response
 
 
-def get_current_user_optional(
+async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
 ):
-    return auth_service.get_current_user_optional(credentials)
+    with stage_timer("auth", "auth"):
+        return await auth_service.aget_current_user_optional(credentials)
 
 
-def get_current_user(
+async def get_current_user(
     user=Depends(get_current_user_optional),
 ):
     return auth_service.require_user(user)
@@ -120,9 +363,36 @@ def get_current_user(
 
 @app.on_event("startup")
 def on_startup():
+    configure_db(
+        size=settings.db_pool_size,
+        cache_size_kib=settings.db_cache_size_kib,
+        mmap_size_bytes=settings.db_mmap_size_mb * 1024 * 1024,
+        synchronous=settings.db_synchronous,
+        cached_statements=settings.db_statement_cache_size,
+    )
+    # One executor thread per pooled connection keeps each thread on its own connection.
+    configure_db_executor(settings.db_pool_size)
     init_db()
+    message_writer.start()
+    usage_service.start()
+    history_retention.start()
+    auth_service.password_hasher.warm_up()
+    startup_warmup.start()
 
 
+@app.on_event("shutdown")
+def on_shutdown():
+    provider_gateway.shutdown()
+    auth_service.password_hasher.shutdown()
+    history_retention.stop()
+    # Drain queued chat turns before the DB executor and pool go away.
+    message_writer.stop()
+    usage_service.stop()
+    shutdown_db_executor()
+    close_db()
+
+
+app.include_router(create_health_router(startup_warmup=startup_warmup))
 app.include_router(create_auth_router(auth_service=auth_service, get_current_user=get_current_user))
 app.include_router(
     create_session_router(
@@ -134,6 +404,7 @@ app.include_router(
     create_ingest_router(
         rag_service=rag_service,
         ingest_job_service=ingest_job_service,
+        usage_service=usage_service,
     )
 )
 app.include_router(
@@ -141,5 +412,22 @@ app.include_router(
         rag_service=rag_service,
         session_service=session_service,
         get_current_user_optional=get_current_user_optional,
+        chat_scheduler=chat_scheduler,
+        usage_service=usage_service,
+    )
+)
+app.include_router(
+    create_ops_router(
+        provider_gateway=provider_gateway,
+        admission_controller=admission_controller,
+        chat_scheduler=chat_scheduler,
+        message_writer=message_writer,
+        history_retention=history_retention,
+        auth_service=auth_service,
+        usage_service=usage_service,
+        admin_token=settings.ops_admin_token,
     )
 )
+app.include_router(create_usage_router(usage_service=usage_service, get_current_user=get_current_user))
+app.include_router(create_metrics_router())
+app.include_router(create_debug_router(timeline_buffer=timeline_buffer, request_profiler=request_profiler))
@@ -0,0 +1,28 @@
+import os
+
+
+def env(name: str) -> str:
+    return os.getenv(name, "").strip()
+
+
+def first_non_empty(*values: str, default: str) -> str:
+    for value in values:
+        if value:
+            return value
+    return default
+
+
+def is_truthy(value: str) -> bool:
+    return value.lower() in {"1", "true", "yes", "on"}
+
+
+def env_bool(name: str, default: bool) -> bool:
+    return is_truthy(first_non_empty(env(name), default="true" if default else "false"))
+
+
+def env_int(name: str, default: int) -> int:
+    return int(first_non_empty(env(name), default=str(default)))
+
+
+def env_float(name: str, default: float) -> float:
+    return float(first_non_empty(env(name), default=str(default)))
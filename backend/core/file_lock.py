@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+from pathlib import Path
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLockTimeout(TimeoutError):
+    pass
+
+
+# One thread lock per lock file, shared by every InterProcessLock on that path in
+# this process. Entries are refcounted by holders and waiters and dropped at zero.
+_thread_locks: dict[str, list] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _checkout_thread_lock(key: str) -> threading.Lock:
+    with _thread_locks_guard:
+        entry = _thread_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+        return entry[0]
+
+
+def _checkin_thread_lock(key: str):
+    with _thread_locks_guard:
+        entry = _thread_locks[key]
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _thread_locks[key]
+
+
+class InterProcessLock:
+    """Exclusive lock shared by every process on the host that opens the same file.
+
+    Uses `flock` on POSIX and `msvcrt.locking` on Windows; the OS drops the
+    lock if the holder dies, so a crashed worker cannot wedge the others. A
+    process-wide thread lock for the same path is taken first, because `flock`
+    locks are per open file, not per thread; it also lets threads of one
+    process wait without polling. Not reentrant.
+    """
+
+    def __init__(self, path: Path, poll_interval_seconds: float = 0.05):
+        self.path = Path(path)
+        self.poll_interval_seconds = poll_interval_seconds
+        self._key = str(self.path.resolve())
+        self._thread_lock: threading.Lock | None = None
+        self._handle = None
+
+    def _try_lock(self, handle) -> bool:
+        try:
+            if os.name == "nt":
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self, timeout: float | None = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        thread_lock = _checkout_thread_lock(self._key)
+        if not thread_lock.acquire(timeout=-1 if timeout is None else timeout):
+            _checkin_thread_lock(self._key)
+            raise FileLockTimeout(f"Timed out waiting for {self.path}")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(self.path, "a+b")
+            while not self._try_lock(handle):
+                if deadline is not None and time.monotonic() >= deadline:
+                    handle.close()
+                    raise FileLockTimeout(f"Timed out waiting for {self.path}")
+                time.sleep(self.poll_interval_seconds)
+        except BaseException:
+            thread_lock.release()
+            _checkin_thread_lock(self._key)
+            raise
+        self._handle, self._thread_lock = handle, thread_lock
+
+    def release(self):
+        handle, self._handle = self._handle, None
+        thread_lock, self._thread_lock = self._thread_lock, None
+        try:
+            if os.name == "nt":
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        finally:
+            handle.close()
+            thread_lock.release()
+            _checkin_thread_lock(self._key)
+
+    def __enter__(self) -> "InterProcessLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
@@ -0,0 +1,113 @@
+from dataclasses import dataclass
+
+from core.env import env, first_non_empty
+
+
+@dataclass(frozen=True)
+class ProviderPreset:
+    name: str
+    api_key_env: str
+    base_url_env: str
+    model_env: str
+    embedding_env: str
+    default_base_url: str
+    default_model: str
+    default_embedding_model: str
+
+
+PROVIDER_PRESETS = {
+    "dashscope": ProviderPreset(
+        name="dashscope",
+        api_key_env="DASHSCOPE_API_KEY",
+        base_url_env="DASHSCOPE_BASE_URL",
+        model_env="DASHSCOPE_MODEL",
+        embedding_env="DASHSCOPE_EMBEDDING_MODEL",
+        default_base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
+        default_model="qwen-plus",
+        default_embedding_model="text-embedding-v4",
+    ),
+    "gemini": ProviderPreset(
+        name="gemini",
+        api_key_env="GEMINI_API_KEY",
+        base_url_env="GEMINI_BASE_URL",
+        model_env="GEMINI_MODEL",
+        embedding_env="GEMINI_EMBEDDING_MODEL",
+        default_base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
+        default_model="gemini-2.5-flash",
+        default_embedding_model="gemini-embedding-001",
+    ),
+    "openrouter": ProviderPreset(
+        name="openrouter",
+        api_key_env="OPENROUTER_API_KEY",
+        base_url_env="OPENROUTER_BASE_URL",
+        model_env="OPENROUTER_MODEL",
+        embedding_env="OPENROUTER_EMBEDDING_MODEL",
+        default_base_url="https://openrouter.ai/api/v1",
+        default_model="openai/gpt-4o-mini",
+        default_embedding_model="openai/text-embedding-3-small",
+    ),
+}
+DEFAULT_PROVIDER = "dashscope"
+
+
+@dataclass(frozen=True)
+class ProviderEndpoint:
+    name: str
+    api_key: str
+    base_url: str
+    model: str
+    embedding_model: str
+
+
+def resolve_provider() -> str:
+    explicit_provider = env("AI_PROVIDER") or env("LLM_PROVIDER")
+    if explicit_provider:
+        normalized = explicit_provider.lower()
+        if normalized not in PROVIDER_PRESETS:
+            supported = ", ".join(sorted(PROVIDER_PRESETS))
+            raise ValueError(f"Unsupported AI_PROVIDER '{explicit_provider}'. Supported values: {supported}")
+        return normalized
+
+    for provider_name in ("dashscope", "gemini", "openrouter"):
+        preset = PROVIDER_PRESETS[provider_name]
+        if any(
+            env(name)
+            for name in (
+                preset.api_key_env,
+                preset.base_url_env,
+                preset.model_env,
+                preset.embedding_env,
+            )
+        ):
+            return provider_name
+
+    return DEFAULT_PROVIDER
+
+
+def resolve_hedge_providers(primary: str) -> tuple[ProviderEndpoint, ...]:
+    endpoints = []
+    for raw_name in env("AI_HEDGE_PROVIDERS").split(","):
+        name = raw_name.strip().lower()
+        if not name or name == primary:
+            continue
+        if name not in PROVIDER_PRESETS:
+            supported = ", ".join(sorted(PROVIDER_PRESETS))
+            raise ValueError(f"Unsupported AI_HEDGE_PROVIDERS entry '{raw_name}'. Supported values: {supported}")
+        preset = PROVIDER_PRESETS[name]
+        api_key = env(preset.api_key_env)
+        if not api_key:
+            # Secondary providers without credentials are skipped rather than failing startup.
+            continue
+        endpoints.append(
+            ProviderEndpoint(
+                name=name,
+                api_key=api_key,
+                base_url=first_non_empty(env(preset.base_url_env), default=preset.default_base_url),
+                model=first_non_empty(env(preset.model_env), default=preset.default_model),
+                embedding_model=first_non_empty(
+                    env(preset.embedding_env),
+                    default=preset.default_embedding_model,
+                ),
+            )
+        )
+    return tuple(endpoints)
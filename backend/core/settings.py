@@ -1,92 +1,7 @@
-import os
 from dataclasses import dataclass
 
-
-@dataclass(frozen=True)
-class ProviderPreset:
-    name: str
-    api_key_env: str
-    base_url_env: str
-    model_env: str
-    embedding_env: str
-    default_base_url: str
-    default_model: str
-    default_embedding_model: str
-
-
-PROVIDER_PRESETS = {
-    "dashscope": ProviderPreset(
-        name="dashscope",
-        api_key_env="DASHSCOPE_API_KEY",
-        base_url_env="DASHSCOPE_BASE_URL",
-        model_env="DASHSCOPE_MODEL",
-        embedding_env="DASHSCOPE_EMBEDDING_MODEL",
-        default_base_url="https://dashscope.aliyuncs.com/compatible-mode/v1",
-        default_model="qwen-plus",
-        default_embedding_model="text-embedding-v4",
-    ),
-    "gemini": ProviderPreset(
-        name="gemini",
-        api_key_env="GEMINI_API_KEY",
-        base_url_env="GEMINI_BASE_URL",
-        model_env="GEMINI_MODEL",
-        embedding_env="GEMINI_EMBEDDING_MODEL",
-        default_base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
-        default_model="gemini-2.5-flash",
-        default_embedding_model="gemini-embedding-001",
-    ),
-    "openrouter": ProviderPreset(
-        name="openrouter",
-        api_key_env="OPENROUTER_API_KEY",
-        base_url_env="OPENROUTER_BASE_URL",
-        model_env="OPENROUTER_MODEL",
-        embedding_env="OPENROUTER_EMBEDDING_MODEL",
-        default_base_url="https://openrouter.ai/api/v1",
-        default_model="openai/gpt-4o-mini",
-        default_embedding_model="openai/text-embedding-3-small",
-    ),
-}
-DEFAULT_PROVIDER = "dashscope"
-
-
-def _env(name: str) -> str:
-    return os.getenv(name, "").strip()
-
-
-def _first_non_empty(*values: str, default: str) -> str:
-    for value in values:
-        if value:
-            return value
-    return default
-
-
-def _is_truthy(value: str) -> bool:
-    return value.lower() in {"1", "true", "yes", "on"}
-
-
-def _resolve_provider() -> str:
-    explicit_provider = _env("AI_PROVIDER") or _env("LLM_PROVIDER")
-    if explicit_provider:
-        normalized = explicit_provider.lower()
-        if normalized not in PROVIDER_PRESETS:
-            supported = ", ".join(sorted(PROVIDER_PRESETS))
-            raise ValueError(f"Unsupported AI_PROVIDER '{explicit_provider}'. Supported values: {supported}")
-        return normalized
-
-    for provider_name in ("dashscope", "gemini", "openrouter"):
-        preset = PROVIDER_PRESETS[provider_name]
-        if any(
-            _env(name)
-            for name in (
-                preset.api_key_env,
-                preset.base_url_env,
-                preset.model_env,
-                preset.embedding_env,
-            )
-        ):
-            return provider_name
-
-    return DEFAULT_PROVIDER
+from core.env import env, env_bool, env_float, env_int, first_non_empty, is_truthy
+from core.providers import PROVIDER_PRESETS, ProviderEndpoint, resolve_hedge_providers, resolve_provider
 
 
 @dataclass(frozen=True)
@@ -103,6 +18,76 @@ class AppSettings:
     app_url: str | None
     rerank_enabled: bool
     rerank_fetch_k: int
+    chunk_size: int
+    chunk_overlap: int
+    hedge_providers: tuple[ProviderEndpoint, ...]
+    hedge_enabled: bool
+    hedge_embeddings: bool
+    hedge_percentile: float
+    hedge_min_delay_ms: float
+    hedge_initial_delay_ms: float
+    breaker_failure_threshold: int
+    breaker_reset_seconds: float
+    provider_rpm_limit: int
+    provider_tpm_limit: int
+    provider_background_reserve: float
+    provider_background_concurrency: int
+    provider_embedding_batch_size: int
+    admission_enabled: bool
+    admission_initial_limit: int
+    admission_max_limit: int
+    admission_queue_depth: int
+    admission_queue_timeout_seconds: float
+    admission_latency_tolerance: float
+    fair_scheduler_enabled: bool
+    fair_capacity: int
+    fair_queue_depth_per_user: int
+    fair_queue_timeout_seconds: float
+    fair_user_weight: int
+    fair_user_concurrency: int
+    fair_user_rate_per_minute: float
+    fair_user_burst: int
+    fair_anonymous_weight: int
+    fair_anonymous_concurrency: int
+    fair_anonymous_rate_per_minute: float
+    fair_anonymous_burst: int
+    db_pool_size: int
+    db_cache_size_kib: int
+    db_mmap_size_mb: int
+    db_synchronous: str
+    db_statement_cache_size: int
+    message_write_behind_enabled: bool
+    message_write_batch_size: int
+    message_write_flush_ms: float
+    message_write_queue_size: int
+    message_write_dead_letter_file: str | None
+    history_retention_days: int
+    history_archive_dir: str | None
+    history_retention_interval_minutes: float
+    history_retention_batch_size: int
+    password_hash_workers: int
+    password_hash_max_pending: int
+    password_hash_niceness: int
+    login_max_failures: int
+    login_failure_window_seconds: float
+    login_username_backoff_after: int
+    login_max_backoff_seconds: float
+    auth_user_cache_ttl_seconds: float
+    auth_user_cache_max_entries: int
+    server_timing_enabled: bool
+    request_timeline_capacity: int
+    ops_admin_token: str
+    profile_admin_token: str
+    profile_sample_rate: float
+    profile_interval_ms: float
+    profile_artifact_dir: str | None
+    profile_max_artifacts: int
+    profile_trace_memory: bool
+    startup_warmup_enabled: bool
+    startup_warmup_ping: bool
+    token_price_prompt_per_1m: float
+    token_price_completion_per_1m: float
+    token_price_embedding_per_1m: float
     jwt_secret: str
     jwt_algorithm: str
     access_token_expire_minutes: int
@@ -110,78 +95,148 @@ class AppSettings:
 
     @classmethod
     def from_env(cls) -> "AppSettings":
-        provider = _resolve_provider()
+        provider = resolve_provider()
         preset = PROVIDER_PRESETS[provider]
 
-        rerank_enabled = _is_truthy(
-            _first_non_empty(
-                _env("RAG_RERANK_ENABLED"),
-                _env("OPENROUTER_RERANK_ENABLED"),
+        rerank_enabled = is_truthy(
+            first_non_empty(
+                env("RAG_RERANK_ENABLED"),
+                env("OPENROUTER_RERANK_ENABLED"),
                 default="false",
             )
         )
         rerank_fetch_k = int(
-            _first_non_empty(
-                _env("RAG_RERANK_FETCH_K"),
-                _env("OPENROUTER_RERANK_FETCH_K"),
+            first_non_empty(
+                env("RAG_RERANK_FETCH_K"),
+                env("OPENROUTER_RERANK_FETCH_K"),
                 default="8",
             )
         )
 
         return cls(
             provider=provider,
-            api_key=_first_non_empty(_env("AI_API_KEY"), _env(preset.api_key_env), default=""),
-            base_url=_first_non_empty(
-                _env("AI_BASE_URL"),
-                _env(preset.base_url_env),
+            api_key=first_non_empty(env("AI_API_KEY"), env(preset.api_key_env), default=""),
+            base_url=first_non_empty(
+                env("AI_BASE_URL"),
+                env(preset.base_url_env),
                 default=preset.default_base_url,
             ),
-            model=_first_non_empty(
-                _env("AI_MODEL"),
-                _env(preset.model_env),
+            model=first_non_empty(
+                env("AI_MODEL"),
+                env(preset.model_env),
                 default=preset.default_model,
             ),
-            embedding_model=_first_non_empty(
-                _env("AI_EMBEDDING_MODEL"),
-                _env(preset.embedding_env),
+            embedding_model=first_non_empty(
+                env("AI_EMBEDDING_MODEL"),
+                env(preset.embedding_env),
                 default=preset.default_embedding_model,
             ),
             ai_timeout_seconds=float(
-                _first_non_empty(
-                    _env("AI_TIMEOUT_SECONDS"),
+                first_non_empty(
+                    env("AI_TIMEOUT_SECONDS"),
                     default="20",
                 )
             ),
             ai_max_retries=int(
-                _first_non_empty(
-                    _env("AI_MAX_RETRIES"),
+                first_non_empty(
+                    env("AI_MAX_RETRIES"),
                     default="1",
                 )
             ),
-            chroma_anonymized_telemetry=_is_truthy(
-                _first_non_empty(
-                    _env("CHROMA_ANONYMIZED_TELEMETRY"),
+            chroma_anonymized_telemetry=is_truthy(
+                first_non_empty(
+                    env("CHROMA_ANONYMIZED_TELEMETRY"),
                     default="false",
                 )
             ),
-            app_name=_first_non_empty(
-                _env("AI_APP_NAME"),
-                _env("OPENROUTER_APP_NAME"),
+            app_name=first_non_empty(
+                env("AI_APP_NAME"),
+                env("OPENROUTER_APP_NAME"),
                 default="",
             )
             or None,
-            app_url=_first_non_empty(
-                _env("AI_APP_URL"),
-                _env("OPENROUTER_APP_URL"),
+            app_url=first_non_empty(
+                env("AI_APP_URL"),
+                env("OPENROUTER_APP_URL"),
                 default="",
             )
             or None,
             rerank_enabled=rerank_enabled,
             rerank_fetch_k=rerank_fetch_k,
-            jwt_secret=_first_non_empty(_env("JWT_SECRET"), default="change-me-in-production"),
+            chunk_size=env_int("RAG_CHUNK_SIZE", 1000),
+            chunk_overlap=env_int("RAG_CHUNK_OVERLAP", 150),
+            hedge_providers=resolve_hedge_providers(provider),
+            hedge_enabled=env_bool("AI_HEDGE_ENABLED", False),
+            hedge_embeddings=env_bool("AI_HEDGE_EMBEDDINGS", False),
+            hedge_percentile=env_float("AI_HEDGE_PERCENTILE", 95),
+            hedge_min_delay_ms=env_float("AI_HEDGE_MIN_DELAY_MS", 250),
+            hedge_initial_delay_ms=env_float("AI_HEDGE_INITIAL_DELAY_MS", 2000),
+            breaker_failure_threshold=env_int("AI_BREAKER_FAILURE_THRESHOLD", 5),
+            breaker_reset_seconds=env_float("AI_BREAKER_RESET_SECONDS", 30),
+            provider_rpm_limit=env_int("AI_PROVIDER_RPM_LIMIT", 0),
+            provider_tpm_limit=env_int("AI_PROVIDER_TPM_LIMIT", 0),
+            provider_background_reserve=env_float("AI_PROVIDER_BACKGROUND_RESERVE", 0.3),
+            provider_background_concurrency=env_int("AI_PROVIDER_BACKGROUND_CONCURRENCY", 2),
+            provider_embedding_batch_size=env_int("AI_EMBEDDING_BATCH_SIZE", 64),
+            admission_enabled=env_bool("ADMISSION_ENABLED", True),
+            admission_initial_limit=env_int("ADMISSION_INITIAL_LIMIT", 8),
+            admission_max_limit=env_int("ADMISSION_MAX_LIMIT", 64),
+            admission_queue_depth=env_int("ADMISSION_QUEUE_DEPTH", 32),
+            admission_queue_timeout_seconds=env_float("ADMISSION_QUEUE_TIMEOUT_SECONDS", 5),
+            admission_latency_tolerance=env_float("ADMISSION_LATENCY_TOLERANCE", 1.5),
+            fair_scheduler_enabled=env_bool("FAIR_SCHEDULER_ENABLED", True),
+            fair_capacity=env_int("FAIR_CAPACITY", 16),
+            fair_queue_depth_per_user=env_int("FAIR_QUEUE_DEPTH_PER_USER", 8),
+            fair_queue_timeout_seconds=env_float("FAIR_QUEUE_TIMEOUT_SECONDS", 10),
+            fair_user_weight=env_int("FAIR_USER_WEIGHT", 1),
+            fair_user_concurrency=env_int("FAIR_USER_CONCURRENCY", 2),
+            fair_user_rate_per_minute=env_float("FAIR_USER_RATE_PER_MINUTE", 30),
+            fair_user_burst=env_int("FAIR_USER_BURST", 5),
+            fair_anonymous_weight=env_int("FAIR_ANONYMOUS_WEIGHT", 1),
+            fair_anonymous_concurrency=env_int("FAIR_ANONYMOUS_CONCURRENCY", 4),
+            fair_anonymous_rate_per_minute=env_float("FAIR_ANONYMOUS_RATE_PER_MINUTE", 60),
+            fair_anonymous_burst=env_int("FAIR_ANONYMOUS_BURST", 10),
+            db_pool_size=env_int("DB_POOL_SIZE", 8),
+            db_cache_size_kib=env_int("DB_CACHE_SIZE_KIB", 16384),
+            db_mmap_size_mb=env_int("DB_MMAP_SIZE_MB", 256),
+            db_synchronous=first_non_empty(env("DB_SYNCHRONOUS"), default="NORMAL").upper(),
+            db_statement_cache_size=env_int("DB_STATEMENT_CACHE_SIZE", 256),
+            message_write_behind_enabled=env_bool("MESSAGE_WRITE_BEHIND_ENABLED", False),
+            message_write_batch_size=env_int("MESSAGE_WRITE_BATCH_SIZE", 64),
+            message_write_flush_ms=env_float("MESSAGE_WRITE_FLUSH_MS", 50),
+            message_write_queue_size=env_int("MESSAGE_WRITE_QUEUE_SIZE", 10000),
+            message_write_dead_letter_file=env("MESSAGE_WRITE_DEAD_LETTER_FILE"),
+            history_retention_days=env_int("HISTORY_RETENTION_DAYS", 0),
+            history_archive_dir=env("HISTORY_ARCHIVE_DIR"),
+            history_retention_interval_minutes=env_float("HISTORY_RETENTION_INTERVAL_MINUTES", 60),
+            history_retention_batch_size=env_int("HISTORY_RETENTION_BATCH_SIZE", 2000),
+            password_hash_workers=env_int("PASSWORD_HASH_WORKERS", 2),
+            password_hash_max_pending=env_int("PASSWORD_HASH_MAX_PENDING", 32),
+            password_hash_niceness=env_int("PASSWORD_HASH_NICENESS", 5),
+            login_max_failures=env_int("LOGIN_MAX_FAILURES", 5),
+            login_failure_window_seconds=env_float("LOGIN_FAILURE_WINDOW_SECONDS", 300),
+            login_username_backoff_after=env_int("LOGIN_USERNAME_BACKOFF_AFTER", 20),
+            login_max_backoff_seconds=env_float("LOGIN_MAX_BACKOFF_SECONDS", 5),
+            auth_user_cache_ttl_seconds=env_float("AUTH_USER_CACHE_TTL_SECONDS", 60),
+            auth_user_cache_max_entries=env_int("AUTH_USER_CACHE_MAX_ENTRIES", 10000),
+            server_timing_enabled=env_bool("SERVER_TIMING_ENABLED", True),
+            request_timeline_capacity=env_int("REQUEST_TIMELINE_CAPACITY", 500),
+            ops_admin_token=env("OPS_ADMIN_TOKEN"),
+            profile_admin_token=env("PROFILE_ADMIN_TOKEN"),
+            profile_sample_rate=env_float("PROFILE_SAMPLE_RATE", 0.0),
+            profile_interval_ms=env_float("PROFILE_INTERVAL_MS", 5),
+            profile_artifact_dir=env("PROFILE_ARTIFACT_DIR"),
+            profile_max_artifacts=env_int("PROFILE_MAX_ARTIFACTS", 50),
+            profile_trace_memory=env_bool("PROFILE_TRACEMALLOC", True),
+            startup_warmup_enabled=env_bool("STARTUP_WARMUP_ENABLED", True),
+            startup_warmup_ping=env_bool("STARTUP_WARMUP_PING", False),
+            token_price_prompt_per_1m=env_float("TOKEN_PRICE_PROMPT_PER_1M", 0.0),
+            token_price_completion_per_1m=env_float("TOKEN_PRICE_COMPLETION_PER_1M", 0.0),
+            token_price_embedding_per_1m=env_float("TOKEN_PRICE_EMBEDDING_PER_1M", 0.0),
+            jwt_secret=first_non_empty(env("JWT_SECRET"), default="change-me-in-production"),
             jwt_algorithm="HS256",
             access_token_expire_minutes=int(
-                _first_non_empty(_env("ACCESS_TOKEN_EXPIRE_MINUTES"), default="720")
+                first_non_empty(env("ACCESS_TOKEN_EXPIRE_MINUTES"), default="720")
             ),
-            log_level=_first_non_empty(_env("LOG_LEVEL"), default="INFO").upper(),
+            log_level=first_non_empty(env("LOG_LEVEL"), default="INFO").upper(),
         )
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+_current_timeline: ContextVar["RequestTimeline | None"] = ContextVar("request_timeline", default=None)
+
+
+class RequestTimeline:
+    """Spans recorded against one request, with offsets relative to its start.
+
+    Spans may be appended from worker threads (threadpool endpoints, the DB
+    executor); they reach the timeline through the copied context.
+    """
+
+    def __init__(self, trace_id: str, method: str, path: str, request_id: str | None = None):
+        self.trace_id = trace_id
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.status_code: int | None = None
+        self.duration_ms: float | None = None
+        self._origin = time.perf_counter()
+        self._spans: list[dict] = []
+        self._lock = threading.Lock()
+
+    def add_span(self, component: str, stage: str, started: float, ended: float, detail: str | None = None):
+        span = {
+            "component": component,
+            "stage": stage,
+            "start_ms": round((started - self._origin) * 1000, 3),
+            "duration_ms": round((ended - started) * 1000, 3),
+            "thread": threading.current_thread().name,
+            "thread_id": threading.get_ident(),
+        }
+        if detail:
+            span["detail"] = detail
+        with self._lock:
+            self._spans.append(span)
+
+    def finish(self, status_code: int | None):
+        self.status_code = status_code
+        self.duration_ms = round((time.perf_counter() - self._origin) * 1000, 3)
+
+    def stage_totals(self) -> dict[str, float]:
+        totals: dict[str, float] = {}
+        with self._lock:
+            for span in self._spans:
+                totals[span["stage"]] = totals.get(span["stage"], 0.0) + span["duration_ms"]
+        return totals
+
+    def server_timing(self) -> str:
+        # Repeated stages (for example several DB calls) are summed into one entry.
+        entries = [f"{stage};dur={duration:.2f}" for stage, duration in self.stage_totals().items()]
+        if self.duration_ms is not None:
+            entries.append(f"total;dur={self.duration_ms:.2f}")
+        return ", ".join(entries)
+
+    def thread_ids(self) -> set[int]:
+        with self._lock:
+            return {span["thread_id"] for span in self._spans}
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = sorted(self._spans, key=lambda span: span["start_ms"])
+        return {
+            "trace_id": self.trace_id,
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at,
+            "status_code": self.status_code,
+            "duration_ms": self.duration_ms,
+            "spans": spans,
+        }
+
+
+class TimelineBuffer:
+    """Keeps the most recent `capacity` finished timelines for lookup by trace id.
+
+    Trace ids are generated by the server, so a client cannot replace another
+    request's entry by reusing its `X-Request-ID`.
+    """
+
+    def __init__(self, capacity: int = 500):
+        self.capacity = max(int(capacity), 0)
+        self._items: OrderedDict[str, RequestTimeline] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, timeline: RequestTimeline):
+        if not self.capacity:
+            return
+        with self._lock:
+            self._items[timeline.trace_id] = timeline
+            self._items.move_to_end(timeline.trace_id)
+            while len(self._items) > self.capacity:
+                self._items.popitem(last=False)
+
+    def get(self, trace_id: str) -> RequestTimeline | None:
+        with self._lock:
+            return self._items.get(trace_id)
+
+
+def begin_timeline(trace_id: str, method: str, path: str, request_id: str | None = None):
+    """Start a timeline for the current context; returns (timeline, token) for `end_timeline`."""
+    timeline = RequestTimeline(trace_id, method, path, request_id)
+    return timeline, _current_timeline.set(timeline)
+
+
+def end_timeline(token):
+    _current_timeline.reset(token)
+
+
+def current_timeline() -> RequestTimeline | None:
+    return _current_timeline.get()
+
+
+def record_span(component: str, stage: str, started: float, ended: float, detail: str | None = None):
+    timeline = _current_timeline.get()
+    if timeline is not None:
+        timeline.add_span(component, stage, started, ended, detail)
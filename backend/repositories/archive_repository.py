@@ -0,0 +1,123 @@
+import gzip
+import json
+import os
+from pathlib import Path
+
+from .db import get_db
+
+
+LOCK_FILE = ".retention.lock"
+
+
+def archive_path(archive_dir: Path, user_id: int, session_id: int) -> Path:
+    """One archive per session, so reading a page never decompresses other sessions' history."""
+    return Path(archive_dir) / f"user_{int(user_id)}" / f"session_{int(session_id)}.jsonl.gz"
+
+
+def legacy_archive_path(archive_dir: Path, user_id: int) -> Path:
+    return Path(archive_dir) / f"user_{int(user_id)}.jsonl.gz"
+
+
+def lock_path(archive_dir: Path) -> Path:
+    return Path(archive_dir) / LOCK_FILE
+
+
+def archive_files(archive_dir: Path) -> list[Path]:
+    return list(Path(archive_dir).rglob("*.jsonl.gz"))
+
+
+def list_oldest_messages(limit: int):
+    """Oldest hot messages with their owner, in id order (ids follow creation order)."""
+    with get_db("list_oldest_messages") as conn:
+        return conn.execute(
+            """
+            SELECT m.id, m.session_id, s.user_id, m.question, m.answer, m.created_at
+            FROM chat_messages m
+            JOIN chat_sessions s ON s.id = m.session_id
+            ORDER BY m.id ASC
+            LIMIT ?
+            """,
+            (limit,),
+        ).fetchall()
+
+
+def append_archive(archive_dir: Path, user_id: int, session_id: int, rows):
+    """Append rows as one gzip member; readers see concatenated members as one stream."""
+    path = archive_path(archive_dir, user_id, session_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = "".join(
+        json.dumps(
+            {
+                "id": int(row["id"]),
+                "session_id": int(row["session_id"]),
+                "question": row["question"],
+                "answer": row["answer"],
+                "created_at": row["created_at"],
+            },
+            ensure_ascii=False,
+        )
+        + "\n"
+        for row in rows
+    )
+    with open(path, "ab") as handle:
+        handle.write(gzip.compress(payload.encode("utf-8")))
+        handle.flush()
+        os.fsync(handle.fileno())
+    return path.stat().st_size
+
+
+def delete_archived_messages(rows):
+    """Drop archived rows from the hot table and count them on their sessions, in one transaction."""
+    per_session: dict[int, int] = {}
+    for row in rows:
+        per_session[int(row["session_id"])] = per_session.get(int(row["session_id"]), 0) + 1
+    with get_db("delete_archived_messages") as conn:
+        conn.executemany("DELETE FROM chat_messages WHERE id = ?", [(int(row["id"]),) for row in rows])
+        conn.executemany(
+            "UPDATE chat_sessions SET archived_messages = archived_messages + ? WHERE id = ?",
+            [(count, session_id) for session_id, count in per_session.items()],
+        )
+
+
+def get_archived_count(session_id: int) -> int:
+    with get_db("get_archived_count") as conn:
+        row = conn.execute("SELECT archived_messages FROM chat_sessions WHERE id = ?", (session_id,)).fetchone()
+    return int(row["archived_messages"]) if row is not None else 0
+
+
+def read_archived_messages(archive_dir: Path, user_id: int, session_id: int, before_id: int, limit: int):
+    """Newest archived messages of one session with ids below `before_id`."""
+    found: dict[int, dict] = {}
+    # Archives written before per-session files are still read, filtered by session.
+    for path in (archive_path(archive_dir, user_id, session_id), legacy_archive_path(archive_dir, user_id)):
+        if not path.exists():
+            continue
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                item = json.loads(line)
+                # A crash between archiving and deleting can archive a row twice; ids dedupe it.
+                if item["session_id"] == session_id and item["id"] < before_id:
+                    found[item["id"]] = item
+    return [found[key] for key in sorted(found, reverse=True)[:limit]]
+
+
+def incremental_vacuum(pages: int) -> dict:
+    with get_db("incremental_vacuum") as conn:
+        before = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+        mode = int(conn.execute("PRAGMA auto_vacuum").fetchone()[0])
+        if mode == 2:
+            conn.execute(f"PRAGMA incremental_vacuum({max(int(pages), 0)})").fetchall()
+        after = int(conn.execute("PRAGMA freelist_count").fetchone()[0])
+    return {"auto_vacuum": mode, "freed_pages": max(before - after, 0), "free_pages": after}
+
+
+def enable_incremental_vacuum():
+    """Switch an existing database to incremental auto-vacuum.
+
+    This runs a full VACUUM, which locks the database exclusively and needs
+    free disk space for a full copy; only call it offline
+    (`scripts/enable_incremental_vacuum.py`).
+    """
+    with get_db("enable_incremental_vacuum") as conn:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
@@ -0,0 +1,12 @@
+from pathlib import Path
+
+from . import archive_repository
+from .async_db import run_db
+
+
+async def get_archived_count(session_id: int) -> int:
+    return await run_db(archive_repository.get_archived_count, session_id)
+
+
+async def read_archived_messages(archive_dir: Path, user_id: int, session_id: int, before_id: int, limit: int):
+    return await run_db(archive_repository.read_archived_messages, archive_dir, user_id, session_id, before_id, limit)
@@ -0,0 +1,39 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_executor: ThreadPoolExecutor | None = None
+_executor_workers = 8
+_executor_lock = threading.Lock()
+
+
+def configure_db_executor(max_workers: int):
+    """Size the dedicated DB executor; takes effect the next time it is started."""
+    global _executor_workers
+    _executor_workers = max(int(max_workers), 1)
+    shutdown_db_executor()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_executor_workers, thread_name_prefix="db")
+    return _executor
+
+
+async def run_db(fn, *args, **kwargs):
+    """Run a blocking repository call on the DB executor instead of the request threadpool."""
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_get_executor(), call)
+
+
+def shutdown_db_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
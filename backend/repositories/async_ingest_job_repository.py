@@ -0,0 +1,18 @@
+from . import ingest_job_repository
+from .async_db import run_db
+
+
+async def create_ingest_job(reset: bool) -> int:
+    return await run_db(ingest_job_repository.create_ingest_job, reset)
+
+
+async def update_ingest_job(job_id: int, **fields):
+    return await run_db(ingest_job_repository.update_ingest_job, job_id, **fields)
+
+
+async def get_ingest_job_row(job_id: int):
+    return await run_db(ingest_job_repository.get_ingest_job_row, job_id)
+
+
+async def list_ingest_job_rows(limit: int = 20):
+    return await run_db(ingest_job_repository.list_ingest_job_rows, limit)
@@ -0,0 +1,59 @@
+from . import session_repository
+from .async_db import run_db
+
+
+async def create_session_for_user(user_id: int, title: str) -> int:
+    return await run_db(session_repository.create_session_for_user, user_id, title)
+
+
+async def get_session_by_id(session_id: int):
+    return await run_db(session_repository.get_session_by_id, session_id)
+
+
+async def session_belongs_to_user(session_id: int, user_id: int) -> bool:
+    return await run_db(session_repository.session_belongs_to_user, session_id, user_id)
+
+
+async def list_sessions_by_user(user_id: int):
+    return await run_db(session_repository.list_sessions_by_user, user_id)
+
+
+async def list_sessions_page(user_id: int, after: tuple[str, int] | None, limit: int):
+    return await run_db(session_repository.list_sessions_page, user_id, after, limit)
+
+
+async def get_session_memory(session_id: int, user_id: int):
+    return await run_db(session_repository.get_session_memory, session_id, user_id)
+
+
+async def rebuild_session_memory(session_id: int, limit: int, compact_turn) -> list[dict[str, str]]:
+    return await run_db(session_repository.rebuild_session_memory, session_id, limit, compact_turn)
+
+
+async def save_message(
+    session_id: int,
+    question: str,
+    answer: str,
+    memory_turn: dict[str, str] | None = None,
+    memory_limit: int = 5,
+):
+    return await run_db(
+        session_repository.save_message,
+        session_id,
+        question,
+        answer,
+        memory_turn=memory_turn,
+        memory_limit=memory_limit,
+    )
+
+
+async def save_messages(messages: list[dict], memory_limit: int = 5):
+    return await run_db(session_repository.save_messages, messages, memory_limit=memory_limit)
+
+
+async def list_messages_by_session(session_id: int, limit: int | None = None):
+    return await run_db(session_repository.list_messages_by_session, session_id, limit)
+
+
+async def list_messages_page(session_id: int, before_id: int | None, limit: int):
+    return await run_db(session_repository.list_messages_page, session_id, before_id, limit)
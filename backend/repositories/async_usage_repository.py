@@ -0,0 +1,26 @@
+from . import usage_repository
+from .async_db import run_db
+
+
+async def get_usage_by_request(request_id: str):
+    return await run_db(usage_repository.get_usage_by_request, request_id)
+
+
+async def get_usage_totals_for_user(user_id: int):
+    return await run_db(usage_repository.get_usage_totals_for_user, user_id)
+
+
+async def list_session_usage_for_user(user_id: int, limit: int = 50):
+    return await run_db(usage_repository.list_session_usage_for_user, user_id, limit)
+
+
+async def get_usage_totals_for_ingest_job(ingest_job_id: int):
+    return await run_db(usage_repository.get_usage_totals_for_ingest_job, ingest_job_id)
+
+
+async def list_usage_totals_by_kind():
+    return await run_db(usage_repository.list_usage_totals_by_kind)
+
+
+async def list_top_users_by_usage(limit: int = 10):
+    return await run_db(usage_repository.list_top_users_by_usage, limit)
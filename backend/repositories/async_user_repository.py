@@ -0,0 +1,14 @@
+from . import user_repository
+from .async_db import run_db
+
+
+async def get_user_by_id(user_id: int):
+    return await run_db(user_repository.get_user_by_id, user_id)
+
+
+async def get_user_by_username(username: str):
+    return await run_db(user_repository.get_user_by_username, username)
+
+
+async def create_user(username: str, password_hash: str) -> int:
+    return await run_db(user_repository.create_user, username, password_hash)
@@ -0,0 +1,121 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from core.metrics import DB_CHECKOUT_WAIT_SECONDS
+
+
+@dataclass(frozen=True)
+class PoolOptions:
+    size: int = 8
+    cached_statements: int = 256
+    busy_timeout_ms: int = 5000
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size_kib: int = 16384
+    mmap_size_bytes: int = 256 * 1024 * 1024
+
+
+class SQLiteConnectionPool:
+    """Bounded pool of long-lived SQLite connections with thread affinity.
+
+    A thread gets back the connection it used last whenever that one is idle,
+    which keeps each connection's page cache and compiled-statement cache warm
+    for the same callers. Nested checkouts on one thread share the outer
+    connection, and only the outermost block commits or rolls back.
+    """
+
+    def __init__(self, path: Path, options: PoolOptions | None = None):
+        self.path = Path(path)
+        self.options = options or PoolOptions()
+        self._size = max(int(self.options.size), 1)
+        self._idle: list[sqlite3.Connection] = []
+        self._all: list[sqlite3.Connection] = []
+        self._cond = threading.Condition()
+        self._local = threading.local()
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            check_same_thread=False,
+            cached_statements=max(int(self.options.cached_statements), 0),
+            timeout=max(self.options.busy_timeout_ms, 0) / 1000.0,
+        )
+        conn.row_factory = sqlite3.Row
+        # Must precede journal_mode: switching to WAL writes the header of a new file, fixing its vacuum mode.
+        # On an existing database it only records the mode for the next VACUUM.
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute(f"PRAGMA journal_mode={self.options.journal_mode}")
+        conn.execute(f"PRAGMA synchronous={self.options.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{max(int(self.options.cache_size_kib), 0)}")
+        conn.execute(f"PRAGMA mmap_size={max(int(self.options.mmap_size_bytes), 0)}")
+        conn.execute(f"PRAGMA busy_timeout={max(int(self.options.busy_timeout_ms), 0)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        preferred = getattr(self._local, "last", None)
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("SQLite connection pool is closed.")
+                if preferred is not None and preferred in self._idle:
+                    self._idle.remove(preferred)
+                    return preferred
+                if self._idle:
+                    return self._idle.pop()
+                if len(self._all) < self._size:
+                    conn = self._open()
+                    self._all.append(conn)
+                    return conn
+                self._cond.wait()
+
+    def _checkin(self, conn: sqlite3.Connection):
+        with self._cond:
+            if self._closed:
+                conn.close()
+                return
+            self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        held = getattr(self._local, "held", None)
+        if held is not None:
+            self._local.depth += 1
+            try:
+                yield held
+            finally:
+                self._local.depth -= 1
+            return
+
+        started = time.perf_counter()
+        conn = self._checkout()
+        DB_CHECKOUT_WAIT_SECONDS.observe(time.perf_counter() - started)
+        self._local.held = conn
+        self._local.depth = 1
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._local.held = None
+            self._local.depth = 0
+            self._local.last = conn
+            self._checkin(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {"size": self._size, "open": len(self._all), "idle": len(self._idle)}
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._all = [conn for conn in self._all if conn not in self._idle]
+            self._idle = []
+            self._cond.notify_all()
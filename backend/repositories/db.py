@@ -1,70 +1,230 @@
 import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import replace
 from datetime import datetime, timezone
 from pathlib import Path
 
+from core.metrics import DB_OPERATION_SECONDS
+from core.tracing import record_span
+
+from .connection_pool import PoolOptions, SQLiteConnectionPool
+
 
 APP_DIR = Path(__file__).resolve().parent.parent
 AUTH_DB_PATH = APP_DIR / "app.db"
+SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+_pool_options = PoolOptions()
+_pool: SQLiteConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def configure_db(**options):
+    """Override pool options; takes effect the next time a pool is opened."""
+    global _pool_options
+    if "synchronous" in options:
+        options["synchronous"] = str(options["synchronous"]).upper()
+        if options["synchronous"] not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Unsupported SQLite synchronous mode: {options['synchronous']}")
+    _pool_options = replace(_pool_options, **options)
+    close_db()
+
+
+def _get_pool() -> SQLiteConnectionPool:
+    global _pool
+    pool = _pool
+    # AUTH_DB_PATH is read on every call so scripts can point the app at another database.
+    if pool is not None and pool.path == Path(AUTH_DB_PATH):
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.path != Path(AUTH_DB_PATH):
+            if _pool is not None:
+                _pool.close()
+            _pool = SQLiteConnectionPool(AUTH_DB_PATH, _pool_options)
+        return _pool
+
+
+@contextmanager
+def get_db(operation: str = "other"):
+    """Check out a pooled connection; the block commits on success and rolls back on error.
 
+    The time the connection is held is recorded under `operation` in
+    db_operation_duration_seconds and as a "db" span on the request timeline.
+    """
+    started = time.perf_counter()
+    try:
+        with _get_pool().connection() as conn:
+            yield conn
+    finally:
+        ended = time.perf_counter()
+        DB_OPERATION_SECONDS.observe(ended - started, operation=operation)
+        record_span("db", "db", started, ended, operation)
 
-def get_db() -> sqlite3.Connection:
-    conn = sqlite3.connect(AUTH_DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+
+def db_pool_stats() -> dict:
+    return _get_pool().stats()
+
+
+def close_db():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
 
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def init_db():
-    with get_db() as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT NOT NULL UNIQUE,
-                password_hash TEXT NOT NULL,
-                created_at TEXT NOT NULL
-            )
-            """
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, ddl: str):
+    columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+def _create_base_tables(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT NOT NULL UNIQUE,
+            password_hash TEXT NOT NULL,
+            created_at TEXT NOT NULL
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS chat_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chat_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            memory_json TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id)
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS chat_messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id INTEGER NOT NULL,
-                question TEXT NOT NULL,
-                answer TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (session_id) REFERENCES chat_sessions(id)
-            )
-            """
+        """
+    )
+    _ensure_column(conn, "chat_sessions", "memory_json", "TEXT")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chat_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id INTEGER NOT NULL,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (session_id) REFERENCES chat_sessions(id)
         )
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS ingest_jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                status TEXT NOT NULL,
-                reset INTEGER NOT NULL,
-                files INTEGER NOT NULL DEFAULT 0,
-                chunks INTEGER NOT NULL DEFAULT 0,
-                failed_json TEXT NOT NULL DEFAULT '[]',
-                error TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
-            )
-            """
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ingest_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            status TEXT NOT NULL,
+            reset INTEGER NOT NULL,
+            files INTEGER NOT NULL DEFAULT 0,
+            chunks INTEGER NOT NULL DEFAULT 0,
+            failed_json TEXT NOT NULL DEFAULT '[]',
+            error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
         )
+        """
+    )
+
+
+def _add_hot_path_indexes(conn: sqlite3.Connection):
+    # Message history is read per session in id order; the rowid rides along in the index.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_messages_session_id ON chat_messages (session_id, id)")
+    # Covers the session list query entirely, so listing never touches memory_json-heavy rows.
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_chat_sessions_user_updated
+        ON chat_sessions (user_id, updated_at DESC, id, title, created_at)
+        """
+    )
+
+
+def _index_sessions_for_keyset(conn: sqlite3.Connection):
+    # Ascending keys scanned backwards serve ORDER BY updated_at DESC, id DESC for keyset pages.
+    conn.execute("DROP INDEX IF EXISTS idx_chat_sessions_user_updated")
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_chat_sessions_user_recent
+        ON chat_sessions (user_id, updated_at, id, title, created_at)
+        """
+    )
+
+
+def _add_archive_counter(conn: sqlite3.Connection):
+    _ensure_column(conn, "chat_sessions", "archived_messages", "INTEGER NOT NULL DEFAULT 0")
+
+
+def _create_token_usage(conn: sqlite3.Connection):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS token_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            request_id TEXT,
+            kind TEXT NOT NULL,
+            user_id INTEGER,
+            session_id INTEGER,
+            ingest_job_id INTEGER,
+            prompt_tokens INTEGER NOT NULL DEFAULT 0,
+            completion_tokens INTEGER NOT NULL DEFAULT 0,
+            embedding_tokens INTEGER NOT NULL DEFAULT 0,
+            llm_calls INTEGER NOT NULL DEFAULT 0,
+            embedding_calls INTEGER NOT NULL DEFAULT 0,
+            estimated INTEGER NOT NULL DEFAULT 0,
+            cost_usd REAL NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_token_usage_user ON token_usage (user_id, session_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_token_usage_request ON token_usage (request_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_token_usage_ingest_job ON token_usage (ingest_job_id)")
+
+
+# Append only: each entry runs once, in order, and bumps PRAGMA user_version to its number.
+MIGRATIONS = (
+    (1, "base tables", _create_base_tables),
+    (2, "hot path indexes", _add_hot_path_indexes),
+    (3, "keyset session index", _index_sessions_for_keyset),
+    (4, "archived message counter", _add_archive_counter),
+    (5, "token usage ledger", _create_token_usage),
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version() -> int:
+    with get_db("schema_version") as conn:
+        return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def migrate(target: int | None = None) -> int:
+    target = SCHEMA_VERSION if target is None else target
+    with get_db("migrate") as conn:
+        for version, _name, apply in MIGRATIONS:
+            if version > target:
+                break
+            # BEGIN IMMEDIATE takes the write lock, so concurrent workers apply each step once.
+            conn.execute("BEGIN IMMEDIATE")
+            if int(conn.execute("PRAGMA user_version").fetchone()[0]) >= version:
+                conn.rollback()
+                continue
+            apply(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        conn.execute("PRAGMA optimize")
+        return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def init_db():
+    migrate()
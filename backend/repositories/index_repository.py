@@ -0,0 +1,157 @@
+"""On-disk layout of the vector index: immutable segment directories plus a CURRENT manifest.
+
+    chroma_db/
+      .ingest.lock            cross-process ingest lock
+      .leases/                one locked file per segment a worker has open
+      CURRENT                 names of the live segments, one per line, replaced atomically
+      gen-<timestamp>-<id>/   one Chroma persist directory per segment
+
+Segments never change once published. A reset ingest publishes one new
+segment; an append publishes the current segments plus one holding only the
+new chunks. Workers compare CURRENT's stat with the one they opened and
+reopen when it differs. Each worker holds a lease on every segment it has
+open, and pruning skips leased segments, so a lagging worker never loses
+files under an open client. A root with Chroma files but no CURRENT is the
+pre-generation layout; it is served as the single segment `legacy` until the
+next ingest.
+"""
+
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from core.file_lock import FileLockTimeout, InterProcessLock
+
+CURRENT_MARKER = "CURRENT"
+LOCK_FILE = ".ingest.lock"
+LEASE_DIR = ".leases"
+GENERATION_PREFIX = "gen-"
+LEGACY_SEGMENT = "legacy"
+# A lease file is created a moment before it is locked; younger unlocked leases still count.
+LEASE_GRACE_SECONDS = 5.0
+
+
+def lock_path(root: Path) -> Path:
+    return Path(root) / LOCK_FILE
+
+
+def marker_token(root: Path) -> tuple[int, int, int] | None:
+    """Cheap change detector for CURRENT: one stat call, no read."""
+    try:
+        stat = os.stat(Path(root) / CURRENT_MARKER)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+
+def current_segments(root: Path) -> list[str]:
+    try:
+        text = (Path(root) / CURRENT_MARKER).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return []
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def _is_legacy_index(root: Path) -> bool:
+    return (Path(root) / "chroma.sqlite3").exists()
+
+
+def segment_dirs(root: Path) -> dict[str, Path]:
+    """Segments to open for reads, oldest first: the CURRENT ones, the legacy root, or none without an index."""
+    root = Path(root)
+    names = current_segments(root)
+    if names and all((root / name).is_dir() for name in names):
+        return {name: root / name for name in names}
+    return {LEGACY_SEGMENT: root} if _is_legacy_index(root) else {}
+
+
+def new_segment_dir(root: Path) -> Path:
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    path = Path(root) / f"{GENERATION_PREFIX}{stamp}-{uuid.uuid4().hex[:8]}"
+    path.mkdir(parents=True)
+    return path
+
+
+def publish_segments(root: Path, names: list[str]):
+    """Point CURRENT at `names`; os.replace makes the swap atomic for readers."""
+    root = Path(root)
+    temp = root / f"{CURRENT_MARKER}.{uuid.uuid4().hex}.tmp"
+    with open(temp, "w", encoding="utf-8") as handle:
+        handle.write("\n".join(names))
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temp, root / CURRENT_MARKER)
+
+
+def copy_segment(source: Path, target: Path):
+    """Seed a compacted segment with an existing one; skips the layout's own files when `source` is the legacy root."""
+    ignore = shutil.ignore_patterns(f"{GENERATION_PREFIX}*", CURRENT_MARKER, LOCK_FILE, LEASE_DIR, "*.tmp")
+    shutil.copytree(source, target, ignore=ignore, dirs_exist_ok=True)
+
+
+def lease_segment(root: Path, name: str) -> InterProcessLock:
+    """Hold a lease on segment `name` until `release_lease`; the OS drops it if the process dies."""
+    lease = InterProcessLock(Path(root) / LEASE_DIR / f"{name}@{uuid.uuid4().hex}")
+    lease.acquire()
+    return lease
+
+
+def release_lease(lease: InterProcessLock):
+    lease.release()
+    try:
+        lease.path.unlink()
+    except OSError:
+        pass
+
+
+def leased_segments(root: Path) -> set[str]:
+    """Names of segments some process holds a lease on; leases left by dead processes are deleted."""
+    directory = Path(root) / LEASE_DIR
+    leased: set[str] = set()
+    if not directory.is_dir():
+        return leased
+    for path in directory.iterdir():
+        name = path.name.partition("@")[0]
+        if name in leased:
+            continue
+        try:
+            if time.time() - path.stat().st_mtime < LEASE_GRACE_SECONDS:
+                leased.add(name)
+                continue
+            probe = InterProcessLock(path)
+            probe.acquire(timeout=0)
+        except FileLockTimeout:
+            leased.add(name)
+            continue
+        except FileNotFoundError:
+            continue
+        probe.release()
+        try:
+            path.unlink()
+        except OSError:
+            pass
+    return leased
+
+
+def prune_segments(root: Path, keep: set[str]):
+    """Delete segments that are neither in `keep` nor leased, and the legacy root files likewise.
+
+    Runs under the ingest lock, so leftover temp markers are stale. Deletion
+    failures (e.g. files still open on Windows) are left for the next prune.
+    """
+    root = Path(root)
+    keep = set(keep) | leased_segments(root)
+    protected = {CURRENT_MARKER, LOCK_FILE, LEASE_DIR, *keep}
+    for path in root.iterdir():
+        if path.name in protected or (LEGACY_SEGMENT in keep and not path.name.startswith(GENERATION_PREFIX)):
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                path.unlink()
+            except OSError:
+                pass
@@ -3,7 +3,7 @@ from .db import get_db, now_iso
 
 def create_ingest_job(reset: bool) -> int:
     timestamp = now_iso()
-    with get_db() as conn:
+    with get_db("create_ingest_job") as conn:
         cur = conn.execute(
             """
             INSERT INTO ingest_jobs (status, reset, files, chunks, failed_json, error, created_at, updated_at)
@@ -22,7 +22,7 @@ def update_ingest_job(job_id: int, **fields):
     assignments = ", ".join(f"{key} = ?" for key in keys)
     values = [fields[key] for key in keys]
     values.append(job_id)
-    with get_db() as conn:
+    with get_db("update_ingest_job") as conn:
         conn.execute(
             f"UPDATE ingest_jobs SET {assignments} WHERE id = ?",
             values,
@@ -30,7 +30,7 @@ def update_ingest_job(job_id: int, **fields):
 
 
 def get_ingest_job_row(job_id: int):
-    with get_db() as conn:
+    with get_db("get_ingest_job_row") as conn:
         return conn.execute(
             "SELECT * FROM ingest_jobs WHERE id = ?",
             (job_id,),
@@ -39,7 +39,7 @@ def get_ingest_job_row(job_id: int):
 
 def list_ingest_job_rows(limit: int = 20):
     limit = max(1, min(limit, 200))
-    with get_db() as conn:
+    with get_db("list_ingest_job_rows") as conn:
         return conn.execute(
             """
             SELECT * FROM ingest_jobs
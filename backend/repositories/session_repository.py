@@ -1,18 +1,35 @@
+import json
+from typing import Callable
+
 from .db import get_db, now_iso
 
+MAX_ROWID = 2**63 - 1
+
+_RECENT_MESSAGES_SQL = """
+    SELECT question, answer, created_at
+    FROM (
+        SELECT question, answer, created_at, id
+        FROM chat_messages
+        WHERE session_id = ?
+        ORDER BY id DESC
+        LIMIT ?
+    ) recent_messages
+    ORDER BY id ASC
+"""
+
 
 def create_session_for_user(user_id: int, title: str) -> int:
     timestamp = now_iso()
-    with get_db() as conn:
+    with get_db("create_session_for_user") as conn:
         cur = conn.execute(
-            "INSERT INTO chat_sessions (user_id, title, created_at, updated_at) VALUES (?, ?, ?, ?)",
-            (user_id, title[:120], timestamp, timestamp),
+            "INSERT INTO chat_sessions (user_id, title, created_at, updated_at, memory_json) VALUES (?, ?, ?, ?, ?)",
+            (user_id, title[:120], timestamp, timestamp, "[]"),
         )
         return int(cur.lastrowid)
 
 
 def get_session_by_id(session_id: int):
-    with get_db() as conn:
+    with get_db("get_session_by_id") as conn:
         return conn.execute(
             "SELECT id, title, created_at, updated_at FROM chat_sessions WHERE id = ?",
             (session_id,),
@@ -20,7 +37,7 @@ def get_session_by_id(session_id: int):
 
 
 def session_belongs_to_user(session_id: int, user_id: int) -> bool:
-    with get_db() as conn:
+    with get_db("session_belongs_to_user") as conn:
         row = conn.execute(
             "SELECT id FROM chat_sessions WHERE id = ? AND user_id = ?",
             (session_id, user_id),
@@ -29,7 +46,7 @@ def session_belongs_to_user(session_id: int, user_id: int) -> bool:
 
 
 def list_sessions_by_user(user_id: int):
-    with get_db() as conn:
+    with get_db("list_sessions_by_user") as conn:
         return conn.execute(
             """
             SELECT id, title, created_at, updated_at
@@ -41,36 +58,132 @@ def list_sessions_by_user(user_id: int):
         ).fetchall()
 
 
-def save_message(session_id: int, question: str, answer: str):
-    timestamp = now_iso()
-    with get_db() as conn:
+def list_sessions_page(user_id: int, after: tuple[str, int] | None, limit: int):
+    """Most recently updated sessions first, strictly after the `(updated_at, id)` position `after`.
+
+    The position comes from the cursor rather than from re-reading the anchor
+    session, whose `updated_at` moves when it gets a new message.
+    """
+    with get_db("list_sessions_page") as conn:
+        if after is None:
+            return conn.execute(
+                """
+                SELECT id, title, created_at, updated_at
+                FROM chat_sessions
+                WHERE user_id = ?
+                ORDER BY updated_at DESC, id DESC
+                LIMIT ?
+                """,
+                (user_id, limit),
+            ).fetchall()
+        return conn.execute(
+            """
+            SELECT id, title, created_at, updated_at
+            FROM chat_sessions
+            WHERE user_id = ? AND (updated_at, id) < (?, ?)
+            ORDER BY updated_at DESC, id DESC
+            LIMIT ?
+            """,
+            (user_id, after[0], after[1], limit),
+        ).fetchall()
+
+
+def get_session_memory(session_id: int, user_id: int):
+    with get_db("get_session_memory") as conn:
+        return conn.execute(
+            "SELECT id, memory_json FROM chat_sessions WHERE id = ? AND user_id = ?",
+            (session_id, user_id),
+        ).fetchone()
+
+
+def rebuild_session_memory(
+    session_id: int,
+    limit: int,
+    compact_turn: Callable[[str, str], dict[str, str]],
+) -> list[dict[str, str]]:
+    """Recompute a session's memory from its latest `limit` turns and store it.
+
+    BEGIN IMMEDIATE takes the write lock before the history read, so a turn
+    saved concurrently lands either before the read or after the update, and
+    the stored memory never drops it.
+    """
+    with get_db("rebuild_session_memory") as conn:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute(_RECENT_MESSAGES_SQL, (session_id, limit)).fetchall()
+        memory = [compact_turn(row["question"], row["answer"]) for row in rows]
         conn.execute(
-            "INSERT INTO chat_messages (session_id, question, answer, created_at) VALUES (?, ?, ?, ?)",
-            (session_id, question, answer, timestamp),
+            "UPDATE chat_sessions SET memory_json = ? WHERE id = ?",
+            (json.dumps(memory, ensure_ascii=False), session_id),
         )
-        conn.execute(
-            "UPDATE chat_sessions SET updated_at = ? WHERE id = ?",
-            (timestamp, session_id),
+    return memory
+
+
+def _append_memory_turn(memory_json: str | None, memory_turn: dict[str, str], memory_limit: int):
+    try:
+        memory = json.loads(memory_json) if memory_json else []
+    except json.JSONDecodeError:
+        memory = []
+    if not isinstance(memory, list):
+        memory = []
+    memory.append(memory_turn)
+    return json.dumps(memory[-memory_limit:], ensure_ascii=False)
+
+
+def save_message(
+    session_id: int,
+    question: str,
+    answer: str,
+    memory_turn: dict[str, str] | None = None,
+    memory_limit: int = 5,
+):
+    save_messages(
+        [
+            {
+                "session_id": session_id,
+                "question": question,
+                "answer": answer,
+                "memory_turn": memory_turn,
+                "created_at": now_iso(),
+            }
+        ],
+        memory_limit=memory_limit,
+    )
+
+
+def save_messages(messages: list[dict], memory_limit: int = 5):
+    """Persist a batch of turns in one transaction, bumping each touched session once."""
+    if not messages:
+        return
+    by_session: dict[int, list[dict]] = {}
+    for message in messages:
+        by_session.setdefault(message["session_id"], []).append(message)
+    with get_db("save_messages") as conn:
+        # The INSERT opens the write transaction, so the memory read-modify-write below is serialized.
+        conn.executemany(
+            "INSERT INTO chat_messages (session_id, question, answer, created_at) VALUES (?, ?, ?, ?)",
+            [(item["session_id"], item["question"], item["answer"], item["created_at"]) for item in messages],
         )
+        for session_id, turns in by_session.items():
+            memory_turns = [turn["memory_turn"] for turn in turns if turn.get("memory_turn") is not None]
+            memory_json = None
+            if memory_turns:
+                row = conn.execute("SELECT memory_json FROM chat_sessions WHERE id = ?", (session_id,)).fetchone()
+                # A NULL memory (pre-column session) is left NULL so the next read backfills it from history.
+                if row is not None and row["memory_json"] is not None:
+                    memory_json = row["memory_json"]
+                    for memory_turn in memory_turns:
+                        memory_json = _append_memory_turn(memory_json, memory_turn, memory_limit)
+            conn.execute(
+                "UPDATE chat_sessions SET updated_at = ?, memory_json = COALESCE(?, memory_json) WHERE id = ?",
+                (turns[-1]["created_at"], memory_json, session_id),
+            )
 
 
 def list_messages_by_session(session_id: int, limit: int | None = None):
-    with get_db() as conn:
+    with get_db("list_messages_by_session") as conn:
         if limit is not None and limit > 0:
-            return conn.execute(
-                """
-                SELECT question, answer, created_at
-                FROM (
-                    SELECT question, answer, created_at, id
-                    FROM chat_messages
-                    WHERE session_id = ?
-                    ORDER BY id DESC
-                    LIMIT ?
-                ) recent_messages
-                ORDER BY id ASC
-                """,
-                (session_id, limit),
-            ).fetchall()
+            return conn.execute(_RECENT_MESSAGES_SQL, (session_id, limit)).fetchall()
 
         return conn.execute(
             """
@@ -81,3 +194,18 @@ def list_messages_by_session(session_id: int, limit: int | None = None):
             """,
             (session_id,),
         ).fetchall()
+
+
+def list_messages_page(session_id: int, before_id: int | None, limit: int):
+    """Newest messages first, all with ids below `before_id`."""
+    with get_db("list_messages_page") as conn:
+        return conn.execute(
+            """
+            SELECT id, question, answer, created_at
+            FROM chat_messages
+            WHERE session_id = ? AND id < ?
+            ORDER BY id DESC
+            LIMIT ?
+            """,
+            (session_id, MAX_ROWID if before_id is None else before_id, limit),
+        ).fetchall()
@@ -0,0 +1,116 @@
+from .db import get_db, now_iso
+
+USAGE_COLUMNS = (
+    "prompt_tokens",
+    "completion_tokens",
+    "embedding_tokens",
+    "llm_calls",
+    "embedding_calls",
+    "estimated",
+    "cost_usd",
+)
+_TOTALS_SQL = """
+    COUNT(*) AS requests,
+    COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens,
+    COALESCE(SUM(completion_tokens), 0) AS completion_tokens,
+    COALESCE(SUM(embedding_tokens), 0) AS embedding_tokens,
+    COALESCE(SUM(llm_calls), 0) AS llm_calls,
+    COALESCE(SUM(embedding_calls), 0) AS embedding_calls,
+    COALESCE(SUM(cost_usd), 0) AS cost_usd,
+    COALESCE(SUM(estimated), 0) AS estimated_requests
+"""
+
+
+def usage_row(
+    kind: str,
+    usage: dict,
+    request_id: str | None = None,
+    user_id: int | None = None,
+    session_id: int | None = None,
+    ingest_job_id: int | None = None,
+) -> tuple:
+    values = [int(usage[column]) if column != "cost_usd" else float(usage[column]) for column in USAGE_COLUMNS]
+    return (request_id, kind, user_id, session_id, ingest_job_id, *values, now_iso())
+
+
+_INSERT_USAGE_SQL = f"""
+    INSERT INTO token_usage (
+        request_id, kind, user_id, session_id, ingest_job_id, {", ".join(USAGE_COLUMNS)}, created_at
+    )
+    VALUES (?, ?, ?, ?, ?, {", ".join("?" for _ in USAGE_COLUMNS)}, ?)
+"""
+
+
+def insert_usage(
+    kind: str,
+    usage: dict,
+    request_id: str | None = None,
+    user_id: int | None = None,
+    session_id: int | None = None,
+    ingest_job_id: int | None = None,
+) -> int:
+    row = usage_row(kind, usage, request_id, user_id, session_id, ingest_job_id)
+    with get_db("insert_usage") as conn:
+        return int(conn.execute(_INSERT_USAGE_SQL, row).lastrowid)
+
+
+def insert_usage_rows(rows: list[tuple]):
+    """Insert rows built by `usage_row` in one transaction."""
+    with get_db("insert_usage_rows") as conn:
+        conn.executemany(_INSERT_USAGE_SQL, rows)
+
+
+def get_usage_by_request(request_id: str):
+    with get_db("get_usage_by_request") as conn:
+        return conn.execute(
+            "SELECT * FROM token_usage WHERE request_id = ? ORDER BY id DESC LIMIT 1",
+            (request_id,),
+        ).fetchone()
+
+
+def get_usage_totals_for_user(user_id: int):
+    with get_db("get_usage_totals_for_user") as conn:
+        return conn.execute(f"SELECT {_TOTALS_SQL} FROM token_usage WHERE user_id = ?", (user_id,)).fetchone()
+
+
+def list_session_usage_for_user(user_id: int, limit: int = 50):
+    with get_db("list_session_usage_for_user") as conn:
+        return conn.execute(
+            f"""
+            SELECT session_id, {_TOTALS_SQL}
+            FROM token_usage
+            WHERE user_id = ? AND session_id IS NOT NULL
+            GROUP BY session_id
+            ORDER BY SUM(cost_usd) DESC, SUM(prompt_tokens + completion_tokens) DESC
+            LIMIT ?
+            """,
+            (user_id, max(1, min(int(limit), 200))),
+        ).fetchall()
+
+
+def get_usage_totals_for_ingest_job(ingest_job_id: int):
+    with get_db("get_usage_totals_for_ingest_job") as conn:
+        return conn.execute(
+            f"SELECT {_TOTALS_SQL} FROM token_usage WHERE ingest_job_id = ?",
+            (ingest_job_id,),
+        ).fetchone()
+
+
+def list_usage_totals_by_kind():
+    with get_db("list_usage_totals_by_kind") as conn:
+        return conn.execute(f"SELECT kind, {_TOTALS_SQL} FROM token_usage GROUP BY kind ORDER BY kind").fetchall()
+
+
+def list_top_users_by_usage(limit: int = 10):
+    with get_db("list_top_users_by_usage") as conn:
+        return conn.execute(
+            f"""
+            SELECT user_id, {_TOTALS_SQL}
+            FROM token_usage
+            WHERE user_id IS NOT NULL
+            GROUP BY user_id
+            ORDER BY SUM(cost_usd) DESC, SUM(prompt_tokens + completion_tokens + embedding_tokens) DESC
+            LIMIT ?
+            """,
+            (max(1, min(int(limit), 100)),),
+        ).fetchall()
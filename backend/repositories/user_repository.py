@@ -1,8 +1,27 @@
+from typing import Callable
+
 from .db import get_db, now_iso
 
+_change_listeners: list[Callable[[int], None]] = []
+
+
+def add_user_change_listener(listener: Callable[[int], None]):
+    """Call `listener(user_id)` after any committed write to that user's row.
+
+    Users are immutable after `create_user`: no code path updates or deletes a
+    user row. A function added here that does must call `_notify_user_changed`
+    after its commit, or the identity cache serves the old row until its TTL.
+    """
+    _change_listeners.append(listener)
+
+
+def _notify_user_changed(user_id: int):
+    for listener in list(_change_listeners):
+        listener(user_id)
+
 
 def get_user_by_id(user_id: int):
-    with get_db() as conn:
+    with get_db("get_user_by_id") as conn:
         return conn.execute(
             "SELECT id, username, password_hash FROM users WHERE id = ?",
             (user_id,),
@@ -10,7 +29,7 @@ def get_user_by_id(user_id: int):
 
 
 def get_user_by_username(username: str):
-    with get_db() as conn:
+    with get_db("get_user_by_username") as conn:
         return conn.execute(
             "SELECT id, username, password_hash FROM users WHERE username = ?",
             (username,),
@@ -18,9 +37,11 @@ def get_user_by_username(username: str):
 
 
 def create_user(username: str, password_hash: str) -> int:
-    with get_db() as conn:
+    with get_db("create_user") as conn:
         cur = conn.execute(
             "INSERT INTO users (username, password_hash, created_at) VALUES (?, ?, ?)",
             (username, password_hash, now_iso()),
         )
-        return int(cur.lastrowid)
+        user_id = int(cur.lastrowid)
+    _notify_user_changed(user_id)
+    return user_id
@@ -1,11 +1,21 @@
 from .auth_router import create_auth_router
 from .chat_router import create_chat_router
+from .debug_router import create_debug_router
+from .health_router import create_health_router
 from .ingest_router import create_ingest_router
+from .metrics_router import create_metrics_router
+from .ops_router import create_ops_router
 from .session_router import create_session_router
+from .usage_router import create_usage_router
 
 __all__ = [
     "create_auth_router",
     "create_chat_router",
+    "create_debug_router",
+    "create_health_router",
     "create_ingest_router",
+    "create_metrics_router",
+    "create_ops_router",
     "create_session_router",
+    "create_usage_router",
 ]
@@ -1,6 +1,6 @@
 from typing import Callable
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 
 from schemas.api import LoginRequest, RegisterRequest, TokenResponse, UserResponse
 from services.auth_service import AuthService
@@ -13,24 +13,25 @@ def create_auth_router(
     router = APIRouter(prefix="/auth", tags=["auth"])
 
     @router.post("/register", response_model=UserResponse)
-    def register(payload: RegisterRequest):
+    async def register(payload: RegisterRequest):
         username = payload.username.strip()
         if not username:
             raise HTTPException(status_code=400, detail="Username is required")
-        created = auth_service.register_user(username, payload.password)
+        created = await auth_service.aregister_user(username, payload.password)
         return UserResponse(id=created["id"], username=created["username"])
 
     @router.post("/login", response_model=TokenResponse)
-    def login(payload: LoginRequest):
+    async def login(payload: LoginRequest, request: Request):
         username = payload.username.strip()
-        result = auth_service.login_user(username, payload.password)
+        client_host = request.client.host if request.client else None
+        result = await auth_service.alogin_user(username, payload.password, client_host)
         return TokenResponse(
             access_token=result["access_token"],
             username=result["username"],
         )
 
     @router.get("/me", response_model=UserResponse)
-    def me(user=Depends(get_current_user)):
+    async def me(user=Depends(get_current_user)):
         return UserResponse(id=user["id"], username=user["username"])
 
     return router
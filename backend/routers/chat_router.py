@@ -2,50 +2,80 @@ from typing import Callable
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 
+from core.metrics import stage_timer
 from schemas.api import ChatRequest, ChatResponse
+from services.fair_scheduler import FairScheduler
 from services.rag_service import RagService
 from services.session_service import SessionService
+from services.usage_accounting import usage_scope
+from services.usage_service import UsageService
 
 
 def create_chat_router(
     rag_service: RagService,
     session_service: SessionService,
     get_current_user_optional: Callable,
+    chat_scheduler: FairScheduler,
+    usage_service: UsageService,
 ) -> APIRouter:
     router = APIRouter(tags=["chat"])
 
-    @router.post("/chat", response_model=ChatResponse)
+    async def fair_share_slot(request: Request, user=Depends(get_current_user_optional)):
+        # Waiting happens on the event loop, so queued requests do not hold threadpool workers.
+        client_host = request.client.host if request.client else None
+        with stage_timer("chat", "queue"):
+            ticket = await chat_scheduler.acquire(user, client_host)
+        try:
+            yield
+        finally:
+            chat_scheduler.release(ticket)
+
+    @router.post("/chat", response_model=ChatResponse, dependencies=[Depends(fair_share_slot)])
     def chat(payload: ChatRequest, request: Request, user=Depends(get_current_user_optional)):
         session_id = payload.session_id
         memory = []
         if user is not None and session_id is not None:
-            session_service.ensure_session_owner(session_id, user["id"])
-            memory = session_service.build_chat_memory(session_id)
+            with stage_timer("chat", "memory"):
+                memory = session_service.build_chat_memory(session_id, user["id"])
 
+        request_id = getattr(request.state, "request_id", None)
+        usage = None
         try:
-            answer, sources = rag_service.answer_question(
-                payload.question,
-                payload.k,
-                memory=memory,
-                request_id=getattr(request.state, "request_id", None),
-            )
+            with usage_scope() as usage:
+                answer, sources = rag_service.answer_question(
+                    payload.question,
+                    payload.k,
+                    memory=memory,
+                    request_id=request_id,
+                )
+
+            if user is not None:
+                with stage_timer("chat", "persist"):
+                    # An existing session_id was already checked for ownership by build_chat_memory.
+                    if session_id is None:
+                        session_id = session_service.create_session_for_user(
+                            user["id"],
+                            session_service.make_session_title(payload.question),
+                        )
+                    session_service.save_message(session_id, payload.question, answer)
         except RuntimeError as exc:
             raise HTTPException(status_code=400, detail=str(exc))
-
-        if user is not None:
-            if session_id is None:
-                session_id = session_service.create_session_for_user(
-                    user["id"],
-                    session_service.make_session_title(payload.question),
+        finally:
+            # Tokens already spent are billed even when the answer or the save failed.
+            if usage is not None:
+                usage_service.record(
+                    "chat",
+                    usage,
+                    request_id=request_id,
+                    user_id=user["id"] if user is not None else None,
+                    session_id=session_id,
                 )
-            else:
-                session_service.ensure_session_owner(session_id, user["id"])
-            session_service.save_message(session_id, payload.question, answer)
 
         return ChatResponse(
             answer=answer,
             sources=sources,
             session_id=session_id,
+            usage=usage.to_dict(),
         )
 
     return router
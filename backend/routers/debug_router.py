@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from core.tracing import TimelineBuffer
+from services.request_profiler import RequestProfiler
+
+
+def create_debug_router(timeline_buffer: TimelineBuffer, request_profiler: RequestProfiler) -> APIRouter:
+    router = APIRouter(prefix="/debug", tags=["debug"])
+
+    def require_profile_admin(x_profile_token: str | None = Header(default=None)):
+        if not request_profiler.is_admin(x_profile_token):
+            raise HTTPException(status_code=403, detail="Profiling admin token required")
+
+    @router.get("/requests/{trace_id}", dependencies=[Depends(require_profile_admin)])
+    def request_timeline(trace_id: str):
+        timeline = timeline_buffer.get(trace_id)
+        if timeline is None:
+            raise HTTPException(status_code=404, detail="Request timeline not found")
+        return timeline.to_dict()
+
+    @router.get("/profiles", dependencies=[Depends(require_profile_admin)])
+    def list_profiles():
+        return {"profiler": request_profiler.snapshot(), "items": request_profiler.list_artifacts()}
+
+    @router.get("/profiles/{request_id}", dependencies=[Depends(require_profile_admin)])
+    def download_profile(request_id: str, kind: str = "json"):
+        path = request_profiler.artifact_path(request_id, kind)
+        if path is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        media_type = "application/json" if kind == "json" else "text/plain"
+        return FileResponse(path, media_type=media_type, filename=path.name)
+
+    return router
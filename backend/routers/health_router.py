@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from services.startup_warmup import StartupWarmup
+
+
+def create_health_router(startup_warmup: StartupWarmup) -> APIRouter:
+    router = APIRouter(tags=["ops"])
+
+    @router.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    @router.get("/ready")
+    def ready():
+        snapshot = startup_warmup.snapshot()
+        return JSONResponse(status_code=200 if snapshot["ready"] else 503, content=snapshot)
+
+    return router
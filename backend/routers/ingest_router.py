@@ -1,26 +1,35 @@
 from typing import List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
-from schemas.api import IngestJobResponse, IngestRequest
+from schemas.api import IngestJobResponse, IngestRequest, UsageTotals
 from services.ingest_job_service import IngestJobService
 from services.rag_service import RagService
+from services.usage_accounting import usage_scope
+from services.usage_service import UsageService
 
 
 def create_ingest_router(
     rag_service: RagService,
     ingest_job_service: IngestJobService,
+    usage_service: UsageService,
 ) -> APIRouter:
     router = APIRouter(prefix="/ingest", tags=["ingest"])
 
     @router.post("")
-    def ingest(payload: IngestRequest):
+    def ingest(payload: IngestRequest, request: Request):
+        usage = None
         try:
-            return rag_service.run_ingest(payload.reset)
+            with usage_scope() as usage:
+                result = rag_service.run_ingest(payload.reset)
         except ValueError as exc:
             raise HTTPException(status_code=400, detail=str(exc))
         except RuntimeError as exc:
             raise HTTPException(status_code=400, detail=str(exc))
+        finally:
+            if usage is not None:
+                usage_service.record("ingest", usage, request_id=getattr(request.state, "request_id", None))
+        return {**result, "usage": usage.to_dict()}
 
     @router.post("/jobs", response_model=IngestJobResponse)
     def create_ingest_job(payload: IngestRequest):
@@ -28,11 +37,16 @@ def create_ingest_router(
         return ingest_job_service.get_ingest_job(job_id)
 
     @router.get("/jobs", response_model=List[IngestJobResponse])
-    def list_ingest_jobs(limit: int = 20):
-        return ingest_job_service.list_ingest_jobs(limit)
+    async def list_ingest_jobs(limit: int = 20):
+        return await ingest_job_service.alist_ingest_jobs(limit)
 
     @router.get("/jobs/{job_id}", response_model=IngestJobResponse)
-    def get_ingest_job(job_id: int):
-        return ingest_job_service.get_ingest_job(job_id)
+    async def get_ingest_job(job_id: int):
+        return await ingest_job_service.aget_ingest_job(job_id)
+
+    @router.get("/jobs/{job_id}/usage", response_model=UsageTotals)
+    async def get_ingest_job_usage(job_id: int):
+        await ingest_job_service.aget_ingest_job(job_id)
+        return await usage_service.aget_ingest_job_usage(job_id)
 
     return router
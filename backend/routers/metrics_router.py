@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from core.metrics import PROMETHEUS_CONTENT_TYPE, render_prometheus
+
+
+def create_metrics_router() -> APIRouter:
+    router = APIRouter(tags=["ops"])
+
+    @router.get("/metrics", include_in_schema=False)
+    def metrics():
+        return Response(content=render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    return router
@@ -0,0 +1,63 @@
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from services.admission_controller import AdmissionController
+from services.auth_service import AuthService
+from services.fair_scheduler import FairScheduler
+from services.history_retention import HistoryRetentionJob
+from services.message_writer import MessageWriteBehind
+from services.provider_gateway import ProviderGateway
+from services.usage_service import UsageService
+
+
+def create_ops_router(
+    provider_gateway: ProviderGateway,
+    admission_controller: AdmissionController,
+    chat_scheduler: FairScheduler,
+    message_writer: MessageWriteBehind,
+    history_retention: HistoryRetentionJob,
+    auth_service: AuthService,
+    usage_service: UsageService,
+    admin_token: str,
+) -> APIRouter:
+    # Ops stats expose per-user spend and login activity; with no OPS_ADMIN_TOKEN configured they stay closed.
+    def require_ops_admin(x_ops_token: str | None = Header(default=None)):
+        if not (admin_token and x_ops_token and secrets.compare_digest(x_ops_token, admin_token)):
+            raise HTTPException(status_code=403, detail="Ops admin token required")
+
+    router = APIRouter(prefix="/ops", tags=["ops"], dependencies=[Depends(require_ops_admin)])
+
+    @router.get("/providers")
+    def provider_health():
+        return provider_gateway.health_snapshot()
+
+    @router.get("/admission")
+    def admission_stats():
+        return admission_controller.snapshot()
+
+    @router.get("/fair-scheduler")
+    def fair_scheduler_stats():
+        return chat_scheduler.snapshot()
+
+    @router.get("/message-writer")
+    def message_writer_stats():
+        return message_writer.snapshot()
+
+    @router.get("/history-retention")
+    def history_retention_stats():
+        return history_retention.snapshot()
+
+    @router.get("/auth")
+    def auth_stats():
+        return {
+            "password_hasher": auth_service.password_hasher.snapshot(),
+            "login_throttle": auth_service.login_throttle.snapshot(),
+            "user_cache": auth_service.user_cache.snapshot(),
+        }
+
+    @router.get("/usage")
+    async def usage_summary():
+        return {**await usage_service.asummary(), "writer": usage_service.snapshot()}
+
+    return router
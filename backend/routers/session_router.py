@@ -1,8 +1,8 @@
-from typing import Callable, List
+from typing import Callable, Optional
 
 from fastapi import APIRouter, Depends
 
-from schemas.api import SessionCreateRequest, SessionMessage, SessionResponse
+from schemas.api import SessionCreateRequest, SessionMessage, SessionMessagePage, SessionPage, SessionResponse
 from services.session_service import SessionService
 
 
@@ -12,24 +12,31 @@ def create_session_router(
 ) -> APIRouter:
     router = APIRouter(prefix="/sessions", tags=["sessions"])
 
-    @router.get("", response_model=List[SessionResponse])
-    def list_sessions(user=Depends(get_current_user)):
-        rows = session_service.list_sessions(user["id"])
-        return [
-            SessionResponse(
-                id=int(row["id"]),
-                title=row["title"],
-                created_at=row["created_at"],
-                updated_at=row["updated_at"],
-            )
-            for row in rows
-        ]
+    @router.get("", response_model=SessionPage)
+    async def list_sessions(
+        cursor: Optional[str] = None,
+        limit: int = SessionService.DEFAULT_PAGE_SIZE,
+        user=Depends(get_current_user),
+    ):
+        rows, next_cursor = await session_service.alist_sessions_page(user["id"], cursor, limit)
+        return SessionPage(
+            items=[
+                SessionResponse(
+                    id=int(row["id"]),
+                    title=row["title"],
+                    created_at=row["created_at"],
+                    updated_at=row["updated_at"],
+                )
+                for row in rows
+            ],
+            next_cursor=next_cursor,
+        )
 
     @router.post("", response_model=SessionResponse)
-    def create_session(payload: SessionCreateRequest, user=Depends(get_current_user)):
+    async def create_session(payload: SessionCreateRequest, user=Depends(get_current_user)):
         title = (payload.title or "New chat").strip() or "New chat"
-        session_id = session_service.create_session_for_user(user["id"], title)
-        row = session_service.get_session(session_id)
+        session_id = await session_service.acreate_session_for_user(user["id"], title)
+        row = await session_service.aget_session(session_id)
         return SessionResponse(
             id=int(row["id"]),
             title=row["title"],
@@ -37,17 +44,26 @@ def create_session_router(
             updated_at=row["updated_at"],
         )
 
-    @router.get("/{session_id}/messages", response_model=List[SessionMessage])
-    def get_session_messages(session_id: int, user=Depends(get_current_user)):
-        session_service.ensure_session_owner(session_id, user["id"])
-        rows = session_service.list_messages(session_id)
-        return [
-            SessionMessage(
-                question=row["question"],
-                answer=row["answer"],
-                created_at=row["created_at"],
-            )
-            for row in rows
-        ]
+    @router.get("/{session_id}/messages", response_model=SessionMessagePage)
+    async def get_session_messages(
+        session_id: int,
+        before_id: Optional[int] = None,
+        limit: int = SessionService.DEFAULT_PAGE_SIZE,
+        user=Depends(get_current_user),
+    ):
+        await session_service.aensure_session_owner(session_id, user["id"])
+        rows, next_cursor = await session_service.alist_messages_page(session_id, user["id"], before_id, limit)
+        return SessionMessagePage(
+            items=[
+                SessionMessage(
+                    id=int(row["id"]),
+                    question=row["question"],
+                    answer=row["answer"],
+                    created_at=row["created_at"],
+                )
+                for row in rows
+            ],
+            next_cursor=next_cursor,
+        )
 
     return router
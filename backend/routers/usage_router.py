@@ -0,0 +1,20 @@
+from typing import Callable
+
+from fastapi import APIRouter, Depends
+
+from schemas.api import TokenUsageResponse, UserUsageResponse
+from services.usage_service import UsageService
+
+
+def create_usage_router(usage_service: UsageService, get_current_user: Callable) -> APIRouter:
+    router = APIRouter(prefix="/usage", tags=["usage"])
+
+    @router.get("/me", response_model=UserUsageResponse)
+    async def my_usage(limit: int = 50, user=Depends(get_current_user)):
+        return await usage_service.aget_user_usage(user["id"], limit)
+
+    @router.get("/requests/{request_id}", response_model=TokenUsageResponse)
+    async def request_usage(request_id: str, user=Depends(get_current_user)):
+        return await usage_service.aget_request_usage(request_id, user["id"])
+
+    return router
@@ -35,12 +35,23 @@ class SessionResponse(BaseModel):
     updated_at: str
 
 
+class SessionPage(BaseModel):
+    items: List[SessionResponse]
+    next_cursor: Optional[str] = None
+
+
 class SessionMessage(BaseModel):
+    id: int
     question: str
     answer: str
     created_at: str
 
 
+class SessionMessagePage(BaseModel):
+    items: List[SessionMessage]
+    next_cursor: Optional[int] = None
+
+
 class IngestRequest(BaseModel):
     reset: bool = True
 
@@ -57,6 +68,17 @@ class IngestJobResponse(BaseModel):
     updated_at: str
 
 
+class TokenUsageResponse(BaseModel):
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    embedding_tokens: int = 0
+    total_tokens: int = 0
+    llm_calls: int = 0
+    embedding_calls: int = 0
+    estimated: bool = False
+    cost_usd: float = 0.0
+
+
 class ChatRequest(BaseModel):
     question: str
     k: int = 3
@@ -67,3 +89,25 @@ class ChatResponse(BaseModel):
     answer: str
     sources: List[dict]
     session_id: Optional[int] = None
+    usage: Optional[TokenUsageResponse] = None
+
+
+class UsageTotals(BaseModel):
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    embedding_tokens: int = 0
+    total_tokens: int = 0
+    llm_calls: int = 0
+    embedding_calls: int = 0
+    estimated_requests: int = 0
+    cost_usd: float = 0.0
+
+
+class SessionUsage(UsageTotals):
+    session_id: int
+
+
+class UserUsageResponse(BaseModel):
+    totals: UsageTotals
+    sessions: List[SessionUsage]
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Measure cold start: app import time, time to /health and /ready, and first /chat latency with and without warmup."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+for path in (BACKEND_DIR, BACKEND_DIR / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from bench_offline import free_port, write_corpus  # noqa: E402
+from stub_openai_server import StubOpenAIServer  # noqa: E402
+
+# Import `app` alone, then also everything the first ingest/chat would pull in, in fresh interpreters.
+IMPORT_SNIPPETS = {
+    "app": "import app",
+    "app+rag_stack": (
+        "import app; app.rag_service.import_dependencies(); "
+        "import services.provider_clients, langchain.agents, langchain_openai"
+    ),
+}
+QUESTION = "How do ingest jobs split documents?"
+
+
+def time_import(snippet: str) -> float:
+    code = f"import time; started = time.perf_counter(); {snippet}; print((time.perf_counter() - started) * 1000)"
+    env = {**os.environ, "PASSWORD_HASH_WORKERS": "0", "LOG_LEVEL": "WARNING", "PYTHONWARNINGS": "ignore"}
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def serve(args: argparse.Namespace):
+    """Child mode: point the app at the benchmark's data, DB and index, then run uvicorn."""
+    import uvicorn
+
+    import app as backend_app_module
+    from repositories import db as db_repository
+
+    workdir = Path(args.serve_dir)
+    db_repository.AUTH_DB_PATH = workdir / "app.db"
+    backend_app_module.rag_service.data_dir = workdir / "data"
+    backend_app_module.rag_service.vector_index.root = workdir / "chroma"
+    uvicorn.run(backend_app_module.app, port=args.port, log_level="warning")
+
+
+def wait_for(client, path: str, deadline: float, status: int = 200) -> float | None:
+    while time.perf_counter() < deadline:
+        try:
+            if client.get(path).status_code == status:
+                return time.perf_counter()
+        except Exception:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def cold_start(args: argparse.Namespace, env: dict, workdir: Path, warmup: bool, prepare: bool = False) -> dict:
+    import httpx
+
+    port = free_port()
+    started = time.perf_counter()
+    child = subprocess.Popen(
+        [sys.executable, __file__, "--serve-dir", str(workdir), "--port", str(port)],
+        env={**env, "STARTUP_WARMUP_ENABLED": "true" if warmup else "false"},
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=120) as client:
+            deadline = started + args.timeout
+            healthy = wait_for(client, "/health", deadline)
+            if healthy is None:
+                raise RuntimeError("Server did not become healthy in time")
+            if prepare:
+                client.post("/ingest", json={"reset": True}).raise_for_status()
+                return {}
+            ready = wait_for(client, "/ready", deadline)
+            if ready is None:
+                raise RuntimeError(f"Server did not become ready: {client.get('/ready').json()}")
+            chats = []
+            for _ in range(2):
+                chat_started = time.perf_counter()
+                client.post("/chat", json={"question": QUESTION, "k": 3}).raise_for_status()
+                chats.append((time.perf_counter() - chat_started) * 1000)
+            snapshot = client.get("/ready").json()
+            return {
+                "health_ms": round((healthy - started) * 1000, 1),
+                "ready_ms": round((ready - started) * 1000, 1),
+                "first_chat_ms": round(chats[0], 1),
+                "second_chat_ms": round(chats[1], 1),
+                "import_cpu_ms": snapshot["import_cpu_ms"],
+                "warmup_steps_ms": {step["name"]: step["duration_ms"] for step in snapshot["steps"]},
+            }
+    finally:
+        child.terminate()
+        child.wait(30)
+
+
+def median_row(runs: list[dict]) -> dict:
+    keys = ("health_ms", "ready_ms", "first_chat_ms", "second_chat_ms", "import_cpu_ms")
+    return {key: round(statistics.median(run[key] for run in runs), 1) for key in keys}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per mode; medians are reported.")
+    parser.add_argument("--documents", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for a child to become ready.")
+    parser.add_argument("--report", default="", help="Write the results as JSON here.")
+    parser.add_argument("--serve-dir", default="", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_dir:
+        serve(args)
+        return 0
+
+    report: dict = {"config": vars(args), "import_ms": {}, "modes": {}}
+    for name, snippet in IMPORT_SNIPPETS.items():
+        report["import_ms"][name] = round(statistics.median(time_import(snippet) for _ in range(args.runs)), 1)
+        print(f"import {name:<16} {report['import_ms'][name]:>8.1f} ms")
+
+    stub = StubOpenAIServer(name="cold-start").start()
+    env = {
+        **os.environ,
+        "AI_PROVIDER": "dashscope",
+        "AI_API_KEY": "stub-key",
+        "AI_BASE_URL": stub.base_url,
+        "AI_MODEL": "stub-model",
+        "AI_EMBEDDING_MODEL": "stub-embedding",
+        "AI_HEDGE_PROVIDERS": "",
+        "ADMISSION_ENABLED": "false",
+        "FAIR_SCHEDULER_ENABLED": "false",
+        "PASSWORD_HASH_WORKERS": "0",
+        "LOG_LEVEL": "WARNING",
+        "PYTHONWARNINGS": "ignore",
+    }
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-cold-start-") as tmp:
+            workdir = Path(tmp)
+            write_corpus(workdir / "data", args.documents, 4, seed=0)
+            cold_start(args, env, workdir, warmup=False, prepare=True)
+            print(f"{'mode':<10} {'health':>9} {'ready':>9} {'1st chat':>9} {'2nd chat':>9} {'import cpu':>11}")
+            for mode, warmup in (("lazy", False), ("warmup", True)):
+                runs = [cold_start(args, env, workdir, warmup) for _ in range(args.runs)]
+                row = median_row(runs)
+                report["modes"][mode] = {**row, "runs": runs}
+                print(
+                    f"{mode:<10} {row['health_ms']:>7.1f}ms {row['ready_ms']:>7.1f}ms {row['first_chat_ms']:>7.1f}ms"
+                    f" {row['second_chat_ms']:>7.1f}ms {row['import_cpu_ms']:>9.1f}ms"
+                )
+    finally:
+        stub.stop()
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report saved to: {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Benchmark session/message history queries on a large database before and after the index migration."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from repositories import db as db_repository  # noqa: E402
+from repositories import session_repository  # noqa: E402
+
+TIMESTAMP = "2026-01-01T00:00:00+00:00"
+
+
+def seed(users: int, sessions: int, messages: int, batch: int = 50_000):
+    with db_repository.get_db() as conn:
+        conn.executemany(
+            "INSERT INTO users (id, username, password_hash, created_at) VALUES (?, ?, ?, ?)",
+            ((index, f"bench_{index}", "x", TIMESTAMP) for index in range(1, users + 1)),
+        )
+        conn.executemany(
+            "INSERT INTO chat_sessions (id, user_id, title, created_at, updated_at, memory_json) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (index, (index % users) + 1, f"session {index}", TIMESTAMP, f"2026-01-01T00:{index % 60:02d}:00", "[]")
+                for index in range(1, sessions + 1)
+            ),
+        )
+    rng = random.Random(7)
+    for start in range(0, messages, batch):
+        rows = [
+            (rng.randint(1, sessions), "What does the handbook say about refunds?", "Refunds take five days.", TIMESTAMP)
+            for _ in range(min(batch, messages - start))
+        ]
+        with db_repository.get_db() as conn:
+            conn.executemany(
+                "INSERT INTO chat_messages (session_id, question, answer, created_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+
+def time_queries(label: str, users: int, sessions: int, samples: int) -> dict[str, float]:
+    rng = random.Random(11)
+    results = {}
+    for name, call in (
+        ("list_messages_by_session", lambda: session_repository.list_messages_by_session(rng.randint(1, sessions))),
+        ("recent_messages(limit=10)", lambda: session_repository.list_messages_by_session(rng.randint(1, sessions), 10)),
+        ("list_sessions_by_user", lambda: session_repository.list_sessions_by_user(rng.randint(1, users))),
+        ("list_messages_page(50)", lambda: session_repository.list_messages_page(rng.randint(1, sessions), None, 51)),
+        ("list_sessions_page(50)", lambda: session_repository.list_sessions_page(rng.randint(1, users), None, 51)),
+    ):
+        durations = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            call()
+            durations.append((time.perf_counter() - started) * 1000)
+        results[name] = statistics.median(durations)
+        print(f"{label:<7} {name:<26} p50 {results[name]:9.3f} ms")
+    return results
+
+
+def print_plans():
+    with db_repository.get_db() as conn:
+        for sql in (
+            "SELECT question, answer, created_at FROM chat_messages WHERE session_id = 1 ORDER BY id ASC",
+            "SELECT id, title, created_at, updated_at FROM chat_sessions WHERE user_id = 1 ORDER BY updated_at DESC",
+        ):
+            plan = " | ".join(row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+            print(f"plan    {plan}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2_000_000)
+    parser.add_argument("--sessions", type=int, default=50_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--samples", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-history-") as tmp:
+        db_repository.AUTH_DB_PATH = Path(tmp) / "app.db"
+        db_repository.migrate(target=1)
+        started = time.perf_counter()
+        seed(args.users, args.sessions, args.messages)
+        print(f"seeded  {args.messages} messages in {time.perf_counter() - started:.1f}s")
+
+        before = time_queries("before", args.users, args.sessions, args.samples)
+        print_plans()
+
+        started = time.perf_counter()
+        version = db_repository.migrate()
+        print(f"migrate to v{version} in {time.perf_counter() - started:.1f}s")
+
+        after = time_queries("after", args.users, args.sessions, args.samples)
+        print_plans()
+        for name in before:
+            print(f"speedup {name:<26} {before[name] / max(after[name], 1e-6):9.1f}x")
+        db_repository.close_db()
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
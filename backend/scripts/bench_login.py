@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Measure login throughput and chat latency during a login storm, with thread vs process-pool hashing."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+# Isolate hashing cost: no admission/fair-share shedding and no failed-login throttling.
+os.environ.update({"ADMISSION_ENABLED": "false", "FAIR_SCHEDULER_ENABLED": "false", "LOGIN_MAX_FAILURES": "0"})
+
+import app as backend_app_module  # noqa: E402
+from repositories import db as db_repository  # noqa: E402
+from services.password_hasher import PasswordHasher  # noqa: E402
+
+USERNAME = "bench_login_user"
+PASSWORD = "bench-password-123"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def fake_answer_question(question, k, memory=None, request_id=None):
+    time.sleep(0.02)
+    return "bench answer", []
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def probe_chat(base_url: str, stop: threading.Event, latencies: list[float]):
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        while not stop.is_set():
+            started = time.perf_counter()
+            client.post("/chat", json={"question": "ping", "k": 1}).raise_for_status()
+            latencies.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.01)
+
+
+def storm_logins(base_url: str, stop: threading.Event, counts: dict[str, int], lock: threading.Lock):
+    with httpx.Client(base_url=base_url, timeout=60) as client:
+        while not stop.is_set():
+            status = client.post("/auth/login", json={"username": USERNAME, "password": PASSWORD}).status_code
+            with lock:
+                counts[str(status)] = counts.get(str(status), 0) + 1
+
+
+def run_phase(base_url: str, seconds: float, login_threads: int) -> tuple[list[float], dict[str, int]]:
+    stop = threading.Event()
+    latencies: list[float] = []
+    counts: dict[str, int] = {}
+    lock = threading.Lock()
+    threads = [threading.Thread(target=probe_chat, args=(base_url, stop, latencies))]
+    threads += [
+        threading.Thread(target=storm_logins, args=(base_url, stop, counts, lock)) for _ in range(login_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return latencies, counts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--login-threads", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=max((os.cpu_count() or 2) // 2, 1))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-login-") as tmp:
+        db_repository.AUTH_DB_PATH = Path(tmp) / "app.db"
+        backend_app_module.rag_service.answer_question = fake_answer_question
+        port = free_port()
+        server = uvicorn.Server(uvicorn.Config(backend_app_module.app, port=port, log_level="warning"))
+        server_thread = threading.Thread(target=server.run, daemon=True)
+        server_thread.start()
+        while not server.started:
+            time.sleep(0.05)
+        base_url = f"http://127.0.0.1:{port}"
+        httpx.post(f"{base_url}/auth/register", json={"username": USERNAME, "password": PASSWORD}).raise_for_status()
+
+        auth_service = backend_app_module.auth_service
+        default_hasher = auth_service.password_hasher
+        baseline, _ = run_phase(base_url, args.seconds / 2, login_threads=0)
+        print(f"{'idle':<14} chat p50 {percentile(baseline, 50):7.1f} ms  p95 {percentile(baseline, 95):7.1f} ms")
+
+        for label, hasher in (
+            ("threads", PasswordHasher(workers=0, max_pending=10_000)),
+            (f"pool({args.workers})", PasswordHasher(workers=args.workers, niceness=default_hasher.niceness)),
+        ):
+            hasher.warm_up()
+            auth_service.password_hasher = hasher
+            latencies, counts = run_phase(base_url, args.seconds, args.login_threads)
+            hasher.shutdown()
+            logins = counts.get("200", 0) / args.seconds
+            print(
+                f"{label:<14} chat p50 {percentile(latencies, 50):7.1f} ms  p95 {percentile(latencies, 95):7.1f} ms  "
+                f"logins {logins:6.1f}/s  statuses {counts}"
+            )
+
+        auth_service.password_hasher = default_hasher
+        server.should_exit = True
+        server_thread.join(timeout=10)
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
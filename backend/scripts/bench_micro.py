@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for per-request and per-chunk helpers, with warmup, repetition and JSON output."""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from langchain_core.documents import Document  # noqa: E402
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage  # noqa: E402
+from langchain_text_splitters import RecursiveCharacterTextSplitter  # noqa: E402
+
+from services.functional_agent_runner import FunctionalAgentRunner  # noqa: E402
+from services.rag_service import RagService  # noqa: E402
+from services.rerank_service import EmbeddingRerankService  # noqa: E402
+from services.session_service import SessionService  # noqa: E402
+
+EN_WORDS = (
+    "retention ingest alert webhook latency dashboard storage query index replica quota tenant policy export "
+    "pipeline schema sampling threshold rollup cluster region backup audit token session"
+).split()
+CJK_SENTENCES = (
+    "热存储默认保留三十天的数据。",
+    "告警引擎通过邮件和网络钩子发送通知。",
+    "摄取接口使用超文本传输安全协议和结构化数据格式。",
+    "查询延迟在高峰时段会明显上升。",
+    "每个租户都有独立的配额和访问策略。",
+)
+
+
+def english_text(rng: random.Random, sentences: int) -> str:
+    out = []
+    for _ in range(sentences):
+        words = [rng.choice(EN_WORDS) for _ in range(rng.randint(8, 20))]
+        out.append(" ".join(words).capitalize() + rng.choice(".!?"))
+    return " ".join(out)
+
+
+def cjk_text(rng: random.Random, sentences: int) -> str:
+    return "".join(rng.choice(CJK_SENTENCES) for _ in range(sentences))
+
+
+def build_inputs(seed: int, dim: int) -> dict:
+    rng = random.Random(seed)
+    docs = [
+        Document(
+            page_content=english_text(rng, 12) if index % 2 else cjk_text(rng, 30),
+            metadata={"source": f"data/doc_{index}.md", **({"page": index} if index % 3 == 0 else {})},
+        )
+        for index in range(16)
+    ]
+    memory = [
+        {"question": english_text(rng, 1), "answer": english_text(rng, 6) if turn % 2 else cjk_text(rng, 12)}
+        for turn in range(8)
+    ]
+    messages = [SystemMessage(content="system prompt " * 40)]
+    for turn in memory:
+        messages += [HumanMessage(content=turn["question"]), AIMessage(content=turn["answer"])]
+    vectors = {doc.page_content: [rng.uniform(-1, 1) for _ in range(dim)] for doc in docs}
+    return {
+        "docs": docs,
+        "memory": memory,
+        "messages": messages,
+        "dict_result": {"messages": [{"role": m.type, "content": m.content} for m in messages]},
+        "long_en": english_text(rng, 60),
+        "long_cjk": cjk_text(rng, 120),
+        "corpus_en": [Document(page_content=english_text(rng, 400))],
+        "corpus_cjk": [Document(page_content=cjk_text(rng, 1200))],
+        "question_vector": [rng.uniform(-1, 1) for _ in range(dim)],
+        "vectors": vectors,
+    }
+
+
+class CachedEmbeddings:
+    """Returns precomputed vectors so rerank timing covers scoring, not embedding."""
+
+    def __init__(self, vectors: dict[str, list[float]]):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.vectors[text] for text in texts]
+
+
+def build_cases(inputs: dict) -> dict[str, Callable[[], object]]:
+    runner = FunctionalAgentRunner(
+        llm_factory=lambda: None,
+        retrieve_documents=lambda question, k: [],
+        format_memory=RagService._format_memory,
+        format_context=RagService._format_retrieved_context,
+    )
+    reranker = EmbeddingRerankService(lambda: CachedEmbeddings(inputs["vectors"]))
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=150)
+    request = SimpleNamespace(state={"messages": inputs["messages"]})
+    docs, memory = inputs["docs"], inputs["memory"]
+    return {
+        "rag.format_retrieved_context[16 docs]": lambda: RagService._format_retrieved_context(docs),
+        "rag.format_memory[8 turns]": lambda: RagService._format_memory(memory),
+        "rag.build_sources[16 docs]": lambda: RagService.build_sources(docs),
+        "session.compact_memory_text[en]": lambda: SessionService._compact_memory_text(
+            inputs["long_en"], char_limit=280, sentence_limit=2
+        ),
+        "session.compact_memory_text[cjk]": lambda: SessionService._compact_memory_text(
+            inputs["long_cjk"], char_limit=280, sentence_limit=2
+        ),
+        "agent.extract_answer_text[messages]": lambda: runner._extract_answer_text({"messages": inputs["messages"]}),
+        "agent.extract_answer_text[dicts]": lambda: runner._extract_answer_text(inputs["dict_result"]),
+        "agent.latest_user_message": lambda: runner._latest_user_message(request),
+        "rerank.score[16 docs]": lambda: reranker.rerank("q", docs, top_k=5, question_vector=inputs["question_vector"]),
+        "splitter.split[en 40KB]": lambda: splitter.split_documents(inputs["corpus_en"]),
+        "splitter.split[cjk 20K chars]": lambda: splitter.split_documents(inputs["corpus_cjk"]),
+    }
+
+
+def measure(fn: Callable[[], object], warmup: int, repeat: int, min_time: float) -> dict:
+    """timeit-style: calibrate loops per repeat to reach `min_time`, then time `repeat` batches with GC off."""
+    for _ in range(warmup):
+        fn()
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - started >= min_time or loops >= 1_000_000:
+            break
+        loops *= 2
+    per_call_us = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter_ns()
+            for _ in range(loops):
+                fn()
+            per_call_us.append((time.perf_counter_ns() - started) / loops / 1000)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    ordered = sorted(per_call_us)
+    return {
+        "loops": loops,
+        "repeat": repeat,
+        "min_us": round(ordered[0], 3),
+        "median_us": round(statistics.median(ordered), 3),
+        "mean_us": round(statistics.fmean(ordered), 3),
+        "stdev_us": round(statistics.stdev(ordered), 3) if len(ordered) > 1 else 0.0,
+        "max_us": round(ordered[-1], 3),
+        "ops_per_second": round(1_000_000 / statistics.median(ordered), 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text.")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed calls before calibration.")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed batches per benchmark.")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Seconds per timed batch.")
+    parser.add_argument("--dim", type=int, default=1024, help="Embedding dimension for rerank scoring.")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--json", default="", help="Write results to this JSON file.")
+    args = parser.parse_args()
+
+    cases = build_cases(build_inputs(args.seed, args.dim))
+    results = {}
+    print(f"{'benchmark':<40} {'median':>11} {'min':>11} {'stdev':>9} {'ops/s':>11}")
+    for name, fn in cases.items():
+        if args.filter and args.filter not in name:
+            continue
+        stats = measure(fn, args.warmup, args.repeat, args.min_time)
+        results[name] = stats
+        print(
+            f"{name:<40} {stats['median_us']:>9.2f}us {stats['min_us']:>9.2f}us"
+            f" {stats['stdev_us']:>7.2f}us {stats['ops_per_second']:>11.1f}"
+        )
+    if args.json:
+        config = {key: value for key, value in vars(args).items() if key != "json"}
+        report = {"python": sys.version.split()[0], "config": config, "results": results}
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Results saved to: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
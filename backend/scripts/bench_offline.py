@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""Benchmark ingest and /chat offline against local stub providers, so provider time can be factored out."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+for path in (BACKEND_DIR, BACKEND_DIR / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from eval_common import parse_server_timing, percentile, summarize_stage_timings  # noqa: E402
+from perf_gate import add_gate_arguments, add_normalized, measure_reference_ms, run_gate  # noqa: E402
+from stub_openai_server import StubOpenAIServer  # noqa: E402
+
+# Stages that wait on a provider; everything else in a request is framework overhead.
+PROVIDER_STAGES = ("embed", "embed_query", "embed_documents", "llm")
+TOPICS = (
+    "vector indexes store embeddings for nearest neighbour search",
+    "session memory keeps the last turns of a conversation",
+    "rerankers reorder retrieved chunks by semantic similarity",
+    "ingest jobs split documents into overlapping chunks",
+    "provider hedging sends a backup request after a delay",
+    "admission control sheds load when latency rises",
+    "token accounting records prompt and completion usage",
+    "write behind batches chat turns into one transaction",
+)
+FILLER = "the system request latency cache index query worker batch retry budget queue stage".split()
+PASSWORD = "bench-offline-password"
+# Per-round chat figures kept in the report; the gate uses their median across rounds.
+ROUND_KEYS = ("throughput_rps", "latency_p50_ms", "latency_p95_ms", "overhead_p50_ms", "overhead_p95_ms")
+
+
+def write_corpus(data_dir: Path, documents: int, paragraphs: int, seed: int):
+    rng = random.Random(seed)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for index in range(documents):
+        topic = TOPICS[index % len(TOPICS)]
+        body = [f"# Note {index}: {topic}"]
+        for _ in range(paragraphs):
+            body.append(f"In this note {topic}. " + " ".join(rng.choice(FILLER) for _ in range(60)) + ".")
+        (data_dir / f"note_{index:04d}.md").write_text("\n\n".join(body), encoding="utf-8")
+
+
+def rss_mb() -> dict[str, float]:
+    """Current and peak resident set size from /proc; peak only (via getrusage) elsewhere."""
+    status = Path("/proc/self/status")
+    if status.exists():
+        fields = dict(line.split(":", 1) for line in status.read_text().splitlines() if ":" in line)
+        return {
+            "rss": round(int(fields["VmRSS"].split()[0]) / 1024, 1),
+            "peak": round(int(fields["VmHWM"].split()[0]) / 1024, 1),
+        }
+    try:
+        import resource
+    except ImportError:
+        return {}
+    return {"peak": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def chat_session(client, token: str, questions: list[str], k: int) -> list[dict]:
+    results, session_id = [], None
+    for question in questions:
+        payload = {"question": question, "k": k, **({"session_id": session_id} if session_id else {})}
+        started = time.perf_counter()
+        response = client.post("/chat", json=payload, headers={"Authorization": f"Bearer {token}"})
+        latency_ms = (time.perf_counter() - started) * 1000
+        timing = parse_server_timing(response.headers.get("server-timing", ""))
+        tokens = 0
+        if response.status_code == 200:
+            session_id = response.json()["session_id"]
+            tokens = (response.json().get("usage") or {}).get("total_tokens", 0)
+        provider_ms = sum(timing.get(stage, 0.0) for stage in PROVIDER_STAGES)
+        results.append(
+            {
+                "status": response.status_code,
+                "latency_ms": latency_ms,
+                "timing": timing,
+                "tokens": tokens,
+                "overhead_ms": max(timing.get("total", latency_ms) - provider_ms, 0.0),
+            }
+        )
+    return results
+
+
+def summarize_chat(results: list[dict], seconds: float) -> dict:
+    ok = [row for row in results if row["status"] == 200]
+    latencies = [row["latency_ms"] for row in ok]
+    overheads = [row["overhead_ms"] for row in ok]
+    return {
+        "requests": len(results),
+        "errors": len(results) - len(ok),
+        "throughput_rps": round(len(ok) / seconds, 2) if seconds > 0 else 0.0,
+        **{f"latency_p{p}_ms": round(percentile(latencies, p), 2) for p in (50, 95, 99)},
+        **{f"overhead_p{p}_ms": round(percentile(overheads, p), 2) for p in (50, 95)},
+        "tokens_per_request": round(sum(row["tokens"] for row in ok) / len(ok), 1) if ok else 0.0,
+        "stage_latency_ms": summarize_stage_timings([row["timing"] for row in ok]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=40, help="Synthetic markdown documents to ingest.")
+    parser.add_argument("--paragraphs", type=int, default=6, help="Paragraphs per document.")
+    parser.add_argument("--sessions", type=int, default=20, help="Chat sessions to run.")
+    parser.add_argument("--turns", type=int, default=3, help="Questions per session (later turns carry memory).")
+    parser.add_argument("--concurrency", type=int, default=4, help="Sessions in flight at once.")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured chat requests sent before the run.")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=1, help="Repeat the ingest and the chat run; timings are per-round medians.")
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Stub completion latency.")
+    parser.add_argument("--embedding-latency-ms", type=float, default=0.0, help="Stub embedding latency.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on stub latency.")
+    parser.add_argument("--rerank", action="store_true", help="Enable embedding rerank.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--report", default="", help="Optional JSON report path.")
+    add_gate_arguments(parser)
+    args = parser.parse_args()
+
+    stub = StubOpenAIServer(name="bench", seed=args.seed).start()
+    stub.latency_ms, stub.embedding_latency_ms = args.llm_latency_ms, args.embedding_latency_ms
+    stub.jitter_ms = args.jitter_ms
+    # Isolate framework cost: no shedding, fair-share limits, hedging, or process-pool hashing.
+    os.environ.update(
+        {
+            "AI_PROVIDER": "dashscope",
+            "AI_API_KEY": "stub-key",
+            "AI_BASE_URL": stub.base_url,
+            "AI_MODEL": "stub-model",
+            "AI_EMBEDDING_MODEL": "stub-embedding",
+            "AI_HEDGE_PROVIDERS": "",
+            "AI_MAX_RETRIES": "0",
+            "ADMISSION_ENABLED": "false",
+            "FAIR_SCHEDULER_ENABLED": "false",
+            # The benchmark does its own warm-up requests; a background warmup would overlap the ingest.
+            "STARTUP_WARMUP_ENABLED": "false",
+            "PASSWORD_HASH_WORKERS": "0",
+            "RAG_RERANK_ENABLED": "true" if args.rerank else "false",
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+    import httpx
+    import uvicorn
+
+    import app as backend_app_module
+    from repositories import db as db_repository
+
+    report: dict = {"config": vars(args), "memory_mb": {"start": rss_mb()}}
+    # Calibrated before and after the run, so a runner that slows down midway still gets a fair reference.
+    reference_samples = measure_reference_ms()
+    with tempfile.TemporaryDirectory(prefix="bench-offline-") as tmp:
+        db_repository.AUTH_DB_PATH = Path(tmp) / "app.db"
+        rag_service = backend_app_module.rag_service
+        rag_service.data_dir, rag_service.vector_index.root = Path(tmp) / "data", Path(tmp) / "chroma"
+        write_corpus(rag_service.data_dir, args.documents, args.paragraphs, args.seed)
+        # Heavy imports are deferred to first use; load them here so ingest timing measures ingest only.
+        rag_service.import_dependencies()
+        backend_app_module.provider_gateway.warm_up()
+
+        port = free_port()
+        server = uvicorn.Server(uvicorn.Config(backend_app_module.app, port=port, log_level="warning"))
+        server_thread = threading.Thread(target=server.run, daemon=True)
+        server_thread.start()
+        while not server.started:
+            time.sleep(0.05)
+        try:
+            with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=120) as client:
+                rounds = max(args.rounds, 1)
+                ingest_rounds = []
+                for _ in range(rounds):
+                    started = time.perf_counter()
+                    ingest = client.post("/ingest", json={"reset": True})
+                    ingest.raise_for_status()
+                    ingest_rounds.append(time.perf_counter() - started)
+                ingest_seconds = statistics.median(ingest_rounds)
+                body = ingest.json()
+                report["ingest"] = {
+                    "files": body["files"],
+                    "chunks": body["chunks"],
+                    "seconds": round(ingest_seconds, 3),
+                    "round_seconds": [round(seconds, 3) for seconds in ingest_rounds],
+                    "chunks_per_second": round(body["chunks"] / ingest_seconds, 1),
+                    "embedding_calls": stub.request_counts["embeddings"] // rounds,
+                    "embedding_tokens": (body.get("usage") or {}).get("embedding_tokens", 0),
+                    "server_timing_ms": parse_server_timing(ingest.headers.get("server-timing", "")),
+                }
+                report["memory_mb"]["after_ingest"] = rss_mb()
+
+                users = [f"bench_{index}" for index in range(max(args.concurrency, 1))]
+                tokens = []
+                for username in users:
+                    client.post("/auth/register", json={"username": username, "password": PASSWORD}).raise_for_status()
+                    login = client.post("/auth/login", json={"username": username, "password": PASSWORD})
+                    tokens.append(login.json()["access_token"])
+
+                # The first requests build the agent and warm Chroma; keep them out of the numbers.
+                chat_session(client, tokens[0], [TOPICS[0]] * args.warmup, args.k)
+                rng = random.Random(args.seed)
+                results, chat_rounds, chat_seconds = [], [], 0.0
+                for _ in range(rounds):
+                    plans = [[f"How do {rng.choice(TOPICS)}?" for _ in range(args.turns)] for _ in range(args.sessions)]
+                    started = time.perf_counter()
+                    with ThreadPoolExecutor(max_workers=max(args.concurrency, 1)) as pool:
+                        futures = [
+                            pool.submit(chat_session, client, tokens[index % len(tokens)], plan, args.k)
+                            for index, plan in enumerate(plans)
+                        ]
+                        batch = [row for future in futures for row in future.result()]
+                    seconds = time.perf_counter() - started
+                    chat_rounds.append({key: summarize_chat(batch, seconds)[key] for key in ROUND_KEYS})
+                    results, chat_seconds = results + batch, chat_seconds + seconds
+                report["chat"] = {**summarize_chat(results, chat_seconds), "rounds": chat_rounds}
+                report["chat"]["llm_calls"] = stub.request_counts["chat"] - args.warmup
+                report["memory_mb"]["after_chat"] = rss_mb()
+                if "rss" in report["memory_mb"]["start"]:
+                    growth = report["memory_mb"]["after_chat"]["rss"] - report["memory_mb"]["start"]["rss"]
+                    report["memory_mb"]["growth"] = round(growth, 1)
+                add_normalized(report, reference_samples + measure_reference_ms())
+        finally:
+            server.should_exit = True
+            server_thread.join(timeout=10)
+            stub.stop()
+
+    print(json.dumps(report, indent=2))
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if report["chat"]["errors"]:
+        return 1
+    return 0 if run_gate(report, args) else 1
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark repository calls per second with per-call connections versus the pooled WAL manager."""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from repositories import db as db_repository  # noqa: E402
+from repositories import session_repository, user_repository  # noqa: E402
+
+REPOSITORY_MODULES = (db_repository, session_repository, user_repository)
+
+
+@contextmanager
+def legacy_get_db():
+    # Mirrors the previous behaviour: a fresh rollback-journal connection per repository call.
+    conn = sqlite3.connect(db_repository.AUTH_DB_PATH)
+    conn.row_factory = sqlite3.Row
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def patched_get_db(factory):
+    originals = [module.get_db for module in REPOSITORY_MODULES]
+    for module in REPOSITORY_MODULES:
+        module.get_db = factory
+    try:
+        yield
+    finally:
+        for module, original in zip(REPOSITORY_MODULES, originals):
+            module.get_db = original
+
+
+def seed(user_count: int) -> list[tuple[int, int]]:
+    pairs = []
+    for index in range(user_count):
+        user_id = user_repository.create_user(f"bench_{index}", "x")
+        session_id = session_repository.create_session_for_user(user_id, "bench")
+        pairs.append((user_id, session_id))
+    return pairs
+
+
+def workload(pairs: list[tuple[int, int]], iterations: int, write_every: int) -> int:
+    calls = 0
+    for step in range(iterations):
+        user_id, session_id = pairs[step % len(pairs)]
+        user_repository.get_user_by_id(user_id)
+        session_repository.session_belongs_to_user(session_id, user_id)
+        session_repository.get_session_memory(session_id, user_id)
+        calls += 3
+        if write_every and step % write_every == 0:
+            session_repository.save_message(session_id, "question", "answer")
+            calls += 1
+    return calls
+
+
+def run(label: str, pairs, threads: int, iterations: int, write_every: int) -> float:
+    totals = [0] * threads
+
+    def worker(index: int):
+        totals[index] = workload(pairs, iterations, write_every)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    rate = sum(totals) / elapsed
+    print(f"{label:<8} {sum(totals):>8} calls  {elapsed:7.2f}s  {rate:10.0f} calls/s")
+    return rate
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=2000, help="Workload iterations per thread.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--write-every", type=int, default=10, help="Save a message every N iterations (0 = reads only).")
+    args = parser.parse_args()
+
+    results = {}
+    for label, factory in (("legacy", legacy_get_db), ("pooled", None)):
+        with tempfile.TemporaryDirectory(prefix=f"bench-repo-{label}-") as tmp:
+            db_repository.AUTH_DB_PATH = Path(tmp) / "app.db"
+            with patched_get_db(factory or db_repository.get_db):
+                db_repository.init_db()
+                pairs = seed(args.users)
+                results[label] = run(label, pairs, args.threads, args.iterations, args.write_every)
+            db_repository.close_db()
+
+    print(f"speedup  {results['pooled'] / results['legacy']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
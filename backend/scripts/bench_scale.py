@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Ingest and retrieval latency and RSS at several synthetic corpus sizes, one fresh process per scale point."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+for path in (BACKEND_DIR, BACKEND_DIR / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from bench_offline import rss_mb  # noqa: E402
+from corpus_gen import generate_corpus, parse_mix  # noqa: E402
+from eval_common import EvalCase  # noqa: E402
+
+RESULT_PREFIX = "SCALE_RESULT "
+
+
+def run_point(args: argparse.Namespace) -> dict:
+    """Measure one corpus size in this process; the caller runs each size in a fresh interpreter."""
+    os.environ.update({"LOG_LEVEL": "WARNING", "PASSWORD_HASH_WORKERS": "0"})
+    stub = None
+    if not args.live:
+        from stub_openai_server import StubOpenAIServer
+
+        stub = StubOpenAIServer(name="scale", embedding_dim=args.embedding_dim).start()
+        os.environ.update(
+            {
+                "AI_PROVIDER": "dashscope",
+                "AI_API_KEY": "stub-key",
+                "AI_BASE_URL": stub.base_url,
+                "AI_MODEL": "stub-model",
+                "AI_EMBEDDING_MODEL": "stub-embedding",
+                "AI_HEDGE_PROVIDERS": "",
+            }
+        )
+    import app as backend_app_module
+    from eval_retrieval import evaluate
+    from repositories import db as db_repository
+
+    rag_service = backend_app_module.rag_service
+    rag_service.rerank_enabled = args.rerank
+    # Load the deferred imports first so ingest timing and the RSS baseline exclude them.
+    rag_service.import_dependencies()
+    backend_app_module.provider_gateway.warm_up()
+    baseline_rss = rss_mb()
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-scale-") as tmp:
+            db_repository.AUTH_DB_PATH = Path(tmp) / "app.db"
+            rag_service.data_dir, rag_service.vector_index.root = Path(tmp) / "data", Path(tmp) / "chroma"
+            cases = generate_corpus(
+                rag_service.data_dir,
+                args.point,
+                args.paragraphs,
+                parse_mix(args.mix),
+                tuple(args.formats.split(",")),
+                args.cjk_ratio,
+                args.seed,
+            )
+            started = time.perf_counter()
+            ingest = rag_service.run_ingest(reset=True)
+            ingest_seconds = time.perf_counter() - started
+            after_ingest = rss_mb()
+            queries = [
+                EvalCase(case["id"], case["question"], case["expected_keywords"], case["expected_sources"])
+                for case in cases[:: max(len(cases) // args.queries, 1)][: args.queries]
+            ]
+            rag_service._retrieve_documents(queries[0].question, args.k)
+            retrieval = evaluate(rag_service, queries, args.k)
+            return {
+                "documents": args.point,
+                "chunks": ingest["chunks"],
+                "ingest_seconds": round(ingest_seconds, 2),
+                "chunks_per_second": round(ingest["chunks"] / ingest_seconds, 1),
+                "queries": len(queries),
+                **{f"retrieval_{key}": value for key, value in retrieval.items()},
+                "rss_start_mb": baseline_rss.get("rss"),
+                "rss_after_ingest_mb": after_ingest.get("rss"),
+                "rss_peak_mb": rss_mb().get("peak"),
+            }
+    finally:
+        backend_app_module.provider_gateway.shutdown()
+        if stub is not None:
+            stub.stop()
+
+
+def ascii_chart(rows: list[dict], key: str, width: int = 40) -> str:
+    top = max((row[key] or 0) for row in rows) or 1
+    lines = [f"{key} by corpus size"]
+    for row in rows:
+        value = row[key] or 0
+        lines.append(f"{row['chunks']:>10} chunks |{'#' * max(int(width * value / top), 1):<{width}}| {value}")
+    return "\n".join(lines)
+
+
+def save_plot(rows: list[dict], path: Path) -> bool:
+    try:
+        import matplotlib
+
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        return False
+    chunks = [row["chunks"] for row in rows]
+    fig, (latency_ax, rss_ax) = plt.subplots(1, 2, figsize=(11, 4))
+    for key in ("retrieval_p50_ms", "retrieval_p95_ms"):
+        latency_ax.plot(chunks, [row[key] for row in rows], marker="o", label=key)
+    latency_ax.set(xscale="log", xlabel="chunks", ylabel="ms", title="Retrieval latency")
+    latency_ax.legend()
+    rss_ax.plot(chunks, [row["rss_peak_mb"] for row in rows], marker="o")
+    rss_ax.set(xscale="log", xlabel="chunks", ylabel="MB", title="Peak RSS")
+    fig.tight_layout()
+    fig.savefig(path)
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="100,1000,5000", help="Comma-separated document counts (scale points).")
+    parser.add_argument("--paragraphs", type=int, default=8, help="Paragraphs per document (~5 chunks each at the default chunk size).")
+    parser.add_argument("--mix", default="", help="Topic weights, e.g. storage:3,alerts:1.")
+    parser.add_argument("--formats", default="txt,md,pdf")
+    parser.add_argument("--cjk-ratio", type=float, default=0.0)
+    parser.add_argument("--queries", type=int, default=50, help="QA cases sampled per scale point.")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rerank", action="store_true")
+    parser.add_argument("--embedding-dim", type=int, default=1024, help="Stub embedding dimension.")
+    parser.add_argument("--live", action="store_true", help="Use the configured provider instead of the stub.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", default="", help="Write the rows as JSON here.")
+    parser.add_argument("--plot", default="", help="Write a PNG chart here (needs matplotlib).")
+    parser.add_argument("--point", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.point:
+        print(RESULT_PREFIX + json.dumps(run_point(args)))
+        return 0
+
+    rows = []
+    child_args = [
+        *("--paragraphs", str(args.paragraphs), "--formats", args.formats, "--cjk-ratio", str(args.cjk_ratio)),
+        *("--queries", str(args.queries), "--k", str(args.k), "--embedding-dim", str(args.embedding_dim)),
+        *("--seed", str(args.seed), "--mix", args.mix),
+        *(["--rerank"] if args.rerank else []),
+        *(["--live"] if args.live else []),
+    ]
+    for size in (int(item) for item in args.sizes.split(",")):
+        child = subprocess.run(
+            [sys.executable, __file__, *child_args, "--point", str(size)],
+            capture_output=True,
+            text=True,
+        )
+        result = next((line for line in child.stdout.splitlines() if line.startswith(RESULT_PREFIX)), None)
+        if child.returncode != 0 or result is None:
+            print(child.stderr[-2000:], file=sys.stderr)
+            raise RuntimeError(f"Scale point {size} failed")
+        row = json.loads(result[len(RESULT_PREFIX) :])
+        rows.append(row)
+        print(
+            f"{row['documents']:>7} docs {row['chunks']:>8} chunks  ingest {row['chunks_per_second']:>7.1f} chunks/s"
+            f"  retrieval p50 {row['retrieval_p50_ms']:>7.1f} ms p95 {row['retrieval_p95_ms']:>7.1f} ms"
+            f"  recall {row['retrieval_recall_at_k']:.2f}  rss peak {row['rss_peak_mb']} MB"
+        )
+    print()
+    print(ascii_chart(rows, "retrieval_p95_ms"))
+    print(ascii_chart(rows, "rss_peak_mb"))
+    if args.report:
+        Path(args.report).write_text(json.dumps({"config": vars(args), "rows": rows}, indent=2), encoding="utf-8")
+    if args.plot and not save_plot(rows, Path(args.plot)):
+        print("matplotlib is not installed; skipped the PNG (the JSON report has the same data).")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Generate a deterministic synthetic corpus (.txt, .md, .pdf) with a matching QA dataset for scale tests."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+TOPICS = {
+    "storage": ("retention", "replica", "snapshot", "compaction", "tier", "volume", "archive", "bucket"),
+    "alerts": ("threshold", "webhook", "escalation", "silence", "pager", "rule", "incident", "digest"),
+    "ingest": ("pipeline", "schema", "batch", "parser", "throughput", "backfill", "queue", "payload"),
+    "billing": ("invoice", "quota", "tenant", "credit", "usage", "plan", "discount", "overage"),
+    "security": ("token", "audit", "rotation", "scope", "policy", "encryption", "session", "role"),
+}
+FILLER = (
+    "the platform team reviewed the change and agreed to keep the default behaviour for existing customers",
+    "operators should confirm the setting in the admin console before rolling it out to every region",
+    "this section was updated after the last incident review to clarify the expected behaviour",
+    "a follow up ticket tracks the remaining work and the dashboard links to the latest numbers",
+    "in most deployments the default is sufficient and only large tenants need to adjust it",
+)
+CJK_FILLER = (
+    "平台团队评审了这项变更并同意保留默认行为。",
+    "运维人员在全量发布前应先在管理控制台确认该配置。",
+    "该章节在上次事故复盘后进行了更新以说明预期行为。",
+)
+UNITS = ("days", "hours", "minutes", "requests", "gigabytes")
+
+
+def parse_mix(raw: str) -> dict[str, float]:
+    """`storage:3,alerts:1` -> weights; an empty string weights every topic equally."""
+    if not raw:
+        return {topic: 1.0 for topic in TOPICS}
+    mix = {}
+    for item in raw.split(","):
+        topic, _, weight = item.strip().partition(":")
+        if topic not in TOPICS:
+            raise ValueError(f"Unknown topic {topic!r}; choose from {', '.join(TOPICS)}")
+        mix[topic] = float(weight or 1)
+    return mix
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, lines: list[str], lines_per_page: int = 48):
+    """Minimal text-only PDF (Helvetica, Latin-1) that pypdf can extract, so no PDF library is needed."""
+    pages = [lines[i : i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[""]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", "", "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in pages:
+        text = "".join(f"({_pdf_escape(line)}) Tj T* " for line in page)
+        stream = f"BT /F1 10 Tf 12 TL 50 780 Td {text}ET"
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    path.write_bytes(bytes(out))
+
+
+def generate_corpus(
+    out_dir: Path,
+    documents: int,
+    paragraphs: int = 8,
+    mix: dict[str, float] | None = None,
+    formats: tuple[str, ...] = ("txt", "md", "pdf"),
+    cjk_ratio: float = 0.0,
+    seed: int = 0,
+) -> list[dict]:
+    """Write `documents` files under `out_dir` and return one QA case per document.
+
+    Every document states one unique fact ("The <code> <term> limit is <n> <unit>.")
+    buried among topic filler, so each QA case has exactly one correct source.
+    """
+    rng = random.Random(seed)
+    mix = mix or parse_mix("")
+    topics, weights = list(mix), list(mix.values())
+    out_dir.mkdir(parents=True, exist_ok=True)
+    cases = []
+    for index in range(documents):
+        topic = rng.choices(topics, weights)[0]
+        term, unit, value = rng.choice(TOPICS[topic]), rng.choice(UNITS), rng.randint(2, 9999)
+        code = f"{topic[:3].upper()}-{index:06d}"
+        fact = f"The {code} {term} limit is {value} {unit}."
+        fmt = formats[index % len(formats)]
+        # PDFs use the core Helvetica font, so they stay Latin-only.
+        use_cjk = fmt != "pdf" and rng.random() < cjk_ratio
+        body = []
+        fact_at = rng.randrange(paragraphs)
+        for paragraph in range(paragraphs):
+            words = " ".join(rng.choice(TOPICS[topic]) for _ in range(12))
+            if use_cjk:
+                filler = "".join(rng.choices(CJK_FILLER, k=6))
+            else:
+                filler = ". ".join(line.capitalize() for line in rng.choices(FILLER, k=4)) + "."
+            sentence = f"{filler} Notes on {words}."
+            body.append(f"{fact} {sentence}" if paragraph == fact_at else sentence)
+        name = f"{topic}_{index:06d}.{fmt}"
+        title = f"{topic.title()} note {code}"
+        if fmt == "md":
+            text = f"# {title}\n\n" + "\n\n".join(f"## Section {i + 1}\n\n{p}" for i, p in enumerate(body))
+            (out_dir / name).write_text(text, encoding="utf-8")
+        elif fmt == "pdf":
+            lines = [title, ""] + [line for p in body for line in _wrap(p, 95) + [""]]
+            write_pdf(out_dir / name, lines)
+        else:
+            (out_dir / name).write_text(title + "\n\n" + "\n\n".join(body), encoding="utf-8")
+        cases.append(
+            {
+                "id": f"synthetic_{index:06d}",
+                "question": f"What is the {term} limit for {code}?",
+                "expected_keywords": [str(value), unit],
+                "expected_sources": [name],
+            }
+        )
+    return cases
+
+
+def _wrap(text: str, width: int) -> list[str]:
+    lines, current = [], ""
+    for word in text.split():
+        if current and len(current) + len(word) + 1 > width:
+            lines.append(current)
+            current = word
+        else:
+            current = f"{current} {word}".strip()
+    return lines + ([current] if current else [])
+
+
+def write_qa(path: Path, cases: list[dict], limit: int = 0):
+    rng = random.Random(len(cases))
+    sample = rng.sample(cases, min(limit, len(cases))) if limit else cases
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(json.dumps(case, ensure_ascii=False) + "\n" for case in sample), encoding="utf-8")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--out", required=True, help="Directory to write the corpus into.")
+    parser.add_argument("--documents", type=int, default=100)
+    parser.add_argument("--paragraphs", type=int, default=8, help="Paragraphs per document (~350 chars each).")
+    parser.add_argument("--mix", default="", help="Topic weights, e.g. storage:3,alerts:1 (default: uniform).")
+    parser.add_argument("--formats", default="txt,md,pdf", help="Comma-separated formats, assigned round-robin.")
+    parser.add_argument("--cjk-ratio", type=float, default=0.0, help="Share of txt/md documents with CJK filler.")
+    parser.add_argument("--qa", default="", help="Write a QA dataset (run_eval/eval_retrieval format) here.")
+    parser.add_argument("--qa-limit", type=int, default=0, help="Sample this many QA cases (0 = one per document).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    formats = tuple(fmt.strip() for fmt in args.formats.split(",") if fmt.strip())
+    if set(formats) - {"txt", "md", "pdf"}:
+        parser.error("--formats accepts txt, md and pdf")
+    cases = generate_corpus(
+        Path(args.out), args.documents, args.paragraphs, parse_mix(args.mix), formats, args.cjk_ratio, args.seed
+    )
+    if args.qa:
+        write_qa(Path(args.qa), cases, args.qa_limit)
+    print(f"Wrote {args.documents} documents to {args.out}" + (f" and QA cases to {args.qa}" if args.qa else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
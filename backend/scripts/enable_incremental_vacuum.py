@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Offline maintenance: switch an existing database to incremental auto-vacuum with one full VACUUM.
+
+Stop every app worker first. The VACUUM holds an exclusive lock for its whole
+run and temporarily needs about as much free disk space as the database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from repositories import archive_repository  # noqa: E402
+from repositories import db as db_repository  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=str(db_repository.AUTH_DB_PATH), help="SQLite database to convert.")
+    args = parser.parse_args()
+
+    path = Path(args.db)
+    if not path.exists():
+        print(f"Database not found: {path}", file=sys.stderr)
+        return 1
+    db_repository.AUTH_DB_PATH = path
+    try:
+        before = archive_repository.incremental_vacuum(0)
+        if before["auto_vacuum"] == 2:
+            print(f"{path} already uses incremental auto-vacuum ({before['free_pages']} free pages).")
+            return 0
+        size_before = path.stat().st_size
+        archive_repository.enable_incremental_vacuum()
+        after = archive_repository.incremental_vacuum(0)
+    finally:
+        db_repository.close_db()
+    print(
+        f"{path}: auto_vacuum {before['auto_vacuum']} -> {after['auto_vacuum']}, "
+        f"{size_before / 1e6:.1f} MB -> {path.stat().st_size / 1e6:.1f} MB"
+    )
+    return 0 if after["auto_vacuum"] == 2 else 1
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,140 @@
+"""Shared helpers for the evaluation scripts: dataset loading, HTTP calls, scoring, and timing summaries."""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+from urllib import request
+
+
+@dataclass
+class EvalCase:
+    case_id: str
+    question: str
+    expected_keywords: list[str]
+    expected_sources: list[str]
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    rank = int(math.ceil((p / 100.0) * len(values))) - 1
+    rank = max(0, min(rank, len(values) - 1))
+    return sorted(values)[rank]
+
+
+def post_json_with_headers(
+    url: str, payload: dict[str, Any], token: Optional[str] = None
+) -> tuple[dict[str, Any], dict[str, str]]:
+    body = json.dumps(payload).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    req = request.Request(url, data=body, headers=headers, method="POST")
+    with request.urlopen(req, timeout=60) as resp:
+        # Header names are lower-cased so lookups do not depend on the server's casing.
+        return json.loads(resp.read().decode("utf-8")), {key.lower(): value for key, value in resp.headers.items()}
+
+
+def post_json(url: str, payload: dict[str, Any], token: Optional[str] = None) -> dict[str, Any]:
+    return post_json_with_headers(url, payload, token)[0]
+
+
+def login(api_base: str, username: str, password: str) -> str:
+    data = post_json(
+        f"{api_base}/auth/login",
+        {"username": username, "password": password},
+    )
+    token = data.get("access_token")
+    if not token:
+        raise RuntimeError("Login succeeded but access_token is missing.")
+    return token
+
+
+def load_cases(path: Path) -> list[EvalCase]:
+    rows: list[EvalCase] = []
+    with path.open("r", encoding="utf-8") as f:
+        for idx, line in enumerate(f, start=1):
+            raw = line.strip()
+            if not raw:
+                continue
+            item = json.loads(raw)
+            case_id = item.get("id")
+            question = item.get("question")
+            expected_keywords = item.get("expected_keywords", [])
+            expected_sources = item.get("expected_sources", [])
+            if not case_id or not question or not isinstance(expected_keywords, list):
+                raise ValueError(f"Invalid dataset row {idx}: missing required fields")
+            rows.append(
+                EvalCase(
+                    case_id=str(case_id),
+                    question=str(question),
+                    expected_keywords=[str(x).lower() for x in expected_keywords],
+                    expected_sources=[str(x).lower() for x in expected_sources],
+                )
+            )
+    if not rows:
+        raise ValueError("Dataset is empty.")
+    return rows
+
+
+def evaluate_answer(case: EvalCase, answer: str, sources: list[str]) -> tuple[bool, Optional[bool], list[str]]:
+    lower_answer = answer.lower()
+    missing_keywords = [kw for kw in case.expected_keywords if kw not in lower_answer]
+    keyword_pass = len(missing_keywords) == 0
+
+    citation_pass: Optional[bool] = None
+    if case.expected_sources:
+        citation_pass = any(
+            expected in source.lower()
+            for expected in case.expected_sources
+            for source in sources
+        )
+
+    final_pass = keyword_pass and (citation_pass is not False)
+    return final_pass, citation_pass, missing_keywords
+
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    """Parse `name;dur=1.2, other;dur=3` into {name: milliseconds}; entries without dur are skipped."""
+    timings: dict[str, float] = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                try:
+                    timings[name] = timings.get(name, 0.0) + float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+def summarize_stage_timings(rows: list[dict[str, float]]) -> dict[str, dict[str, float]]:
+    samples: dict[str, list[float]] = {}
+    for row in rows:
+        for stage, duration in row.items():
+            samples.setdefault(stage, []).append(duration)
+    return {
+        stage: {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+        }
+        for stage, values in samples.items()
+    }
+
+
+def score_retrieval(case: EvalCase, sources: list[str]) -> tuple[float, float]:
+    """Recall of the expected sources among `sources` (in rank order) and the reciprocal rank of the first hit."""
+    lowered = [source.lower() for source in sources]
+    found = [expected for expected in case.expected_sources if any(expected in source for source in lowered)]
+    recall = len(found) / len(case.expected_sources) if case.expected_sources else 0.0
+    first_hit = next(
+        (rank for rank, source in enumerate(lowered, start=1) if any(exp in source for exp in case.expected_sources)),
+        None,
+    )
+    return recall, (1.0 / first_hit if first_hit else 0.0)
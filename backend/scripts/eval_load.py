@@ -0,0 +1,233 @@
+"""Load mode for run_eval.py: closed- or open-loop traffic against /chat with latency reported over time."""
+
+from __future__ import annotations
+
+import itertools
+import math
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+from urllib import error
+
+from eval_common import (
+    EvalCase,
+    login,
+    parse_server_timing,
+    percentile,
+    post_json,
+    post_json_with_headers,
+    summarize_stage_timings,
+)
+
+
+@dataclass
+class LoadConfig:
+    concurrency: int = 8
+    qps: float = 0.0  # 0 runs closed-loop: each worker sends its next request as soon as the last one returns.
+    duration_seconds: float = 60.0
+    ramp_up_seconds: float = 0.0
+    window_seconds: float = 5.0
+    anon_ratio: float = 0.0
+    session_turns: int = 3
+    k: int = 3
+    seed: int = 0
+
+
+@dataclass
+class LoadSample:
+    offset_seconds: float
+    completed_seconds: float
+    latency_ms: float
+    service_ms: float
+    status: int
+    kind: str
+    server_timing: dict[str, float]
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+
+class SessionPool:
+    """Hands out virtual sessions: authenticated ones keep a session id for `turns` questions, anonymous ones are single-shot."""
+
+    def __init__(self, tokens: list[str], anon_ratio: float, turns: int, seed: int):
+        self.tokens = itertools.cycle(tokens) if tokens else None
+        self.anon_ratio = 1.0 if not tokens else min(max(anon_ratio, 0.0), 1.0)
+        self.turns = max(turns, 1)
+        self._idle: deque[dict] = deque()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def checkout(self) -> dict:
+        with self._lock:
+            if self._random.random() < self.anon_ratio:
+                return {"token": None, "session_id": None, "turn": 0}
+            if self._idle:
+                return self._idle.popleft()
+            return {"token": next(self.tokens), "session_id": None, "turn": 0}
+
+    def checkin(self, session: dict, session_id: Optional[int]):
+        if session["token"] is None:
+            return
+        session["session_id"] = session_id
+        session["turn"] += 1
+        if session_id is not None and session["turn"] < self.turns:
+            with self._lock:
+                self._idle.append(session)
+
+
+def register_users(api_base: str, count: int, password: str = "load-test-password") -> list[str]:
+    """Create `count` throwaway users so fair-share scheduling sees distinct identities; returns their tokens."""
+    prefix = f"load_{uuid.uuid4().hex[:8]}"
+    tokens = []
+    for index in range(count):
+        username = f"{prefix}_{index}"
+        post_json(f"{api_base}/auth/register", {"username": username, "password": password})
+        tokens.append(login(api_base, username, password))
+    return tokens
+
+
+class LoadRunner:
+    def __init__(self, api_base: str, cases: list[EvalCase], config: LoadConfig, tokens: list[str]):
+        self.api_base = api_base
+        self.cases = cases
+        self.config = config
+        self.sessions = SessionPool(tokens, config.anon_ratio, config.session_turns, config.seed)
+        self.samples: list[LoadSample] = []
+        self._questions = itertools.cycle(cases)
+        self._lock = threading.Lock()
+        self._origin = 0.0
+
+    def _send(self, scheduled: float):
+        session = self.sessions.checkout()
+        kind = "anonymous" if session["token"] is None else ("follow_up" if session["session_id"] else "first_turn")
+        with self._lock:
+            case = next(self._questions)
+        payload = {"question": case.question, "k": self.config.k}
+        if session["session_id"] is not None:
+            payload["session_id"] = session["session_id"]
+        started = time.perf_counter()
+        status, timing, message, session_id = 200, {}, None, session["session_id"]
+        try:
+            body, headers = post_json_with_headers(f"{self.api_base}/chat", payload, token=session["token"])
+            timing = parse_server_timing(headers.get("server-timing", ""))
+            session_id = body.get("session_id")
+        except error.HTTPError as exc:
+            status, message = exc.code, exc.read().decode("utf-8", errors="ignore")[:200]
+        except Exception as exc:
+            status, message = 0, str(exc)[:200]
+        ended = time.perf_counter()
+        self.sessions.checkin(session, session_id if status == 200 else None)
+        # Open-loop latency counts from the scheduled send time, so client-side queueing is not hidden.
+        sample = LoadSample(
+            offset_seconds=scheduled - self._origin,
+            completed_seconds=ended - self._origin,
+            latency_ms=(ended - scheduled) * 1000,
+            service_ms=(ended - started) * 1000,
+            status=status,
+            kind=kind,
+            server_timing=timing,
+            error=message,
+        )
+        with self._lock:
+            self.samples.append(sample)
+
+    def _arrival_offset(self, index: int) -> float:
+        """Send time of the index-th request when the rate ramps linearly from 0 to qps over the ramp-up."""
+        qps, ramp = self.config.qps, self.config.ramp_up_seconds
+        ramp_arrivals = qps * ramp / 2
+        if ramp > 0 and index < ramp_arrivals:
+            return math.sqrt(2 * ramp * index / qps)
+        return ramp + (index - ramp_arrivals) / qps
+
+    def _run_open_loop(self, deadline: float):
+        with ThreadPoolExecutor(max_workers=max(self.config.concurrency, 1), thread_name_prefix="load") as pool:
+            for index in itertools.count():
+                scheduled = self._origin + self._arrival_offset(index)
+                if scheduled >= deadline:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self._send, scheduled)
+
+    def _run_closed_loop(self, deadline: float):
+        workers = max(self.config.concurrency, 1)
+
+        def worker(index: int):
+            time.sleep(self.config.ramp_up_seconds * index / workers)
+            while time.perf_counter() < deadline:
+                self._send(time.perf_counter())
+
+        threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run(self) -> dict:
+        self._origin = time.perf_counter()
+        deadline = self._origin + self.config.duration_seconds
+        if self.config.qps > 0:
+            self._run_open_loop(deadline)
+        else:
+            self._run_closed_loop(deadline)
+        return self.report(time.perf_counter() - self._origin)
+
+    def report(self, elapsed_seconds: float) -> dict:
+        samples = sorted(self.samples, key=lambda sample: sample.offset_seconds)
+        window = max(self.config.window_seconds, 0.1)
+        windows = []
+        for start in range(math.ceil(elapsed_seconds / window)):
+            low, high = start * window, (start + 1) * window
+            # Latency is bucketed by send time, throughput by completion time.
+            row = summarize_samples([s for s in samples if low <= s.offset_seconds < high], window)
+            row["throughput_rps"] = round(sum(1 for s in samples if s.ok and low <= s.completed_seconds < high) / window, 2)
+            windows.append({"start_s": round(low, 2), **row})
+        status_counts: dict[str, int] = {}
+        for sample in samples:
+            status_counts[str(sample.status)] = status_counts.get(str(sample.status), 0) + 1
+        return {
+            "mode": "open_loop" if self.config.qps > 0 else "closed_loop",
+            "config": vars(self.config),
+            "elapsed_seconds": round(elapsed_seconds, 2),
+            "overall": summarize_samples(samples, elapsed_seconds),
+            "by_kind": {
+                kind: summarize_samples([s for s in samples if s.kind == kind], elapsed_seconds)
+                for kind in sorted({s.kind for s in samples})
+            },
+            "status_counts": status_counts,
+            "stage_latency_ms": summarize_stage_timings([s.server_timing for s in samples if s.server_timing]),
+            "errors": sorted({s.error for s in samples if s.error})[:10],
+            "windows": windows,
+        }
+
+
+def summarize_samples(samples: list[LoadSample], seconds: float) -> dict:
+    ok = [sample.latency_ms for sample in samples if sample.ok]
+    errors = len(samples) - len(ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(ok) / seconds, 2) if seconds > 0 else 0.0,
+        **{f"p{p}_ms": round(percentile(ok, p), 2) for p in (50, 90, 95, 99)},
+        "service_p95_ms": round(percentile([sample.service_ms for sample in samples if sample.ok], 95), 2),
+    }
+
+
+def format_windows(report: dict) -> str:
+    lines = [f"{'t(s)':>7} {'req':>6} {'err%':>6} {'rps':>7} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8}"]
+    for row in report["windows"]:
+        lines.append(
+            f"{row['start_s']:>7.1f} {row['requests']:>6} {row['error_rate'] * 100:>6.1f} {row['throughput_rps']:>7.2f}"
+            f" {row['p50_ms']:>8.1f} {row['p90_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+        )
+    return "\n".join(lines)
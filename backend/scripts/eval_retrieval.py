@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Retrieval-only evaluation: recall@k and MRR against expected_sources, swept over retrieval and chunking settings."""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+for path in (BACKEND_DIR, BACKEND_DIR / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from eval_common import EvalCase, load_cases, percentile, score_retrieval  # noqa: E402
+from services.rag_service import RagService  # noqa: E402
+
+DEFAULT_DATASET = ROOT / "backend" / "eval" / "qa_dataset.jsonl"
+DEFAULT_REPORT = ROOT / "backend" / "eval" / "last_retrieval_report.json"
+
+
+def int_list(raw: str) -> list[int]:
+    return [int(item) for item in raw.split(",") if item.strip()]
+
+
+def chunking_list(raw: str) -> list[tuple[int, int]]:
+    # RagService clamps out-of-range values, which would label a row with settings it never ran.
+    pairs = []
+    for item in raw.split(","):
+        size, _, overlap = item.strip().partition(":")
+        pair = (int(size), int(overlap or 0))
+        error = RagService.chunking_error(*pair)
+        if error:
+            raise argparse.ArgumentTypeError(f"{item.strip()}: {error}")
+        pairs.append(pair)
+    return pairs
+
+
+def evaluate(rag_service, cases: list[EvalCase], k: int) -> dict:
+    recalls, reciprocal_ranks, latencies = [], [], []
+    for case in cases:
+        started = time.perf_counter()
+        docs = rag_service._retrieve_documents(case.question, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recall, reciprocal_rank = score_retrieval(case, [str(doc.metadata.get("source", "")) for doc in docs])
+        recalls.append(recall)
+        reciprocal_ranks.append(reciprocal_rank)
+    return {
+        "recall_at_k": round(sum(recalls) / len(recalls), 4),
+        "mrr": round(sum(reciprocal_ranks) / len(reciprocal_ranks), 4),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+    }
+
+
+def mark_pareto(rows: list[dict], objective: str):
+    """Flag configs that no other config beats on both quality (higher) and p95 latency (lower)."""
+    for row in rows:
+        row["pareto"] = not any(
+            other[objective] >= row[objective]
+            and other["p95_ms"] <= row["p95_ms"]
+            and (other[objective] > row[objective] or other["p95_ms"] < row["p95_ms"])
+            for other in rows
+        )
+
+
+def format_table(rows: list[dict], objective: str) -> str:
+    header = f"{'':2}{'chunk':>6} {'ovl':>4} {'k':>3} {'rerank':>6} {'fetch':>5} {'recall':>7} {'mrr':>6} {'p50':>8} {'p95':>8}"
+    lines = [header]
+    for row in sorted(rows, key=lambda item: (item["p95_ms"], -item[objective])):
+        lines.append(
+            f"{'*' if row['pareto'] else ' ':2}{row['chunk_size']:>6} {row['chunk_overlap']:>4} {row['k']:>3}"
+            f" {'on' if row['rerank'] else 'off':>6} {row['fetch_k'] or '-':>5} {row['recall_at_k']:>7.3f}"
+            f" {row['mrr']:>6.3f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f}"
+        )
+    lines.append(f"* = Pareto-optimal on {objective} vs p95 latency")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dataset", default=str(DEFAULT_DATASET), help="Path to JSONL eval dataset.")
+    parser.add_argument("--k", default="3,5", help="Comma-separated top-k values.")
+    parser.add_argument("--rerank", default="off,on", help="Comma-separated rerank settings (off, on).")
+    parser.add_argument("--fetch-k", default="8,16", help="Comma-separated rerank_fetch_k values (rerank on only).")
+    parser.add_argument(
+        "--chunking",
+        type=chunking_list,
+        default="1000:150",
+        help=f"Comma-separated chunk_size:overlap pairs (size >= {RagService.MIN_CHUNK_SIZE}, 0 <= overlap <= size // 2).",
+    )
+    parser.add_argument("--objective", choices=("recall_at_k", "mrr"), default="recall_at_k")
+    parser.add_argument("--stub", action="store_true", help="Use the local stub provider (hash embeddings) offline.")
+    parser.add_argument("--report", default=str(DEFAULT_REPORT), help="Output JSON report path.")
+    args = parser.parse_args()
+
+    cases = [case for case in load_cases(Path(args.dataset)) if case.expected_sources]
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+    stub = None
+    if args.stub:
+        from stub_openai_server import StubOpenAIServer
+
+        stub = StubOpenAIServer(name="retrieval-eval").start()
+        os.environ.update({"AI_API_KEY": "stub-key", "AI_BASE_URL": stub.base_url, "AI_HEDGE_PROVIDERS": ""})
+    import app as backend_app_module
+
+    rag_service = backend_app_module.rag_service
+    rows: list[dict] = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="eval-retrieval-") as tmp:
+            for chunk_size, chunk_overlap in args.chunking:
+                rag_service.chunk_size, rag_service.chunk_overlap = chunk_size, chunk_overlap
+                rag_service.vector_index.root = Path(tmp) / f"chroma_{chunk_size}_{chunk_overlap}"
+                ingest = rag_service.run_ingest(reset=True)
+                print(f"Indexed {ingest['chunks']} chunks with chunk_size={chunk_size} overlap={chunk_overlap}")
+                rag_service._retrieve_documents(cases[0].question, 1)  # warm the fresh index before timing
+                settings = [(False, None)] + [(True, fetch_k) for fetch_k in int_list(args.fetch_k)]
+                settings = [item for item in settings if ("on" if item[0] else "off") in args.rerank.split(",")]
+                for k, (rerank, fetch_k) in itertools.product(int_list(args.k), settings):
+                    rag_service.rerank_enabled, rag_service.rerank_fetch_k = rerank, fetch_k or 1
+                    row = {"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "k": k, "rerank": rerank}
+                    rows.append({**row, "fetch_k": fetch_k, **evaluate(rag_service, cases, k)})
+            rag_service.vector_index.close()
+    finally:
+        backend_app_module.provider_gateway.shutdown()
+        if stub is not None:
+            stub.stop()
+
+    mark_pareto(rows, args.objective)
+    print(format_table(rows, args.objective))
+    report_path = Path(args.report)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps({"dataset": args.dataset, "cases": len(cases), "rows": rows}, indent=2))
+    print(f"Report saved to: {report_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
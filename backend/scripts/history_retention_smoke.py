@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Verify that expired chat history is archived, removed from SQLite, and still readable through pagination."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from core.file_lock import InterProcessLock  # noqa: E402
+from repositories import archive_repository  # noqa: E402
+from repositories import db as db_repository  # noqa: E402
+from repositories import session_repository, user_repository  # noqa: E402
+from repositories.async_db import shutdown_db_executor  # noqa: E402
+from services.history_retention import HistoryRetentionJob  # noqa: E402
+from services.session_service import SessionService  # noqa: E402
+
+
+def seed_history(user_id: int, session_id: int, old: int, recent: int):
+    messages = [
+        {
+            "session_id": session_id,
+            "question": f"old question {index}",
+            "answer": "old answer",
+            "memory_turn": None,
+            "created_at": f"2020-01-01T00:00:{index % 60:02d}+00:00",
+        }
+        for index in range(old)
+    ]
+    session_repository.save_messages(messages)
+    for index in range(recent):
+        session_repository.save_message(session_id, f"recent question {index}", "recent answer")
+
+
+async def read_all_pages(service: SessionService, session_id: int, user_id: int, limit: int) -> list[str]:
+    questions: list[str] = []
+    cursor = None
+    while True:
+        items, cursor = await service.alist_messages_page(session_id, user_id, before_id=cursor, limit=limit)
+        questions = [item["question"] for item in items] + questions
+        if cursor is None:
+            return questions
+
+
+def main() -> int:
+    logger = logging.getLogger("history_retention_smoke")
+    with tempfile.TemporaryDirectory(prefix="retention-smoke-") as tmp:
+        db_repository.AUTH_DB_PATH = Path(tmp) / "app.db"
+        archive_dir = Path(tmp) / "archive"
+        db_repository.init_db()
+        user_id = user_repository.create_user("retention_user", "x")
+        session_id = session_repository.create_session_for_user(user_id, "retention")
+        seed_history(user_id, session_id, old=120, recent=3)
+
+        job = HistoryRetentionJob(logger=logger, archive_dir=archive_dir, retention_days=30, batch_size=50)
+        # Another worker holding the archive lock makes this worker skip its run.
+        with InterProcessLock(archive_repository.lock_path(archive_dir)):
+            skipped = job.run_once()
+        if not skipped.get("skipped") or len(session_repository.list_messages_by_session(session_id)) != 123:
+            raise AssertionError(f"Expected the run to be skipped while another worker holds the lock, got {skipped}")
+        result = job.run_once()
+        if result["archived"] != 120:
+            raise AssertionError(f"Expected 120 archived messages, got {result}")
+        if len(session_repository.list_messages_by_session(session_id)) != 3:
+            raise AssertionError("Expected only recent messages to stay in the hot table")
+        if result["auto_vacuum"] != 2:
+            raise AssertionError("Expected a fresh database to use incremental auto-vacuum")
+        if archive_repository.archive_files(archive_dir) != [archive_repository.archive_path(archive_dir, user_id, session_id)]:
+            raise AssertionError("Expected one archive file for the session")
+
+        service = SessionService(archive_dir=archive_dir)
+        questions = asyncio.run(read_all_pages(service, session_id, user_id, limit=25))
+        expected = [f"old question {index}" for index in range(120)] + [f"recent question {index}" for index in range(3)]
+        if questions != expected:
+            raise AssertionError("Paged history across hot and archived messages is incomplete or out of order")
+
+        second = job.run_once()
+        snapshot = job.snapshot()
+        if second["archived"] != 0 or snapshot["runs"] != 2 or snapshot["skipped_locked"] != 1:
+            raise AssertionError(f"Unexpected retention metrics: {snapshot}")
+        if snapshot["archive_files_bytes"] <= 0:
+            raise AssertionError("Expected a non-empty archive file")
+
+        shutdown_db_executor()
+        db_repository.close_db()
+
+    print("History retention smoke passed: lock, archive, delete, vacuum, and archived pagination are healthy.")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Verify the ingest lock, index hot-reload, append segments, and reader leases across RagService instances."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+for path in (BACKEND_DIR, BACKEND_DIR / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from core.file_lock import InterProcessLock  # noqa: E402
+from core.providers import ProviderEndpoint  # noqa: E402
+from repositories import index_repository  # noqa: E402
+from services.provider_gateway import ProviderGateway  # noqa: E402
+from services.rag_service import RagService  # noqa: E402
+from services.vector_index import INDEX_RELOADS_TOTAL  # noqa: E402
+from stub_openai_server import StubOpenAIServer  # noqa: E402
+
+# Tries the ingest lock with a short timeout from another process; exit 3 means it was held.
+LOCK_PROBE = """
+import sys
+from pathlib import Path
+sys.path.insert(0, sys.argv[2])
+from core.file_lock import FileLockTimeout, InterProcessLock
+try:
+    InterProcessLock(Path(sys.argv[1])).acquire(timeout=0.3)
+except FileLockTimeout:
+    sys.exit(3)
+"""
+
+
+def lock_held_elsewhere(lock_file: Path) -> bool:
+    probe = subprocess.run([sys.executable, "-c", LOCK_PROBE, str(lock_file), str(BACKEND_DIR)])
+    if probe.returncode not in (0, 3):
+        raise AssertionError(f"Lock probe crashed with exit code {probe.returncode}")
+    return probe.returncode == 3
+
+
+def sources(rag_service: RagService, question: str) -> set[str]:
+    return {Path(doc.metadata["source"]).name for doc in rag_service._retrieve_documents(question, 5)}
+
+
+def generations(root: Path) -> list[str]:
+    return sorted(path.name for path in root.iterdir() if path.name.startswith(index_repository.GENERATION_PREFIX))
+
+
+def main() -> int:
+    stub = StubOpenAIServer(name="index").start()
+    endpoint = ProviderEndpoint("dashscope", "stub-key", stub.base_url, "stub-model", "stub-embedding")
+    gateway = ProviderGateway(endpoints=[endpoint], ai_max_retries=0)
+    try:
+        with tempfile.TemporaryDirectory(prefix="index-reload-smoke-") as tmp:
+            data_dir, root = Path(tmp) / "data", Path(tmp) / "chroma"
+            data_dir.mkdir()
+            # Two services over one root stand in for two uvicorn workers: they share nothing but the files.
+            writer = RagService(data_dir, root, gateway)
+            reader = RagService(data_dir, root, gateway)
+
+            (data_dir / "alpha.md").write_text("Alpha retention keeps hot data for thirty days.", encoding="utf-8")
+            writer.run_ingest(reset=True)
+            if sources(reader, "alpha retention") != {"alpha.md"}:
+                raise AssertionError("Reader should open the first published generation")
+            [first_generation] = index_repository.current_segments(root)
+
+            (data_dir / "alpha.md").unlink()
+            (data_dir / "beta.md").write_text("Beta alerts page the on-call engineer.", encoding="utf-8")
+            reloads_before = INDEX_RELOADS_TOTAL.value()
+            with reader.vector_index.reading():
+                # An in-flight query leases the first generation, so two reingests must not delete it.
+                writer.run_ingest(reset=True)
+                writer.run_ingest(reset=True)
+                if first_generation not in generations(root):
+                    raise AssertionError("A generation leased by an in-flight reader must survive pruning")
+            if sources(reader, "beta alerts") != {"beta.md"}:
+                raise AssertionError("Reader should reopen the index after another instance's reingest")
+            if INDEX_RELOADS_TOTAL.value() != reloads_before + 1:
+                raise AssertionError("Expected exactly one index reload on the reader")
+            [beta_generation] = index_repository.current_segments(root)
+
+            (data_dir / "beta.md").unlink()
+            (data_dir / "gamma.md").write_text("Gamma ingest batches payloads by schema.", encoding="utf-8")
+            writer.run_ingest(reset=False)
+            if index_repository.current_segments(root)[:1] != [beta_generation]:
+                raise AssertionError("Append ingest should publish a new segment after the existing one, not a copy")
+            if sources(reader, "alerts payload") != {"beta.md", "gamma.md"}:
+                raise AssertionError("Append ingest should keep the previous segment's documents")
+            if first_generation in generations(root):
+                raise AssertionError(f"Expected the released generation to be pruned, got {generations(root)}")
+
+            writer.vector_index.MAX_SEGMENTS = 2
+            (data_dir / "gamma.md").unlink()
+            (data_dir / "delta.md").write_text("Delta dashboards chart the error budget.", encoding="utf-8")
+            writer.run_ingest(reset=False)
+            segments = index_repository.current_segments(root)
+            if len(segments) != 2 or beta_generation in segments:
+                raise AssertionError("Append past MAX_SEGMENTS should compact the existing segments into one")
+            if sources(reader, "alerts payload dashboards") != {"beta.md", "gamma.md", "delta.md"}:
+                raise AssertionError("Compaction should keep every segment's documents")
+
+            lock_file = index_repository.lock_path(root)
+            with writer.vector_index.ingest_lock():
+                if not lock_held_elsewhere(lock_file):
+                    raise AssertionError("Another process must not take the ingest lock while an ingest holds it")
+            if lock_held_elsewhere(lock_file):
+                raise AssertionError("The ingest lock should be free once the ingest finishes")
+            with InterProcessLock(lock_file):
+                pass
+
+            writer.vector_index.close()
+            reader.vector_index.close()
+    finally:
+        gateway.shutdown()
+        stub.stop()
+
+    print("Index reload smoke passed: ingest lock, segments, hot reload, compaction, and leases are healthy.")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
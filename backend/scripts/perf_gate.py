@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Compare a benchmark or eval report with a committed baseline and fail on regressions beyond tolerance."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+LOWER_IS_BETTER = "lower"
+HIGHER_IS_BETTER = "higher"
+
+# Dotted report paths checked when present in both reports, and which direction is better.
+GATED_METRICS = {
+    # bench_offline.py: timings and throughput in units of the in-run reference workload, so runner
+    # speed cancels out; raw milliseconds stay in the report ungated. RSS growth is start to after chat.
+    "normalized.ingest_seconds": LOWER_IS_BETTER,
+    "normalized.chat_throughput": HIGHER_IS_BETTER,
+    "normalized.chat_latency_p50": LOWER_IS_BETTER,
+    "normalized.chat_latency_p95": LOWER_IS_BETTER,
+    "normalized.chat_overhead_p50": LOWER_IS_BETTER,
+    "normalized.chat_overhead_p95": LOWER_IS_BETTER,
+    "memory_mb.growth": LOWER_IS_BETTER,
+    "ingest.embedding_tokens": LOWER_IS_BETTER,
+    "chat.tokens_per_request": LOWER_IS_BETTER,
+    # run_eval.py
+    "summary.answer_correctness": HIGHER_IS_BETTER,
+    "summary.citation_precision": HIGHER_IS_BETTER,
+    "summary.p95_latency_ms": LOWER_IS_BETTER,
+    # run_eval.py --load
+    "overall.throughput_rps": HIGHER_IS_BETTER,
+    "overall.error_rate": LOWER_IS_BETTER,
+    "overall.p50_ms": LOWER_IS_BETTER,
+    "overall.p95_ms": LOWER_IS_BETTER,
+    "overall.p99_ms": LOWER_IS_BETTER,
+}
+# Run settings that must match, or the comparison is meaningless.
+CONFIG_KEYS = ("config",)
+IGNORED_CONFIG_FIELDS = {"report", "baseline", "tolerance", "metric_tolerance", "abs_slack_ms"}
+
+
+def _reference_workload():
+    rows = [{"id": index, "text": f"chunk {index} " * 8, "score": index / 7} for index in range(300)]
+    for _ in range(10):
+        encoded = json.dumps(rows, sort_keys=True)
+        hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+        sorted(json.loads(encoded), key=lambda row: (row["score"] % 1, row["id"]))
+
+
+def measure_reference_ms(repeats: int = 20, pause_seconds: float = 0.05) -> list[float]:
+    """Time a fixed CPU-bound workload (JSON, hashing, sorting) `repeats` times, in milliseconds.
+
+    Samples are spread out by `pause_seconds` so one short burst of CPU
+    contention cannot slow all of them.
+    """
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        _reference_workload()
+        samples.append((time.perf_counter() - started) * 1000)
+        time.sleep(pause_seconds)
+    return samples
+
+
+def add_normalized(report: dict, reference_samples: list[float]):
+    """Record the reference time and express bench_offline timings as multiples of it.
+
+    The fastest sample is the reference: scheduler and frequency noise only
+    ever make a run slower, so the minimum is the most repeatable estimate.
+    Chat figures are the median over `chat["rounds"]`, so one slow round
+    cannot move them; throughput is requests per reference duration.
+    """
+    reference_ms = min(reference_samples)
+    chat, ingest = report["chat"], report["ingest"]
+    rounds = chat.get("rounds") or [chat]
+
+    def median(key: str) -> float:
+        return statistics.median(row[key] for row in rounds)
+
+    report["calibration"] = {"reference_ms": round(reference_ms, 3), "samples": len(reference_samples)}
+    report["normalized"] = {
+        "ingest_seconds": round(ingest["seconds"] * 1000 / reference_ms, 3),
+        "chat_throughput": round(median("throughput_rps") * reference_ms / 1000, 4),
+        "chat_latency_p50": round(median("latency_p50_ms") / reference_ms, 3),
+        "chat_latency_p95": round(median("latency_p95_ms") / reference_ms, 3),
+        "chat_overhead_p50": round(median("overhead_p50_ms") / reference_ms, 3),
+        "chat_overhead_p95": round(median("overhead_p95_ms") / reference_ms, 3),
+    }
+
+
+def lookup(report: dict, path: str):
+    value = report
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def parse_tolerances(default: float, overrides: list[str]) -> dict[str, float]:
+    tolerances = {metric: default for metric in GATED_METRICS}
+    for item in overrides:
+        metric, _, value = item.partition("=")
+        if metric not in GATED_METRICS or not value:
+            raise ValueError(f"Unknown tolerance override {item!r}; use <metric>=<fraction>")
+        tolerances[metric] = float(value)
+    return tolerances
+
+
+def compare_reports(current: dict, baseline: dict, tolerances: dict[str, float], abs_slack_ms: float = 1.0) -> dict:
+    """Return per-metric rows and whether any gated metric got worse than its tolerance allows.
+
+    A metric regresses when it moves in the bad direction by more than
+    `tolerance * baseline`; millisecond metrics also get `abs_slack_ms` so
+    sub-millisecond noise on tiny values does not fail the gate.
+    """
+    rows, mismatched = [], []
+    for key in CONFIG_KEYS:
+        ours = {k: v for k, v in (current.get(key) or {}).items() if k not in IGNORED_CONFIG_FIELDS}
+        theirs = {k: v for k, v in (baseline.get(key) or {}).items() if k not in IGNORED_CONFIG_FIELDS}
+        mismatched += sorted(name for name in ours.keys() | theirs.keys() if ours.get(name) != theirs.get(name))
+    for metric, direction in GATED_METRICS.items():
+        now, before = lookup(current, metric), lookup(baseline, metric)
+        if now is None or before is None:
+            continue
+        allowed = abs(before) * tolerances[metric] + (abs_slack_ms if metric.endswith("_ms") else 0.0)
+        worse_by = now - before if direction == LOWER_IS_BETTER else before - now
+        change = (now - before) / before if before else 0.0
+        rows.append(
+            {
+                "metric": metric,
+                "baseline": before,
+                "current": now,
+                "change": round(change, 4),
+                "tolerance": tolerances[metric],
+                "regressed": worse_by > allowed,
+            }
+        )
+    return {
+        "rows": rows,
+        "config_mismatch": mismatched,
+        "regressed": bool(mismatched) or any(row["regressed"] for row in rows),
+    }
+
+
+def format_comparison(result: dict) -> str:
+    lines = [f"{'metric':<30} {'baseline':>12} {'current':>12} {'change':>8} {'allowed':>8}  status"]
+    for row in result["rows"]:
+        lines.append(
+            f"{row['metric']:<30} {row['baseline']:>12.4g} {row['current']:>12.4g} {row['change']:>+8.1%}"
+            f" {row['tolerance']:>8.0%}  {'REGRESSED' if row['regressed'] else 'ok'}"
+        )
+    if not result["rows"]:
+        lines.append("(no comparable metrics found in both reports)")
+    if result["config_mismatch"]:
+        lines.append(f"Config differs from baseline in: {', '.join(result['config_mismatch'])}")
+    lines.append("Performance gate FAILED" if result["regressed"] else "Performance gate passed")
+    return "\n".join(lines)
+
+
+def add_gate_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--baseline", default="", help="Baseline report to compare against; exit 1 on regression.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%).")
+    parser.add_argument(
+        "--metric-tolerance",
+        action="append",
+        default=[],
+        metavar="METRIC=FRACTION",
+        help="Per-metric tolerance override, e.g. chat.latency_p99_ms=0.5 (repeatable).",
+    )
+    parser.add_argument("--abs-slack-ms", type=float, default=1.0, help="Extra absolute slack for *_ms metrics.")
+
+
+def run_gate(current: dict, args: argparse.Namespace) -> bool:
+    """Compare `current` with `args.baseline` if set, print the diff, and return True when it passes."""
+    if not args.baseline:
+        return True
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    tolerances = parse_tolerances(args.tolerance, args.metric_tolerance)
+    result = compare_reports(current, baseline, tolerances, args.abs_slack_ms)
+    print(format_comparison(result))
+    return not result["regressed"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("current", help="Report produced by bench_offline.py or run_eval.py.")
+    add_gate_arguments(parser)
+    args = parser.parse_args()
+    if not args.baseline:
+        parser.error("--baseline is required")
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    return 0 if run_gate(current, args) else 1
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Verify provider scheduling, hedging, failover, and circuit breakers against local stub servers."""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+for path in (BACKEND_DIR, BACKEND_DIR / "scripts"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from core.providers import ProviderEndpoint  # noqa: E402
+from services.provider_gateway import ProviderGateway  # noqa: E402
+from services.provider_health import ProviderUnavailableError  # noqa: E402
+from services.provider_hedging import ProviderHedger  # noqa: E402
+from services.provider_scheduler import BACKGROUND, INTERACTIVE, ProviderCallScheduler  # noqa: E402
+from services.usage_accounting import usage_scope  # noqa: E402
+from stub_openai_server import StubOpenAIServer  # noqa: E402
+
+
+def build_gateway(primary: StubOpenAIServer, secondary: StubOpenAIServer) -> ProviderGateway:
+    return ProviderGateway(
+        endpoints=[
+            ProviderEndpoint("dashscope", "stub-key", primary.base_url, "stub-model", "stub-embedding"),
+            ProviderEndpoint("openrouter", "stub-key", secondary.base_url, "stub-model", "stub-embedding"),
+        ],
+        ai_timeout_seconds=10,
+        ai_max_retries=0,
+        hedge_enabled=True,
+        hedge_embeddings=True,
+        hedge_initial_delay_ms=150,
+        breaker_failure_threshold=2,
+        breaker_reset_seconds=60,
+    )
+
+
+def check_scheduler_headroom():
+    scheduler = ProviderCallScheduler(rpm_limit=4, background_reserve=0.5, interactive_timeout_seconds=1)
+    for _ in range(2):
+        scheduler.release(scheduler.acquire(100, priority=BACKGROUND))
+
+    blocked = threading.Thread(target=lambda: scheduler.release(scheduler.acquire(100, priority=BACKGROUND)), daemon=True)
+    blocked.start()
+    blocked.join(timeout=0.3)
+    if not blocked.is_alive():
+        raise AssertionError("Background call should wait once it has used its share of the RPM budget")
+
+    interactive_started = time.perf_counter()
+    scheduler.release(scheduler.acquire(100, priority=INTERACTIVE))
+    if time.perf_counter() - interactive_started > 0.2:
+        raise AssertionError("Interactive call should use the reserved headroom immediately")
+
+
+def check_probe_released_on_exhausted_budget():
+    scheduler = ProviderCallScheduler(rpm_limit=1, background_reserve=0, interactive_timeout_seconds=0.1)
+    hedger = ProviderHedger(["solo"], breaker_failure_threshold=1, breaker_reset_seconds=0, scheduler=scheduler)
+    breaker = hedger.health("solo").breaker
+    breaker.record_failure()  # open, and half-open at once with a zero reset
+    scheduler.acquire(1, priority=INTERACTIVE)
+    try:
+        hedger.call("chat", [("solo", lambda: "probe answer")])
+        raise AssertionError("A call should fail while the scheduler budget is exhausted")
+    except ProviderUnavailableError:
+        pass
+    if not breaker.allow_request():
+        raise AssertionError("A half-open probe that never ran must be handed back to the breaker")
+
+
+def check_embedding_hedge_guard(primary: StubOpenAIServer):
+    mismatched = StubOpenAIServer(name="mismatched", embedding_dim=primary.embedding_dim // 2).start()
+    gateway = ProviderGateway(
+        endpoints=[
+            ProviderEndpoint("dashscope", "stub-key", primary.base_url, "stub-model", "stub-embedding"),
+            ProviderEndpoint("gemini", "stub-key", mismatched.base_url, "stub-model", "other-embedding"),
+            ProviderEndpoint("openrouter", "stub-key", mismatched.base_url, "stub-model", "stub-embedding"),
+        ],
+        ai_max_retries=0,
+        hedge_enabled=True,
+        hedge_embeddings=True,
+        hedge_initial_delay_ms=50,
+    )
+    try:
+        if [endpoint.name for endpoint in gateway.embedding_endpoints()] != ["dashscope", "openrouter"]:
+            raise AssertionError("A secondary with a different embedding model must not be hedged")
+        embeddings = gateway.get_embeddings()
+        embeddings.embed_query("learn the primary dimension")
+        primary.latency_ms = 400
+        vector = embeddings.embed_query("hedged across dimensions")
+        if len(vector) != primary.embedding_dim or mismatched.request_counts["embeddings"] != 1:
+            raise AssertionError("A secondary answering with another dimension must lose and be dropped")
+        embeddings.embed_query("after the drop")
+        if mismatched.request_counts["embeddings"] != 1:
+            raise AssertionError("A dropped embedding provider should not be hedged again")
+    finally:
+        primary.latency_ms = 0
+        gateway.shutdown()
+        mismatched.stop()
+
+
+def main() -> int:
+    check_scheduler_headroom()
+    check_probe_released_on_exhausted_budget()
+
+    primary = StubOpenAIServer(name="primary").start()
+    secondary = StubOpenAIServer(name="secondary").start()
+    gateway = build_gateway(primary, secondary)
+    try:
+        check_embedding_hedge_guard(primary)
+        llm = gateway.get_llm()
+        embeddings = gateway.get_embeddings()
+
+        with usage_scope() as usage:
+            answer = llm.invoke("hello").content
+            embeddings.embed_documents(["usage accounting check"])
+        if answer != "stub answer from primary":
+            raise AssertionError(f"Expected healthy primary to answer, got {answer!r}")
+        if usage.llm_calls != 1 or usage.embedding_calls != 1 or usage.estimated or not usage.completion_tokens:
+            raise AssertionError(f"Expected provider-reported usage for one LLM and one embedding call, got {usage.to_dict()}")
+
+        primary.latency_ms = 1500
+        rpm_before = gateway.scheduler.snapshot()["rpm_used"]
+        started = time.perf_counter()
+        answer = llm.invoke("hello").content
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if answer != "stub answer from secondary":
+            raise AssertionError(f"Expected hedged secondary to win, got {answer!r}")
+        if elapsed_ms > 1000:
+            raise AssertionError(f"Hedged call took {elapsed_ms:.0f} ms; expected well under primary latency")
+        if gateway.scheduler.snapshot()["rpm_used"] != rpm_before + 2:
+            raise AssertionError("The hedged duplicate should be charged against the scheduler budget")
+
+        vector = embeddings.embed_query("hedged embedding")
+        if len(vector) != primary.embedding_dim:
+            raise AssertionError("Hedged embedding returned unexpected dimension")
+
+        primary.latency_ms = 0
+        primary.fail_status = 500
+        for _ in range(3):
+            answer = llm.invoke("hello").content
+            if answer != "stub answer from secondary":
+                raise AssertionError(f"Expected failover to secondary, got {answer!r}")
+
+        states = {item["name"]: item["breaker"] for item in gateway.health_snapshot()["providers"]}
+        if states.get("dashscope") != "open":
+            raise AssertionError(f"Expected primary breaker to open, got {states}")
+
+        primary_calls = primary.request_counts["chat"]
+        llm.invoke("hello")
+        if primary.request_counts["chat"] != primary_calls:
+            raise AssertionError("Open breaker should skip the primary provider without calling it")
+    finally:
+        gateway.shutdown()
+        primary.stop()
+        secondary.stop()
+
+    print("Provider failover smoke passed: scheduling, hedge charging, embedding guards, failover, and circuit breakers are healthy.")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
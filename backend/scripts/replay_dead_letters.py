@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Write chat turns the message writer dead-lettered back to the database, oldest first.
+
+Safe while the app runs: the file is moved aside before replaying, so turns
+dead-lettered meanwhile land in a fresh file. Turns whose session was deleted
+since are dropped; turns that fail again are appended back to the dead-letter file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+BACKEND_DIR = ROOT / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from repositories import db as db_repository  # noqa: E402
+from repositories import session_repository  # noqa: E402
+from services.session_service import SessionService  # noqa: E402
+
+
+def replay(path: Path) -> tuple[int, int, int]:
+    """Replay every turn in `path`; return (replayed, dropped, failed)."""
+    replaying = path.with_name(path.name + ".replaying")
+    if replaying.exists():
+        raise RuntimeError(f"{replaying} is left from an interrupted replay; merge it into {path} first")
+    os.replace(path, replaying)
+    lines = [line for line in replaying.read_text(encoding="utf-8").splitlines() if line.strip()]
+    replayed, dropped, failed, pending = 0, 0, [], lines
+    try:
+        while pending:
+            line = pending[0]
+            try:
+                message = json.loads(line)
+                if session_repository.get_session_by_id(message["session_id"]) is None:
+                    dropped += 1
+                else:
+                    session_repository.save_messages([message], memory_limit=SessionService.MEMORY_TURN_LIMIT)
+                    replayed += 1
+            except Exception as exc:
+                print(f"{exc}: {line[:200]}", file=sys.stderr)
+                failed.append(line)
+            pending = pending[1:]
+    finally:
+        # Failed turns, plus any left unprocessed by an interrupt, go back to the dead-letter file.
+        if failed or pending:
+            with open(path, "a", encoding="utf-8") as handle:
+                handle.write("".join(line + "\n" for line in failed + pending))
+        replaying.unlink()
+    return replayed, dropped, len(failed)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default=str(BACKEND_DIR / "message_dead_letter.jsonl"), help="Dead-letter file.")
+    parser.add_argument("--db", default=str(db_repository.AUTH_DB_PATH), help="SQLite database to write to.")
+    args = parser.parse_args()
+
+    path = Path(args.file)
+    if not path.exists():
+        print(f"No dead-lettered turns at {path}.")
+        return 0
+    db_repository.AUTH_DB_PATH = Path(args.db)
+    try:
+        replayed, dropped, failed = replay(path)
+    finally:
+        db_repository.close_db()
+    print(f"Replayed {replayed} turns from {path}, dropped {dropped} from deleted sessions, kept {failed} that failed again.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    try:
+        raise SystemExit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
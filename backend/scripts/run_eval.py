@@ -5,99 +5,28 @@ from __future__ import annotations
 
 import argparse
 import json
-import math
 import sys
 import time
-from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
-from urllib import error, request
-
+from typing import Any
+from urllib import error
+
+from eval_common import (
+    evaluate_answer,
+    load_cases,
+    login,
+    parse_server_timing,
+    percentile,
+    post_json_with_headers,
+    summarize_stage_timings,
+)
+from eval_load import LoadConfig, LoadRunner, format_windows, register_users
+from perf_gate import add_gate_arguments, run_gate
 
 ROOT = Path(__file__).resolve().parents[2]
 DEFAULT_DATASET = ROOT / "backend" / "eval" / "qa_dataset.jsonl"
 DEFAULT_REPORT = ROOT / "backend" / "eval" / "last_report.json"
-
-
-@dataclass
-class EvalCase:
-    case_id: str
-    question: str
-    expected_keywords: list[str]
-    expected_sources: list[str]
-
-
-def percentile(values: list[float], p: float) -> float:
-    if not values:
-        return 0.0
-    rank = int(math.ceil((p / 100.0) * len(values))) - 1
-    rank = max(0, min(rank, len(values) - 1))
-    return sorted(values)[rank]
-
-
-def post_json(url: str, payload: dict[str, Any], token: Optional[str] = None) -> dict[str, Any]:
-    body = json.dumps(payload).encode("utf-8")
-    headers = {"Content-Type": "application/json"}
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-    req = request.Request(url, data=body, headers=headers, method="POST")
-    with request.urlopen(req, timeout=60) as resp:
-        return json.loads(resp.read().decode("utf-8"))
-
-
-def login(api_base: str, username: str, password: str) -> str:
-    data = post_json(
-        f"{api_base}/auth/login",
-        {"username": username, "password": password},
-    )
-    token = data.get("access_token")
-    if not token:
-        raise RuntimeError("Login succeeded but access_token is missing.")
-    return token
-
-
-def load_cases(path: Path) -> list[EvalCase]:
-    rows: list[EvalCase] = []
-    with path.open("r", encoding="utf-8") as f:
-        for idx, line in enumerate(f, start=1):
-            raw = line.strip()
-            if not raw:
-                continue
-            item = json.loads(raw)
-            case_id = item.get("id")
-            question = item.get("question")
-            expected_keywords = item.get("expected_keywords", [])
-            expected_sources = item.get("expected_sources", [])
-            if not case_id or not question or not isinstance(expected_keywords, list):
-                raise ValueError(f"Invalid dataset row {idx}: missing required fields")
-            rows.append(
-                EvalCase(
-                    case_id=str(case_id),
-                    question=str(question),
-                    expected_keywords=[str(x).lower() for x in expected_keywords],
-                    expected_sources=[str(x).lower() for x in expected_sources],
-                )
-            )
-    if not rows:
-        raise ValueError("Dataset is empty.")
-    return rows
-
-
-def evaluate_answer(case: EvalCase, answer: str, sources: list[str]) -> tuple[bool, Optional[bool], list[str]]:
-    lower_answer = answer.lower()
-    missing_keywords = [kw for kw in case.expected_keywords if kw not in lower_answer]
-    keyword_pass = len(missing_keywords) == 0
-
-    citation_pass: Optional[bool] = None
-    if case.expected_sources:
-        citation_pass = any(
-            expected in source.lower()
-            for expected in case.expected_sources
-            for source in sources
-        )
-
-    final_pass = keyword_pass and (citation_pass is not False)
-    return final_pass, citation_pass, missing_keywords
+DEFAULT_LOAD_REPORT = ROOT / "backend" / "eval" / "last_load_report.json"
 
 
 def main() -> int:
@@ -110,11 +39,23 @@ def main() -> int:
     parser.add_argument("--username", default="", help="Username for auto-login.")
     parser.add_argument("--password", default="", help="Password for auto-login.")
     parser.add_argument("--dry-run", action="store_true", help="Only validate dataset and exit.")
-    parser.add_argument("--report", default=str(DEFAULT_REPORT), help="Output JSON report path.")
+    parser.add_argument("--report", default="", help="Output JSON report path.")
+    load = parser.add_argument_group("load mode")
+    load.add_argument("--load", action="store_true", help="Drive concurrent traffic instead of one pass over the cases.")
+    load.add_argument("--concurrency", type=int, default=8, help="Closed-loop workers, or max in-flight when --qps is set.")
+    load.add_argument("--qps", type=float, default=0.0, help="Open-loop target requests/second (0 = closed loop).")
+    load.add_argument("--duration", type=float, default=60.0, help="Seconds to generate load.")
+    load.add_argument("--ramp-up", type=float, default=0.0, help="Seconds to ramp workers or rate up to the target.")
+    load.add_argument("--window", type=float, default=5.0, help="Seconds per reported time window.")
+    load.add_argument("--register-users", type=int, default=0, help="Create N throwaway users for authenticated sessions.")
+    load.add_argument("--anon-ratio", type=float, default=0.0, help="Fraction of requests sent anonymously.")
+    load.add_argument("--session-turns", type=int, default=3, help="Questions per authenticated session (memory).")
+    load.add_argument("--seed", type=int, default=0, help="Seed for the anonymous/authenticated mix.")
+    add_gate_arguments(parser.add_argument_group("baseline comparison"))
     args = parser.parse_args()
 
     dataset_path = Path(args.dataset)
-    report_path = Path(args.report)
+    report_path = Path(args.report or (DEFAULT_LOAD_REPORT if args.load else DEFAULT_REPORT))
     cases = load_cases(dataset_path)
     if args.limit > 0:
         cases = cases[: args.limit]
@@ -129,21 +70,46 @@ def main() -> int:
             raise ValueError("When --username is provided, --password is required.")
         token = login(args.api_base, args.username, args.password)
 
+    if args.load:
+        tokens = ([token] if token else []) + register_users(args.api_base, args.register_users)
+        config = LoadConfig(
+            concurrency=args.concurrency,
+            qps=args.qps,
+            duration_seconds=args.duration,
+            ramp_up_seconds=args.ramp_up,
+            window_seconds=args.window,
+            anon_ratio=args.anon_ratio,
+            session_turns=args.session_turns,
+            k=args.k,
+            seed=args.seed,
+        )
+        report = {"dataset": str(dataset_path), "api_base": args.api_base, **LoadRunner(args.api_base, cases, config, tokens).run()}
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(format_windows(report))
+        print(json.dumps({"overall": report["overall"], "by_kind": report["by_kind"]}, indent=2))
+        print(f"Report saved to: {report_path}")
+        return 0 if report["overall"]["requests"] and run_gate(report, args) else 1
+
     results: list[dict[str, Any]] = []
     latencies: list[float] = []
     citation_total = 0
     citation_hits = 0
+    stage_timings: list[dict[str, float]] = []
 
     for case in cases:
         started = time.perf_counter()
         try:
-            response = post_json(
+            response, response_headers = post_json_with_headers(
                 f"{args.api_base}/chat",
                 {"question": case.question, "k": args.k},
                 token=token,
             )
             elapsed_ms = (time.perf_counter() - started) * 1000.0
             latencies.append(elapsed_ms)
+            server_timing = parse_server_timing(response_headers.get("server-timing", ""))
+            if server_timing:
+                stage_timings.append(server_timing)
             answer = str(response.get("answer", ""))
             raw_sources = response.get("sources", [])
             source_paths = [str(item.get("source", "")) for item in raw_sources if isinstance(item, dict)]
@@ -162,6 +128,8 @@ def main() -> int:
                     "citation_pass": citation_pass,
                     "answer_preview": answer[:180],
                     "sources": source_paths,
+                    "request_id": response_headers.get("x-request-id"),
+                    "server_timing_ms": server_timing,
                 }
             )
             print(f"[{'PASS' if passed else 'FAIL'}] {case.case_id} ({elapsed_ms:.1f} ms)")
@@ -203,6 +171,7 @@ def main() -> int:
         "answer_correctness": round(answer_correctness, 4),
         "citation_precision": round(citation_precision, 4),
         "p95_latency_ms": round(p95_latency, 2),
+        "stage_latency_ms": summarize_stage_timings(stage_timings),
     }
     report = {
         "dataset": str(dataset_path),
@@ -219,7 +188,8 @@ def main() -> int:
     print(json.dumps(summary, indent=2))
     print(f"Report saved to: {report_path}")
 
-    return 0 if passed_total == total else 1
+    gate_passed = run_gate(report, args)
+    return 0 if passed_total == total and gate_passed else 1
 
 
 if __name__ == "__main__":
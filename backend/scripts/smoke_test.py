@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import os
 import sys
 import tempfile
 import uuid
@@ -16,9 +17,28 @@ BACKEND_DIR = ROOT / "backend"
 if str(BACKEND_DIR) not in sys.path:
     sys.path.insert(0, str(BACKEND_DIR))
 
+from stub_openai_server import StubOpenAIServer  # noqa: E402
+
+# Exercise the write-behind path so the follow-up chat proves read-your-writes for session memory.
+os.environ.setdefault("MESSAGE_WRITE_BEHIND_ENABLED", "true")
+# A local stub provider lets the warmup and one unpatched /chat build and run the real agent.
+STUB = StubOpenAIServer(name="smoke").start()
+os.environ.update(
+    {
+        "AI_PROVIDER": "dashscope",
+        "AI_API_KEY": "stub-key",
+        "AI_BASE_URL": STUB.base_url,
+        "AI_MODEL": "stub-model",
+        "AI_EMBEDDING_MODEL": "stub-embedding",
+        "AI_HEDGE_PROVIDERS": "",
+        "OPS_ADMIN_TOKEN": "smoke-ops-token",
+    }
+)
+
 import app as backend_app_module  # noqa: E402
 from repositories import db as db_repository  # noqa: E402
 from services.session_service import SessionService  # noqa: E402
+from services.usage_accounting import record_llm_usage  # noqa: E402
 
 app = backend_app_module.app
 
@@ -32,9 +52,20 @@ def auth_headers(token: str) -> dict[str, str]:
     return {"Authorization": f"Bearer {token}"}
 
 
+ADMIN_HEADERS = {"X-Profile-Token": "smoke-profile-token"}
+OPS_HEADERS = {"X-Ops-Token": "smoke-ops-token"}
+
+
 def main() -> int:
     with tempfile.TemporaryDirectory(prefix="api-smoke-db-") as tmp:
         db_repository.AUTH_DB_PATH = Path(tmp) / "app.db"
+        profiler = backend_app_module.request_profiler
+        profiler.admin_token, profiler.artifact_dir = ADMIN_HEADERS["X-Profile-Token"], Path(tmp) / "profiles"
+        rag_service = backend_app_module.rag_service
+        rag_service.data_dir, rag_service.vector_index.root = Path(tmp) / "data", Path(tmp) / "chroma"
+        rag_service.data_dir.mkdir()
+        (rag_service.data_dir / "smoke.md").write_text("Smoke notes: retention keeps data for thirty days.", encoding="utf-8")
+        rag_service.run_ingest(reset=True)  # so the warmup's vectorstore step has an index to open
 
         with TestClient(app) as client:
             no_auth = client.get("/auth/me")
@@ -45,18 +76,12 @@ def main() -> int:
             username = f"smoke_{uuid.uuid4().hex[:8]}"
             password = "smoke-password-123"
 
-            register = client.post(
-                "/auth/register",
-                json={"username": username, "password": password},
-            )
+            register = client.post("/auth/register", json={"username": username, "password": password})
             assert_status(register.status_code, 200, "POST /auth/register")
             if register.json().get("username") != username:
                 raise AssertionError("Register response username mismatch")
 
-            login = client.post(
-                "/auth/login",
-                json={"username": username, "password": password},
-            )
+            login = client.post("/auth/login", json={"username": username, "password": password})
             assert_status(login.status_code, 200, "POST /auth/login")
             token = login.json().get("access_token")
             if not token:
@@ -68,11 +93,7 @@ def main() -> int:
             if me.json().get("username") != username:
                 raise AssertionError("Auth me response username mismatch")
 
-            create_session = client.post(
-                "/sessions",
-                json={"title": "Smoke Session"},
-                headers=headers,
-            )
+            create_session = client.post("/sessions", json={"title": "Smoke Session"}, headers=headers)
             assert_status(create_session.status_code, 200, "POST /sessions")
             session_id = create_session.json().get("id")
             if not isinstance(session_id, int):
@@ -80,12 +101,12 @@ def main() -> int:
 
             list_sessions = client.get("/sessions", headers=headers)
             assert_status(list_sessions.status_code, 200, "GET /sessions")
-            if not any(item.get("id") == session_id for item in list_sessions.json()):
+            if not any(item.get("id") == session_id for item in list_sessions.json()["items"]):
                 raise AssertionError("Created session not found in list")
 
             list_messages = client.get(f"/sessions/{session_id}/messages", headers=headers)
             assert_status(list_messages.status_code, 200, "GET /sessions/{id}/messages")
-            if list_messages.json() != []:
+            if list_messages.json() != {"items": [], "next_cursor": None}:
                 raise AssertionError("Expected no messages in new session")
 
             original_answer_question = backend_app_module.rag_service.answer_question
@@ -97,45 +118,23 @@ def main() -> int:
                 "Fourth sentence exists only to verify trimming."
             )
 
-            def fake_answer_question(
-                question: str,
-                k: int,
-                memory: list[dict[str, str]] | None = None,
-                request_id: str | None = None,
-            ):
-                chat_calls.append(
-                    {
-                        "question": question,
-                        "k": k,
-                        "memory": memory or [],
-                        "request_id": request_id,
-                    }
-                )
+            def fake_answer_question(question: str, k: int, memory: list | None = None, request_id: str | None = None):
+                chat_calls.append({"question": question, "k": k, "memory": memory or [], "request_id": request_id})
+                record_llm_usage("smoke", "smoke-model", prompt_tokens=40, completion_tokens=10)
                 if question == "First smoke question":
                     return long_first_answer, [{"source": "smoke-test"}]
                 return "stubbed answer", [{"source": "smoke-test"}]
 
             backend_app_module.rag_service.answer_question = fake_answer_question
             try:
-                first_chat = client.post(
-                    "/chat",
-                    json={"question": "First smoke question", "k": 2},
-                    headers=headers,
-                )
+                first_chat = client.post("/chat", json={"question": "First smoke question", "k": 2}, headers=headers)
                 assert_status(first_chat.status_code, 200, "POST /chat first turn")
                 first_session_id = first_chat.json().get("session_id")
                 if not isinstance(first_session_id, int):
                     raise AssertionError("Expected first chat to create a session id")
 
-                second_chat = client.post(
-                    "/chat",
-                    json={
-                        "question": "Follow-up smoke question",
-                        "k": 3,
-                        "session_id": first_session_id,
-                    },
-                    headers=headers,
-                )
+                follow_up = {"question": "Follow-up smoke question", "k": 3, "session_id": first_session_id}
+                second_chat = client.post("/chat", json=follow_up, headers={**headers, **ADMIN_HEADERS})
                 assert_status(second_chat.status_code, 200, "POST /chat follow-up turn")
             finally:
                 backend_app_module.rag_service.answer_question = original_answer_question
@@ -163,6 +162,91 @@ def main() -> int:
             if not chat_calls[1]["request_id"]:
                 raise AssertionError("Expected request_id to be forwarded to rag service")
 
+            server_timing = second_chat.headers.get("Server-Timing", "")
+            for stage in ("auth", "memory", "persist", "db", "total"):
+                if f"{stage};dur=" not in server_timing:
+                    raise AssertionError(f"Expected {stage} in Server-Timing, got {server_timing!r}")
+            timeline_url = f"/debug/requests/{second_chat.headers['X-Trace-ID']}"
+            assert_status(client.get(timeline_url).status_code, 403, "GET /debug/requests/{id} without token")
+            timeline = client.get(timeline_url, headers=ADMIN_HEADERS)
+            assert_status(timeline.status_code, 200, "GET /debug/requests/{id}")
+            if {"auth", "memory", "persist", "db"} - {span["stage"] for span in timeline.json()["spans"]}:
+                raise AssertionError("Expected the request timeline to hold every chat stage")
+
+            profile_id = second_chat.headers.get("X-Profile-Id")
+            if profile_id != second_chat.headers["X-Trace-ID"]:
+                raise AssertionError("Expected the admin-token chat request to be profiled")
+            assert_status(client.get(f"/debug/profiles/{profile_id}").status_code, 403, "GET profile without token")
+            profile = client.get(f"/debug/profiles/{profile_id}", headers=ADMIN_HEADERS)
+            assert_status(profile.status_code, 200, "GET /debug/profiles/{id}")
+            if "top_cumulative" not in profile.json() or "traced_peak_bytes" not in (profile.json()["memory"] or {}):
+                raise AssertionError("Expected CPU and memory sections in the profile artifact")
+
+            usage = client.get("/usage/me", headers=headers).json()["totals"]
+            if usage["requests"] != 2 or usage["prompt_tokens"] != 80 or second_chat.json()["usage"]["llm_calls"] != 1:
+                raise AssertionError(f"Expected both chat turns in the token usage ledger, got {usage}")
+
+            newest = client.get(f"/sessions/{first_session_id}/messages?limit=1", headers=headers).json()
+            if [item["question"] for item in newest["items"]] != ["Follow-up smoke question"] or not newest["next_cursor"]:
+                raise AssertionError("Expected first message page to hold the newest message and a cursor")
+            older_url = f"/sessions/{first_session_id}/messages?limit=1&before_id={newest['next_cursor']}"
+            older = client.get(older_url, headers=headers).json()
+            if [item["question"] for item in older["items"]] != ["First smoke question"] or older["next_cursor"]:
+                raise AssertionError("Expected second message page to hold the oldest message and no cursor")
+
+            assert_status(client.get("/ops/usage", headers=ADMIN_HEADERS).status_code, 403, "GET /ops/usage without ops token")
+            writer = client.get("/ops/message-writer", headers=OPS_HEADERS).json()
+            if writer["enabled"] and (writer["written"] < 2 or writer["dead_lettered"] or writer["queue_depth"]):
+                raise AssertionError(f"Expected write-behind to persist both chat turns, got {writer}")
+
+            max_failures = backend_app_module.settings.login_max_failures
+            for _ in range(max_failures):
+                wrong = client.post("/auth/login", json={"username": username, "password": "wrong-password"})
+                assert_status(wrong.status_code, 401, "POST /auth/login with wrong password")
+            throttled = client.post("/auth/login", json={"username": username, "password": password})
+            assert_status(throttled.status_code, 429 if max_failures else 200, "POST /auth/login after repeated failures")
+            if max_failures and not throttled.headers.get("Retry-After"):
+                raise AssertionError("Expected Retry-After on throttled login")
+
+            user_cache = client.get("/ops/auth", headers=OPS_HEADERS).json()["user_cache"]
+            if user_cache["enabled"] and (user_cache["hits"] < 1 or user_cache["misses"] < 1):
+                raise AssertionError(f"Expected repeated token use to hit the user cache, got {user_cache}")
+
+            admission = client.get("/ops/admission", headers=OPS_HEADERS)
+            assert_status(admission.status_code, 200, "GET /ops/admission")
+            chat_limiter = next(item for item in admission.json()["limiters"] if item["name"] == "chat")
+            if chat_limiter["admitted"] < 2 or chat_limiter["inflight"] != 0:
+                raise AssertionError("Expected admission controller to track completed /chat requests")
+
+            fair = client.get("/ops/fair-scheduler", headers=OPS_HEADERS)
+            assert_status(fair.status_code, 200, "GET /ops/fair-scheduler")
+            if fair.json()["inflight"] != 0 or fair.json()["classes"]["user"]["wait_samples"] < 2:
+                raise AssertionError("Expected fair scheduler to admit and release authenticated /chat requests")
+
+            metrics = client.get("/metrics")
+            assert_status(metrics.status_code, 200, "GET /metrics")
+            for series in (
+                'db_operation_duration_seconds_count{operation="get_user_by_id"}',
+                'http_request_duration_seconds_count{method="POST",route="/chat",status="200"}',
+                'provider_tokens_total{provider="smoke",model="smoke-model",type="prompt"}',
+            ):
+                if series not in metrics.text:
+                    raise AssertionError(f"Expected {series} in /metrics output")
+
+            real_chat = client.post("/chat", json={"question": "How long is data retained?", "k": 1}, headers=headers)
+            assert_status(real_chat.status_code, 200, "POST /chat through the real agent")
+            if not real_chat.json()["answer"] or not real_chat.json()["sources"]:
+                raise AssertionError(f"Expected an answer and sources from the real agent, got {real_chat.json()}")
+
+            backend_app_module.startup_warmup.wait(60)
+            ready = client.get("/ready")
+            assert_status(ready.status_code, 200, "GET /ready")
+            steps = {step["name"]: step["status"] for step in ready.json()["steps"]}
+            if steps != dict.fromkeys(("imports", "provider_clients", "vectorstore", "agent"), "ok"):
+                raise AssertionError(f"Expected every warmup step to succeed, got {ready.json()['steps']}")
+            if "POST /chat" not in ready.json()["first_request_ms"]:
+                raise AssertionError(f"Expected first-request latency in /ready: {ready.json()}")
+
     print("Smoke test passed: auth/session/chat API flow is healthy.")
     return 0
 
@@ -172,3 +256,5 @@ if __name__ == "__main__":
         raise SystemExit(main())
     except KeyboardInterrupt:
         sys.exit(130)
+    finally:
+        STUB.stop()
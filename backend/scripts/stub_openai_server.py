@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Local OpenAI-compatible stub server for offline provider tests."""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def hash_embedding(text: str, dim: int = 64) -> list[float]:
+    """Deterministic bag-of-words embedding so similar texts land close together."""
+    vector = [0.0] * dim
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % dim
+        vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+class StubOpenAIServer:
+    def __init__(
+        self,
+        name: str = "stub",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        embedding_dim: int = 64,
+        seed: int = 0,
+    ):
+        self.name = name
+        self.embedding_dim = embedding_dim
+        self.latency_ms = 0.0
+        self.embedding_latency_ms: float | None = None
+        self.jitter_ms = 0.0
+        self._random = random.Random(seed)
+        self.fail_status: int | None = None
+        self.request_counts = {"chat": 0, "embeddings": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, kind: str):
+        with self._lock:
+            self.request_counts[kind] += 1
+
+    def delay_seconds(self, kind: str) -> float:
+        """Configured latency plus uniform jitter; the jitter sequence is reproducible for a given seed."""
+        base = self.latency_ms
+        if kind == "embeddings" and self.embedding_latency_ms is not None:
+            base = self.embedding_latency_ms
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        return max(base + jitter, 0.0) / 1000.0
+
+    def chat_completion(self, payload: dict[str, Any]) -> dict[str, Any]:
+        messages = payload.get("messages") or []
+        prompt_chars = sum(len(str(message.get("content", ""))) for message in messages)
+        content = f"stub answer from {self.name}"
+        prompt_tokens = max(prompt_chars // 4, 1)
+        completion_tokens = max(len(content) // 4, 1)
+        return {
+            "id": f"chatcmpl-{self.name}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub-model"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def embeddings(self, payload: dict[str, Any]) -> dict[str, Any]:
+        raw_input = payload.get("input", [])
+        texts = [raw_input] if isinstance(raw_input, str) else [str(item) for item in raw_input]
+        use_base64 = payload.get("encoding_format") == "base64"
+        data = []
+        for index, text in enumerate(texts):
+            vector = hash_embedding(text, self.embedding_dim)
+            if use_base64:
+                encoded: Any = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode("ascii")
+            else:
+                encoded = vector
+            data.append({"object": "embedding", "index": index, "embedding": encoded})
+        tokens = max(sum(len(text) for text in texts) // 4, 1)
+        return {
+            "object": "list",
+            "data": data,
+            "model": payload.get("model", "stub-embedding"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):  # noqa: A002 - stdlib signature
+                return
+
+            def _send_json(self, status: int, body: dict[str, Any]):
+                raw = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if self.path.endswith("/chat/completions"):
+                    kind = "chat"
+                elif self.path.endswith("/embeddings"):
+                    kind = "embeddings"
+                else:
+                    self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+                    return
+                stub._count(kind)
+                delay = stub.delay_seconds(kind)
+                if delay > 0:
+                    time.sleep(delay)
+                if stub.fail_status is not None:
+                    self._send_json(stub.fail_status, {"error": {"message": f"{stub.name} forced failure"}})
+                    return
+                if kind == "chat":
+                    self._send_json(200, stub.chat_completion(payload))
+                else:
+                    self._send_json(200, stub.embeddings(payload))
+
+        return Handler
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve a local OpenAI-compatible stub API.")
+    parser.add_argument("--name", default="stub", help="Name reported in stub answers.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fixed delay added to every response.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter around the delay.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the jitter sequence.")
+    args = parser.parse_args()
+
+    stub = StubOpenAIServer(name=args.name, host=args.host, port=args.port, seed=args.seed)
+    stub.latency_ms = args.latency_ms
+    stub.jitter_ms = args.jitter_ms
+    print(f"Stub provider '{args.name}' listening on {stub.base_url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+import asyncio
+import math
+import time
+from collections import deque
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after_seconds: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdaptiveConcurrencyLimiter:
+    """Latency-driven AIMD concurrency limit with a bounded FIFO wait queue.
+
+    A fast EWMA of request latency is compared with a slow EWMA that acts as the
+    no-load baseline. While the fast average stays within `latency_tolerance`
+    times the baseline, a saturated limit grows by about one per limit's worth of
+    completions; when it drifts above, or a request fails, the limit shrinks
+    multiplicatively. While requests are queued the baseline may only fall, so
+    sustained overload cannot raise it until congestion looks normal.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        queue_depth: int = 32,
+        queue_timeout_seconds: float = 5,
+        latency_tolerance: float = 1.5,
+        backoff_ratio: float = 0.9,
+    ):
+        self.name = name
+        self.min_limit = max(int(min_limit), 1)
+        self.max_limit = max(int(max_limit), self.min_limit)
+        self.queue_depth = max(int(queue_depth), 0)
+        self.queue_timeout_seconds = max(float(queue_timeout_seconds), 0.0)
+        self.latency_tolerance = max(float(latency_tolerance), 1.0)
+        self.backoff_ratio = min(max(float(backoff_ratio), 0.1), 0.99)
+        self._limit = float(min(max(int(initial_limit), self.min_limit), self.max_limit))
+        self._short_latency_ms = 0.0
+        self._long_latency_ms = 0.0
+        self._inflight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.queue_timeouts = 0
+
+    @property
+    def limit(self) -> int:
+        return max(int(self._limit), self.min_limit)
+
+    def _retry_after_seconds(self) -> int:
+        per_request_s = (self._short_latency_ms or 1000.0) / 1000.0
+        backlog = len(self._waiters) + 1
+        return int(min(max(math.ceil(backlog * per_request_s / self.limit), 1), 30))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected += 1
+        return AdmissionRejected(reason, self._retry_after_seconds())
+
+    async def acquire(self) -> float:
+        if self._inflight < self.limit and not self._waiters:
+            self._inflight += 1
+            self.admitted += 1
+            return time.perf_counter()
+        if len(self._waiters) >= self.queue_depth:
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just as the timeout fired; keep it.
+                self.admitted += 1
+                return time.perf_counter()
+            self._discard(waiter)
+            self.queue_timeouts += 1
+            raise self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            else:
+                self._discard(waiter)
+            raise
+        self.admitted += 1
+        return time.perf_counter()
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+        if not waiter.done():
+            waiter.cancel()
+
+    def _wake_waiters(self):
+        while self._waiters and self._inflight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            # Hand the slot over directly so a new arrival cannot jump the queue.
+            self._inflight += 1
+            waiter.set_result(None)
+
+    def _release_slot(self):
+        self._inflight = max(self._inflight - 1, 0)
+        self._wake_waiters()
+
+    def release(self, started: float, ok: bool = True):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._observe(elapsed_ms, ok)
+        self._release_slot()
+
+    @staticmethod
+    def _ewma(current: float, sample: float, alpha: float) -> float:
+        return sample if not current else (1 - alpha) * current + alpha * sample
+
+    def _observe(self, elapsed_ms: float, ok: bool):
+        self._short_latency_ms = self._ewma(self._short_latency_ms, elapsed_ms, 0.2)
+        if not self._waiters or elapsed_ms < self._long_latency_ms:
+            self._long_latency_ms = self._ewma(self._long_latency_ms, elapsed_ms, 0.02)
+        congested = not ok or self._short_latency_ms > self._long_latency_ms * self.latency_tolerance
+        if congested:
+            self._limit = max(self._limit * self.backoff_ratio, float(self.min_limit))
+        elif self._inflight >= self.limit:
+            self._limit = min(self._limit + 1.0 / self._limit, float(self.max_limit))
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "inflight": self._inflight,
+            "queue_depth": len(self._waiters),
+            "max_queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "queue_timeouts": self.queue_timeouts,
+            "short_latency_ms": round(self._short_latency_ms, 2),
+            "baseline_latency_ms": round(self._long_latency_ms, 2),
+            "baseline_frozen": bool(self._waiters),
+        }
+
+
+class AdmissionController:
+    def __init__(self, enabled: bool = True, **limiter_options):
+        self.enabled = bool(enabled)
+        self._limiters = {
+            "chat": AdaptiveConcurrencyLimiter("chat", **limiter_options),
+            "ingest": AdaptiveConcurrencyLimiter("ingest", **limiter_options),
+        }
+
+    def limiter_for(self, method: str, path: str) -> AdaptiveConcurrencyLimiter | None:
+        if not self.enabled or method != "POST":
+            return None
+        if path == "/chat":
+            return self._limiters["chat"]
+        # Only the synchronous ingest; POST /ingest/jobs just enqueues and would skew the latency baseline.
+        if path == "/ingest":
+            return self._limiters["ingest"]
+        return None
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "limiters": [limiter.snapshot() for limiter in self._limiters.values()],
+        }
@@ -1,5 +1,6 @@
-import hashlib
-import secrets
+import asyncio
+import sqlite3
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
@@ -7,29 +8,29 @@ import jwt
 from fastapi import HTTPException
 from fastapi.security import HTTPAuthorizationCredentials
 
-from repositories import user_repository
+from repositories import async_user_repository, user_repository
+from services.login_throttle import LoginThrottle
+from services.password_hasher import PasswordHasher
+from services.user_cache import UserIdentityCache
 
 
 class AuthService:
-    def __init__(self, jwt_secret: str, jwt_algorithm: str, access_token_expire_minutes: int):
+    def __init__(
+        self,
+        jwt_secret: str,
+        jwt_algorithm: str,
+        access_token_expire_minutes: int,
+        password_hasher: PasswordHasher | None = None,
+        login_throttle: LoginThrottle | None = None,
+        user_cache: UserIdentityCache | None = None,
+    ):
         self.jwt_secret = jwt_secret
         self.jwt_algorithm = jwt_algorithm
         self.access_token_expire_minutes = access_token_expire_minutes
-
-    @staticmethod
-    def hash_password(password: str) -> str:
-        salt = secrets.token_hex(16)
-        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), 390000)
-        return f"{salt}${digest.hex()}"
-
-    @staticmethod
-    def verify_password(password: str, stored_hash: str) -> bool:
-        try:
-            salt, expected = stored_hash.split("$", 1)
-        except ValueError:
-            return False
-        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), 390000)
-        return secrets.compare_digest(digest.hex(), expected)
+        self.password_hasher = password_hasher or PasswordHasher(workers=0)
+        self.login_throttle = login_throttle or LoginThrottle()
+        self.user_cache = user_cache or UserIdentityCache(ttl_seconds=0)
+        user_repository.add_user_change_listener(self.user_cache.invalidate_user)
 
     def create_access_token(self, user_id: int, username: str) -> str:
         expires = datetime.now(timezone.utc) + timedelta(minutes=self.access_token_expire_minutes)
@@ -40,23 +41,31 @@ class AuthService:
         }
         return jwt.encode(payload, self.jwt_secret, algorithm=self.jwt_algorithm)
 
-    def register_user(self, username: str, password: str):
-        existing = user_repository.get_user_by_username(username)
-        if existing is not None:
+    async def aregister_user(self, username: str, password: str):
+        if await async_user_repository.get_user_by_username(username) is not None:
+            raise HTTPException(status_code=409, detail="Username already exists")
+        password_hash = await self.password_hasher.hash_password(password)
+        try:
+            user_id = await async_user_repository.create_user(username, password_hash)
+        except sqlite3.IntegrityError:
+            # Another registration for the same name won the race while we were hashing.
             raise HTTPException(status_code=409, detail="Username already exists")
-        user_id = user_repository.create_user(username, self.hash_password(password))
         return {"id": user_id, "username": username}
 
-    def login_user(self, username: str, password: str):
-        row = user_repository.get_user_by_username(username)
-        if row is None or not self.verify_password(password, row["password_hash"]):
+    async def alogin_user(self, username: str, password: str, client_host: str | None = None):
+        delay = self.login_throttle.check(username, client_host)
+        if delay:
+            # Backoff for a username under attack from many addresses; waits on the loop, not in a worker.
+            await asyncio.sleep(delay)
+        row = await async_user_repository.get_user_by_username(username)
+        if row is None or not await self.password_hasher.verify_password(password, row["password_hash"]):
+            self.login_throttle.record_failure(username, client_host)
             raise HTTPException(status_code=401, detail="Invalid username or password")
+        self.login_throttle.reset(username, client_host)
         token = self.create_access_token(int(row["id"]), row["username"])
         return {"access_token": token, "username": row["username"]}
 
-    def get_current_user_optional(self, credentials: Optional[HTTPAuthorizationCredentials]):
-        if credentials is None:
-            return None
+    def _decode_token(self, credentials: HTTPAuthorizationCredentials) -> tuple[int, float | None]:
         try:
             payload = jwt.decode(credentials.credentials, self.jwt_secret, algorithms=[self.jwt_algorithm])
             user_id = int(payload.get("sub"))
@@ -65,12 +74,34 @@ class AuthService:
             raise HTTPException(status_code=401, detail="Invalid token")
         if not username:
             raise HTTPException(status_code=401, detail="Invalid token")
+        return user_id, payload.get("exp")
 
-        row = user_repository.get_user_by_id(user_id)
+    @staticmethod
+    def _row_to_user(row):
         if row is None:
             raise HTTPException(status_code=401, detail="User not found")
         return {"id": int(row["id"]), "username": row["username"]}
 
+    @staticmethod
+    def _token_signature(credentials: HTTPAuthorizationCredentials) -> str:
+        return credentials.credentials.rsplit(".", 1)[-1]
+
+    async def aget_current_user_optional(self, credentials: Optional[HTTPAuthorizationCredentials]):
+        if credentials is None:
+            return None
+        user_id, expires_at = self._decode_token(credentials)
+        signature = self._token_signature(credentials)
+        started = time.perf_counter()
+        user = self.user_cache.get(user_id, signature)
+        if user is not None:
+            # Steady state: a verified token for a known user needs no SQLite read.
+            self.user_cache.record_lookup(True, (time.perf_counter() - started) * 1000)
+            return user
+        user = self._row_to_user(await async_user_repository.get_user_by_id(user_id))
+        self.user_cache.put(user_id, signature, user, expires_at)
+        self.user_cache.record_lookup(False, (time.perf_counter() - started) * 1000)
+        return user
+
     @staticmethod
     def require_user(user):
         if user is None:
@@ -0,0 +1,232 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from fastapi import HTTPException
+
+from services.provider_health import LatencyTracker
+
+ANONYMOUS_CLASS = "anonymous"
+USER_CLASS = "user"
+
+
+@dataclass
+class FlowClass:
+    name: str
+    weight: int
+    concurrency: int
+    rate_per_second: float
+    burst: float
+
+
+@dataclass
+class _Flow:
+    key: str
+    flow_class: FlowClass
+    tokens: float
+    refilled_at: float
+    inflight: int = 0
+    credits: int = 0
+    waiters: deque = field(default_factory=deque)
+
+    def refill(self, now: float):
+        elapsed = max(now - self.refilled_at, 0.0)
+        self.tokens = min(self.tokens + elapsed * self.flow_class.rate_per_second, self.flow_class.burst)
+        self.refilled_at = now
+
+    def seconds_until_token(self) -> float:
+        missing = 1.0 - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / max(self.flow_class.rate_per_second, 1e-9)
+
+
+@dataclass
+class FairTicket:
+    flow_key: str
+    started: float
+
+
+class FairScheduler:
+    """Weighted round-robin dispatch of chat requests across per-user flows.
+
+    Every authenticated user gets their own flow and anonymous traffic gets one
+    flow per client address, so a few noisy clients cannot use up the
+    anonymous budget for everyone. Idle flows with a full bucket are dropped,
+    which keeps the flow table bounded by active clients. A flow is eligible for a slot only while it is under its
+    concurrency cap and has a token in its bucket, and eligible flows take up
+    to `weight` slots per round before the cursor moves on.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        capacity: int = 16,
+        classes: dict[str, FlowClass] | None = None,
+        queue_depth_per_flow: int = 8,
+        queue_timeout_seconds: float = 10,
+    ):
+        self.enabled = bool(enabled)
+        self.capacity = max(int(capacity), 1)
+        self.classes = classes or {
+            USER_CLASS: FlowClass(USER_CLASS, weight=1, concurrency=2, rate_per_second=0.5, burst=5),
+            ANONYMOUS_CLASS: FlowClass(ANONYMOUS_CLASS, weight=1, concurrency=4, rate_per_second=1.0, burst=10),
+        }
+        self.queue_depth_per_flow = max(int(queue_depth_per_flow), 1)
+        self.queue_timeout_seconds = max(float(queue_timeout_seconds), 0.0)
+        self._flows: dict[str, _Flow] = {}
+        self._order: deque[str] = deque()
+        self._inflight = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._wait_ms = {name: LatencyTracker(window=1000) for name in self.classes}
+        self._rejected = {name: 0 for name in self.classes}
+
+    @staticmethod
+    def flow_for(user, client_host: str | None = None) -> tuple[str, str]:
+        if user is None:
+            return f"{ANONYMOUS_CLASS}:{client_host or 'unknown'}", ANONYMOUS_CLASS
+        return f"user:{user['id']}", USER_CLASS
+
+    def _get_flow(self, key: str, class_name: str, now: float) -> _Flow:
+        flow = self._flows.get(key)
+        if flow is None:
+            flow_class = self.classes[class_name]
+            flow = _Flow(key=key, flow_class=flow_class, tokens=flow_class.burst, refilled_at=now)
+            self._flows[key] = flow
+            self._order.append(key)
+        return flow
+
+    def _reject(self, flow: _Flow, detail: str):
+        self._rejected[flow.flow_class.name] += 1
+        retry_after = max(int(flow.seconds_until_token() + 0.999), 1)
+        raise HTTPException(status_code=429, detail=detail, headers={"Retry-After": str(retry_after)})
+
+    async def acquire(self, user, client_host: str | None = None) -> FairTicket | None:
+        if not self.enabled:
+            return None
+        key, class_name = self.flow_for(user, client_host)
+        enqueued = time.monotonic()
+        flow = self._get_flow(key, class_name, enqueued)
+        if len(flow.waiters) >= self.queue_depth_per_flow:
+            self._reject(flow, "Too many queued chat requests for this client. Retry later.")
+
+        waiter = asyncio.get_running_loop().create_future()
+        flow.waiters.append(waiter)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            if not self._granted(waiter):
+                self._abandon(flow, waiter)
+                self._reject(flow, "Chat request waited too long for a fair-share slot. Retry later.")
+        except asyncio.CancelledError:
+            if self._granted(waiter):
+                self.release(FairTicket(flow_key=key, started=time.monotonic()))
+            else:
+                self._abandon(flow, waiter)
+            raise
+        started = time.monotonic()
+        self._wait_ms[class_name].record((started - enqueued) * 1000)
+        return FairTicket(flow_key=key, started=started)
+
+    @staticmethod
+    def _granted(waiter: asyncio.Future) -> bool:
+        return waiter.done() and not waiter.cancelled()
+
+    def _abandon(self, flow: _Flow, waiter: asyncio.Future):
+        waiter.cancel()
+        if waiter in flow.waiters:
+            flow.waiters.remove(waiter)
+
+    def release(self, ticket: FairTicket | None):
+        if ticket is None:
+            return
+        flow = self._flows.get(ticket.flow_key)
+        if flow is not None:
+            flow.inflight = max(flow.inflight - 1, 0)
+        self._inflight = max(self._inflight - 1, 0)
+        self._dispatch()
+
+    def _eligible(self, flow: _Flow) -> bool:
+        return bool(flow.waiters) and flow.inflight < flow.flow_class.concurrency and flow.tokens >= 1.0
+
+    def _grant(self, flow: _Flow) -> bool:
+        while flow.waiters:
+            waiter = flow.waiters.popleft()
+            if waiter.done():
+                continue
+            flow.tokens -= 1.0
+            flow.inflight += 1
+            flow.credits -= 1
+            self._inflight += 1
+            waiter.set_result(None)
+            return True
+        return False
+
+    def _dispatch(self):
+        now = time.monotonic()
+        for flow in self._flows.values():
+            flow.refill(now)
+        while self._inflight < self.capacity:
+            granted = False
+            for _ in range(len(self._order)):
+                flow = self._flows[self._order[0]]
+                if flow.credits <= 0:
+                    flow.credits = flow.flow_class.weight
+                while flow.credits > 0 and self._eligible(flow) and self._inflight < self.capacity:
+                    granted = self._grant(flow) or granted
+                if self._inflight >= self.capacity and flow.credits > 0 and self._eligible(flow):
+                    # Out of capacity mid-turn: keep the cursor and remaining credits here.
+                    break
+                flow.credits = 0
+                self._order.rotate(-1)
+            if not granted:
+                break
+        self._forget_idle_flows()
+        self._schedule_refill_wakeup()
+
+    def _forget_idle_flows(self):
+        for key in [key for key, flow in self._flows.items() if not flow.waiters and not flow.inflight]:
+            if self._flows[key].tokens >= self._flows[key].flow_class.burst:
+                del self._flows[key]
+                self._order.remove(key)
+
+    def _schedule_refill_wakeup(self):
+        if self._timer is not None or self._inflight >= self.capacity:
+            return
+        delays = [
+            flow.seconds_until_token()
+            for flow in self._flows.values()
+            if flow.waiters and flow.inflight < flow.flow_class.concurrency and flow.tokens < 1.0
+        ]
+        if not delays:
+            return
+
+        def wake():
+            self._timer = None
+            self._dispatch()
+
+        self._timer = asyncio.get_running_loop().call_later(min(delays), wake)
+
+    def snapshot(self) -> dict:
+        classes = {}
+        for name in self.classes:
+            flows = [flow for flow in self._flows.values() if flow.flow_class.name == name]
+            tracker = self._wait_ms[name]
+            classes[name] = {
+                "weight": self.classes[name].weight,
+                "active_flows": len(flows),
+                "queued": sum(len(flow.waiters) for flow in flows),
+                "inflight": sum(flow.inflight for flow in flows),
+                "rejected": self._rejected[name],
+                "wait_samples": tracker.count(),
+                "wait_p50_ms": round(tracker.percentile(50), 2),
+                "wait_p95_ms": round(tracker.percentile(95), 2),
+            }
+        return {
+            "enabled": self.enabled,
+            "capacity": self.capacity,
+            "inflight": self._inflight,
+            "classes": classes,
+        }
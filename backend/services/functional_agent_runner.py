@@ -1,10 +1,11 @@
 import threading
 import uuid
-from typing import Any, Callable, TypedDict
+from typing import TYPE_CHECKING, Any, Callable, TypedDict
 
-from langchain.agents import create_agent
-from langchain.agents.middleware import ModelRequest, dynamic_prompt
-from langchain_core.documents import Document
+from core.metrics import stage_timer
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
 
 
 class AgentRuntimeContext(TypedDict, total=False):
@@ -18,9 +19,9 @@ class FunctionalAgentRunner:
     def __init__(
         self,
         llm_factory: Callable[[], Any],
-        retrieve_documents: Callable[[str, int], list[Document]],
+        retrieve_documents: Callable[[str, int], list["Document"]],
         format_memory: Callable[[list[dict[str, str]]], str],
-        format_context: Callable[[list[Document]], str],
+        format_context: Callable[[list["Document"]], str],
     ):
         self._llm_factory = llm_factory
         self._retrieve_documents = retrieve_documents
@@ -29,7 +30,7 @@ class FunctionalAgentRunner:
         self._agent_lock = threading.Lock()
         self._agent = None
         self._docs_lock = threading.Lock()
-        self._retrieved_docs_by_request: dict[str, list[Document]] = {}
+        self._retrieved_docs_by_request: dict[str, list["Document"]] = {}
 
     @staticmethod
     def _to_text(content: Any) -> str:
@@ -113,19 +114,23 @@ class FunctionalAgentRunner:
 
         return self._to_text(result).strip()
 
-    def _set_request_docs(self, request_id: str, docs: list[Document]):
+    def _set_request_docs(self, request_id: str, docs: list["Document"]):
         if not request_id:
             return
         with self._docs_lock:
             self._retrieved_docs_by_request[request_id] = docs
 
-    def _pop_request_docs(self, request_id: str) -> list[Document]:
+    def _pop_request_docs(self, request_id: str) -> list["Document"]:
         if not request_id:
             return []
         with self._docs_lock:
             return self._retrieved_docs_by_request.pop(request_id, [])
 
     def _build_agent(self):
+        # Importing the agent stack is a large share of the first request, so it waits until here.
+        from langchain.agents import create_agent
+        from langchain.agents.middleware import ModelRequest, dynamic_prompt, wrap_model_call
+
         @dynamic_prompt
         def rag_prompt(request: ModelRequest) -> str:
             runtime_question = str(self._runtime_context_value(request, "question", "")).strip()
@@ -136,13 +141,15 @@ class FunctionalAgentRunner:
             active_memory = raw_memory if isinstance(raw_memory, list) else []
             request_id = str(self._runtime_context_value(request, "request_id", "")).strip()
 
-            retrieved_docs: list[Document] = []
+            retrieved_docs: list["Document"] = []
             if active_question:
-                retrieved_docs = self._retrieve_documents(active_question, top_k)
+                with stage_timer("agent", "retrieve"):
+                    retrieved_docs = self._retrieve_documents(active_question, top_k)
             self._set_request_docs(request_id, retrieved_docs)
 
-            memory_block = self._format_memory(active_memory)
-            context_block = self._format_context(retrieved_docs)
+            with stage_timer("agent", "prompt"):
+                memory_block = self._format_memory(active_memory)
+                context_block = self._format_context(retrieved_docs)
             return (
                 "You are a grounded RAG assistant.\n"
                 "Use only the retrieved context and conversation memory.\n"
@@ -151,10 +158,16 @@ class FunctionalAgentRunner:
                 f"Retrieved context:\n{context_block}"
             )
 
+        @wrap_model_call
+        def time_llm(request: ModelRequest, handler):
+            # Innermost middleware, so only the provider round trip is measured.
+            with stage_timer("agent", "llm"):
+                return handler(request)
+
         return create_agent(
             model=self._llm_factory(),
             tools=[],
-            middleware=[rag_prompt],
+            middleware=[rag_prompt, time_llm],
             context_schema=AgentRuntimeContext,
             name="rag_functional_agent",
         )
@@ -166,18 +179,22 @@ class FunctionalAgentRunner:
                     self._agent = self._build_agent()
         return self._agent
 
+    def warm_up(self):
+        self._get_agent()
+
     def answer(
         self,
         question: str,
         k: int,
         memory: list[dict[str, str]] | None = None,
         request_id: str | None = None,
-    ) -> tuple[str, list[Document]]:
+    ) -> tuple[str, list["Document"]]:
         safe_memory = memory or []
         active_request_id = (request_id or "").strip() or uuid.uuid4().hex
         top_k = self._coerce_k(k, 3)
         self._set_request_docs(active_request_id, [])
-        agent = self._get_agent()
+        with stage_timer("agent", "build"):
+            agent = self._get_agent()
         try:
             result = agent.invoke(
                 {"messages": [{"role": "user", "content": question}]},
@@ -0,0 +1,156 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from core.file_lock import FileLockTimeout, InterProcessLock
+from repositories import archive_repository
+
+
+class HistoryRetentionJob:
+    """Scheduled job that moves chat messages older than the retention window to archives.
+
+    Each batch is appended (and fsynced) to per-session gzip JSONL archives
+    before it is deleted from `chat_messages`, so a crash can only archive a row
+    twice, never lose it. After a run the freed pages are returned to the OS
+    with incremental vacuum. Every worker schedules the job, but a run only
+    proceeds in the worker that holds the archive directory's file lock; the
+    others skip that tick.
+    """
+
+    def __init__(
+        self,
+        logger,
+        archive_dir: Path,
+        retention_days: int = 0,
+        interval_seconds: float = 3600,
+        batch_size: int = 2000,
+        vacuum_pages: int = 2000,
+    ):
+        self.logger = logger
+        self.archive_dir = Path(archive_dir)
+        self.retention_days = max(int(retention_days), 0)
+        self.interval_seconds = max(float(interval_seconds), 1.0)
+        self.batch_size = max(int(batch_size), 1)
+        self.vacuum_pages = max(int(vacuum_pages), 0)
+        self._stop = threading.Event()
+        self._run_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._vacuum_warned = False
+        self._metrics = {
+            "runs": 0,
+            "skipped_locked": 0,
+            "failures": 0,
+            "archived_total": 0,
+            "freed_pages_total": 0,
+            "last_run_at": None,
+            "last_duration_ms": None,
+            "last_archived": 0,
+            "last_error": None,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.retention_days > 0
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="history-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception:
+                self.logger.exception("history_retention_failed")
+
+    def cutoff(self, now: datetime | None = None) -> str:
+        now = now or datetime.now(timezone.utc)
+        return (now - timedelta(days=self.retention_days)).isoformat()
+
+    def run_once(self, now: datetime | None = None) -> dict:
+        lock = InterProcessLock(archive_repository.lock_path(self.archive_dir))
+        try:
+            lock.acquire(timeout=0)
+        except FileLockTimeout:
+            self._metrics["skipped_locked"] += 1
+            return {"archived": 0, "freed_pages": 0, "skipped": True}
+        try:
+            return self._run_locked(now)
+        finally:
+            lock.release()
+
+    def _run_locked(self, now: datetime | None) -> dict:
+        with self._run_lock:
+            started = time.perf_counter()
+            archived = 0
+            try:
+                cutoff = self.cutoff(now)
+                while not self._stop.is_set():
+                    rows = archive_repository.list_oldest_messages(self.batch_size)
+                    expired = [row for row in rows if row["created_at"] < cutoff]
+                    if not expired:
+                        break
+                    self._archive(expired)
+                    archived += len(expired)
+                    if len(expired) < len(rows) or len(rows) < self.batch_size:
+                        break
+                vacuum = self._vacuum() if archived else {"freed_pages": 0}
+            except Exception as exc:
+                self._metrics["failures"] += 1
+                self._metrics["last_error"] = str(exc)
+                raise
+            finally:
+                self._metrics["runs"] += 1
+                self._metrics["last_run_at"] = datetime.now(timezone.utc).isoformat()
+                self._metrics["last_duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                self._metrics["last_archived"] = archived
+                self._metrics["archived_total"] += archived
+            self._metrics["freed_pages_total"] += vacuum["freed_pages"]
+            self._metrics["last_error"] = None
+            self.logger.info(
+                "history_retention_run archived=%s freed_pages=%s duration_ms=%s",
+                archived,
+                vacuum["freed_pages"],
+                self._metrics["last_duration_ms"],
+            )
+            return {"archived": archived, **vacuum}
+
+    def _archive(self, rows):
+        by_session: dict[tuple[int, int], list] = {}
+        for row in rows:
+            by_session.setdefault((int(row["user_id"]), int(row["session_id"])), []).append(row)
+        for (user_id, session_id), session_rows in by_session.items():
+            archive_repository.append_archive(self.archive_dir, user_id, session_id, session_rows)
+        archive_repository.delete_archived_messages(rows)
+
+    def _vacuum(self) -> dict:
+        result = archive_repository.incremental_vacuum(self.vacuum_pages)
+        if result["auto_vacuum"] != 2 and not self._vacuum_warned:
+            # Switching modes needs a full VACUUM, which is too disruptive to run on a live database.
+            self._vacuum_warned = True
+            self.logger.warning(
+                "history_retention_incremental_vacuum_disabled free_pages=%s "
+                "hint=run scripts/enable_incremental_vacuum.py while the app is stopped",
+                result["free_pages"],
+            )
+        return result
+
+    def snapshot(self) -> dict:
+        archive_bytes = sum(path.stat().st_size for path in archive_repository.archive_files(self.archive_dir))
+        return {
+            "enabled": self.enabled,
+            "retention_days": self.retention_days,
+            "interval_seconds": self.interval_seconds,
+            "archive_files_bytes": archive_bytes,
+            **self._metrics,
+        }
@@ -3,14 +3,16 @@ import threading
 
 from fastapi import HTTPException
 
-from repositories import ingest_job_repository
+from repositories import async_ingest_job_repository, ingest_job_repository
 from schemas.api import IngestJobResponse
+from services.usage_accounting import usage_scope
 
 
 class IngestJobService:
-    def __init__(self, rag_service, logger):
+    def __init__(self, rag_service, logger, usage_service=None):
         self.rag_service = rag_service
         self.logger = logger
+        self.usage_service = usage_service
 
     @staticmethod
     def _row_to_ingest_job(row) -> IngestJobResponse:
@@ -41,7 +43,13 @@ class IngestJobService:
     def _execute_ingest_job(self, job_id: int, reset: bool):
         self._update_ingest_job(job_id, status="running", error=None)
         try:
-            result = self.rag_service.run_ingest(reset)
+            with usage_scope() as usage:
+                try:
+                    result = self.rag_service.run_ingest(reset)
+                finally:
+                    # Embedding spend is recorded even when the ingest fails part way.
+                    if self.usage_service is not None:
+                        self.usage_service.record("ingest", usage, ingest_job_id=job_id)
             self._update_ingest_job(
                 job_id,
                 status="succeeded",
@@ -83,3 +91,13 @@ class IngestJobService:
     def list_ingest_jobs(self, limit: int = 20):
         rows = ingest_job_repository.list_ingest_job_rows(limit)
         return [self._row_to_ingest_job(row) for row in rows]
+
+    async def aget_ingest_job(self, job_id: int) -> IngestJobResponse:
+        row = await async_ingest_job_repository.get_ingest_job_row(job_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Ingest job not found")
+        return self._row_to_ingest_job(row)
+
+    async def alist_ingest_jobs(self, limit: int = 20):
+        rows = await async_ingest_job_repository.list_ingest_job_rows(limit)
+        return [self._row_to_ingest_job(row) for row in rows]
@@ -0,0 +1,101 @@
+import time
+from collections import OrderedDict, deque
+
+from fastapi import HTTPException
+
+
+class LoginThrottle:
+    """Sliding-window limits on failed sign-ins.
+
+    The hard limit is keyed on the (client address, username) pair: once a pair
+    has `max_failures` recent failures it is rejected with 429 before any
+    password hashing happens, so guessing cannot turn into a PBKDF2 CPU storm.
+    Other users behind the same proxy, and the account owner signing in from
+    elsewhere, are unaffected. Failures per username across all addresses only
+    add a growing delay once they pass `username_backoff_after`, so nobody can
+    lock an account out by failing sign-ins for it on purpose.
+    """
+
+    def __init__(
+        self,
+        max_failures: int = 5,
+        window_seconds: float = 300,
+        max_keys: int = 10000,
+        username_backoff_after: int = 20,
+        max_backoff_seconds: float = 5.0,
+    ):
+        self.max_failures = max(int(max_failures), 0)
+        self.window_seconds = max(float(window_seconds), 1.0)
+        self.max_keys = max(int(max_keys), 1)
+        self.username_backoff_after = max(int(username_backoff_after), 0)
+        self.max_backoff_seconds = max(float(max_backoff_seconds), 0.0)
+        self._failures: OrderedDict[str, deque] = OrderedDict()
+        self._throttled = 0
+        self._delayed = 0
+
+    @staticmethod
+    def _pair_key(username: str, client_host: str | None) -> str:
+        return f"pair:{client_host or 'unknown'}|{username.lower()}"
+
+    @staticmethod
+    def _username_key(username: str) -> str:
+        return f"user:{username.lower()}"
+
+    def _recent(self, key: str, now: float) -> deque | None:
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        while failures and now - failures[0] >= self.window_seconds:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def check(self, username: str, client_host: str | None) -> float:
+        """Raise 429 for a throttled pair; otherwise return how long to delay this attempt, in seconds."""
+        if not self.max_failures:
+            return 0.0
+        now = time.monotonic()
+        failures = self._recent(self._pair_key(username, client_host), now)
+        if failures is not None and len(failures) >= self.max_failures:
+            self._throttled += 1
+            retry_after = max(int(failures[0] + self.window_seconds - now + 0.999), 1)
+            raise HTTPException(
+                status_code=429,
+                detail="Too many failed sign-in attempts. Retry later.",
+                headers={"Retry-After": str(retry_after)},
+            )
+        if not self.username_backoff_after:
+            return 0.0
+        failures = self._recent(self._username_key(username), now)
+        excess = (len(failures) if failures is not None else 0) - self.username_backoff_after
+        if excess < 0:
+            return 0.0
+        self._delayed += 1
+        return min(0.25 * 2 ** min(excess, 16), self.max_backoff_seconds)
+
+    def record_failure(self, username: str, client_host: str | None):
+        if not self.max_failures:
+            return
+        now = time.monotonic()
+        for key in (self._pair_key(username, client_host), self._username_key(username)):
+            failures = self._recent(key, now) or deque()
+            failures.append(now)
+            self._failures[key] = failures
+            self._failures.move_to_end(key)
+        while len(self._failures) > self.max_keys:
+            self._failures.popitem(last=False)
+
+    def reset(self, username: str, client_host: str | None):
+        self._failures.pop(self._pair_key(username, client_host), None)
+
+    def snapshot(self) -> dict:
+        return {
+            "max_failures": self.max_failures,
+            "window_seconds": self.window_seconds,
+            "username_backoff_after": self.username_backoff_after,
+            "tracked_keys": len(self._failures),
+            "throttled": self._throttled,
+            "delayed": self._delayed,
+        }
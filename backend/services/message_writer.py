@@ -0,0 +1,213 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from repositories import session_repository
+from repositories.db import now_iso
+
+
+class MessageWriteBehind:
+    """Background writer that persists chat turns in grouped transactions.
+
+    Turns are queued with the timestamp of the answer and written by a single
+    thread in batches of up to `batch_size`, waiting at most `flush_interval_ms`
+    for a batch to fill. Readers call `wait_for_session` to see their own
+    session's pending writes, and `stop` drains the queue before returning.
+    When disabled, stopping, or when the queue is full, turns are written inline,
+    after the session's queued turns, so history and rolling memory keep their order.
+
+    The client already has its answer when a turn is queued, so a turn is not
+    dropped on failure: a batch that keeps failing is retried one message at a
+    time, and a message that still fails is appended to the dead-letter file
+    (`dead_letter_path`); `scripts/replay_dead_letters.py` writes those back.
+    """
+
+    RETRY_ATTEMPTS = 3
+    # How long an inline write waits for the session's queued turns before writing anyway.
+    INLINE_ORDER_WAIT_SECONDS = 10.0
+
+    def __init__(
+        self,
+        logger,
+        enabled: bool = False,
+        batch_size: int = 64,
+        flush_interval_ms: float = 50,
+        max_queue: int = 10000,
+        memory_limit: int = 5,
+        dead_letter_path: Path | None = None,
+    ):
+        self.logger = logger
+        self.enabled = bool(enabled)
+        self.batch_size = max(int(batch_size), 1)
+        self.flush_interval_seconds = max(float(flush_interval_ms), 0.0) / 1000.0
+        self.memory_limit = memory_limit
+        self.dead_letter_path = Path(dead_letter_path) if dead_letter_path else None
+        self._queue: queue.Queue = queue.Queue(maxsize=max(int(max_queue), 1))
+        self._pending: Counter = Counter()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._stats = {"queued": 0, "inline": 0, "written": 0, "batches": 0, "retried": 0, "dead_lettered": 0}
+
+    def start(self):
+        with self._cond:
+            if not self.enabled or self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="message-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, session_id: int, question: str, answer: str, memory_turn: dict[str, str] | None = None):
+        message = {
+            "session_id": session_id,
+            "question": question,
+            "answer": answer,
+            "memory_turn": memory_turn,
+            "created_at": now_iso(),
+        }
+        with self._cond:
+            # Checked under the lock `stop` takes, so nothing is queued once draining has started.
+            if self._thread is not None and not self._stopping:
+                try:
+                    self._queue.put_nowait(message)
+                    self._pending[session_id] += 1
+                    self._stats["queued"] += 1
+                    return
+                except queue.Full:
+                    # Backpressure falls back to the synchronous path instead of dropping turns.
+                    pass
+        if not self.wait_for_session(session_id, timeout=self.INLINE_ORDER_WAIT_SECONDS):
+            self.logger.warning("message_writer_inline_out_of_order session_id=%s", session_id)
+        self._write_inline(message)
+
+    def _write_inline(self, message: dict):
+        session_repository.save_messages([message], memory_limit=self.memory_limit)
+        with self._cond:
+            self._stats["inline"] += 1
+
+    def has_pending(self, session_id: int) -> bool:
+        with self._cond:
+            return self._pending[session_id] > 0
+
+    def wait_for_session(self, session_id: int, timeout: float = 5.0) -> bool:
+        """Block until every queued turn for `session_id` is committed."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending[session_id] > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while sum(self._pending.values()) > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout: float = 10.0):
+        with self._cond:
+            if self._thread is None:
+                return
+            self._stopping = True
+            thread = self._thread
+        thread.join(timeout)
+        if thread.is_alive():
+            self.logger.error("message_writer_stop_timeout pending=%s", sum(self._pending.values()))
+        with self._cond:
+            self._thread = None
+
+    def _next_batch(self) -> list[dict]:
+        try:
+            batch = [self._queue.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval_seconds
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stopping and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write_batch(batch)
+
+    def _save_with_retries(self, messages: list[dict]) -> bool:
+        for attempt in range(1, self.RETRY_ATTEMPTS + 1):
+            try:
+                session_repository.save_messages(messages, memory_limit=self.memory_limit)
+                return True
+            except Exception:
+                if attempt == self.RETRY_ATTEMPTS:
+                    self.logger.exception("message_writer_save_failed size=%s", len(messages))
+                else:
+                    time.sleep(0.05 * attempt)
+        return False
+
+    def _write_batch(self, batch: list[dict]):
+        try:
+            if self._save_with_retries(batch):
+                with self._cond:
+                    self._stats["written"] += len(batch)
+                    self._stats["batches"] += 1
+                return
+            # One bad row must not take the rest of the batch with it.
+            for message in batch:
+                if self._save_with_retries([message]):
+                    with self._cond:
+                        self._stats["written"] += 1
+                        self._stats["retried"] += 1
+                else:
+                    self._dead_letter(message)
+        finally:
+            self._done(batch)
+
+    def _dead_letter(self, message: dict):
+        with self._cond:
+            self._stats["dead_lettered"] += 1
+        self.logger.error(
+            "message_writer_dead_letter session_id=%s created_at=%s", message["session_id"], message["created_at"]
+        )
+        if self.dead_letter_path is None:
+            return
+        try:
+            self.dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.dead_letter_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(message, ensure_ascii=False) + "\n")
+                handle.flush()
+                os.fsync(handle.fileno())
+        except OSError:
+            self.logger.exception("message_writer_dead_letter_write_failed path=%s", self.dead_letter_path)
+
+    def _done(self, batch: list[dict]):
+        with self._cond:
+            for message in batch:
+                self._pending[message["session_id"]] -= 1
+                if self._pending[message["session_id"]] <= 0:
+                    del self._pending[message["session_id"]]
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "enabled": self.enabled,
+                "dead_letter_path": str(self.dead_letter_path) if self.dead_letter_path else None,
+                "running": self._thread is not None,
+                "queue_depth": self._queue.qsize(),
+                "pending_sessions": len(self._pending),
+                **self._stats,
+            }
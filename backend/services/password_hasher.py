@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException
+
+PBKDF2_ITERATIONS = 390000
+
+
+def pbkdf2_hex(password: str, salt: str, iterations: int = PBKDF2_ITERATIONS) -> str:
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), iterations).hex()
+
+
+def _lower_worker_priority(niceness: int):
+    # Hashing workers yield the CPU to request handling when the host is saturated.
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+
+
+class PasswordHasher:
+    """Runs PBKDF2 on a small spawn-context process pool with a bounded backlog.
+
+    At most `max_pending` hash/verify calls may be queued or running; beyond
+    that callers get a 503 immediately instead of piling up behind a login
+    storm. With `workers=0` the work runs on a thread instead (no extra
+    processes), which keeps scripts and constrained hosts working; a pool that
+    cannot start or breaks also falls back to threads.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = 32,
+        niceness: int = 5,
+        iterations: int = PBKDF2_ITERATIONS,
+        logger=None,
+    ):
+        self.logger = logger or logging.getLogger(__name__)
+        self.workers = max(int(workers), 0)
+        self.max_pending = max(int(max_pending), 1)
+        self.niceness = max(int(niceness), 0)
+        self.iterations = iterations
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {"hashed": 0, "verified": 0, "rejected": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor | None:
+        if self.workers == 0:
+            return None
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_lower_worker_priority,
+                        initargs=(self.niceness,),
+                    )
+        return self._executor
+
+    async def _derive(self, password: str, salt: str) -> str:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many concurrent sign-in requests. Retry shortly.",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            executor = self._get_executor()
+            if executor is not None:
+                try:
+                    return await asyncio.wrap_future(executor.submit(pbkdf2_hex, password, salt, self.iterations))
+                except BrokenProcessPool:
+                    self._fall_back_to_threads()
+            return await asyncio.to_thread(pbkdf2_hex, password, salt, self.iterations)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash_password(self, password: str) -> str:
+        salt = secrets.token_hex(16)
+        digest = await self._derive(password, salt)
+        with self._lock:
+            self._stats["hashed"] += 1
+        return f"{salt}${digest}"
+
+    async def verify_password(self, password: str, stored_hash: str) -> bool:
+        try:
+            salt, expected = stored_hash.split("$", 1)
+        except ValueError:
+            return False
+        digest = await self._derive(password, salt)
+        with self._lock:
+            self._stats["verified"] += 1
+        return secrets.compare_digest(digest, expected)
+
+    def _fall_back_to_threads(self):
+        self.logger.error("password_hasher_pool_broken falling back to thread hashing")
+        with self._lock:
+            executor, self._executor, self.workers = self._executor, None, 0
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self):
+        executor = self._get_executor()
+        if executor is None:
+            return
+        try:
+            # Spawned workers import on first use; pay that before the first login.
+            list(executor.map(pbkdf2_hex, ["warmup"] * self.workers, ["salt"] * self.workers, [1] * self.workers))
+        except BrokenProcessPool:
+            self._fall_back_to_threads()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "max_pending": self.max_pending, "pending": self._pending, **self._stats}
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
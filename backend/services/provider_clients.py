@@ -0,0 +1,138 @@
+"""LangChain provider clients, kept apart from the gateway so importing it stays cheap.
+
+`langchain_openai` (and the `openai` SDK under it) is the slowest import in the
+backend; the gateway only imports this module when the first client is built.
+"""
+
+import logging
+from typing import Any, Callable
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_openai import OpenAIEmbeddings
+from pydantic import ConfigDict
+
+from services.provider_hedging import ProviderHedger
+from services.provider_scheduler import estimate_tokens
+from services.usage_accounting import record_embedding_usage, record_llm_usage
+
+logger = logging.getLogger("rag_api.provider_clients")
+
+# Completion budget assumed when reserving TPM before the provider reports usage.
+ESTIMATED_COMPLETION_TOKENS = 512
+
+
+class UsageReportingEmbeddings(OpenAIEmbeddings):
+    """OpenAIEmbeddings that records the `usage` block the base class discards."""
+
+    provider_name: str = ""
+
+    def embed_documents(self, texts: list[str], chunk_size: int | None = None, **kwargs) -> list[list[float]]:
+        if self.check_embedding_ctx_length:
+            return super().embed_documents(texts, chunk_size=chunk_size, **kwargs)
+        self._ensure_sync_client_available()
+        step = chunk_size or self.chunk_size
+        client_kwargs = {**self._invocation_params, **kwargs}
+        vectors: list[list[float]] = []
+        for start in range(0, len(texts), step):
+            batch = texts[start : start + step]
+            response = self.client.create(input=batch, **client_kwargs)
+            if not isinstance(response, dict):
+                response = response.model_dump()
+            vectors.extend(item["embedding"] for item in response["data"])
+            usage = response.get("usage") or {}
+            tokens = usage.get("prompt_tokens") or usage.get("total_tokens")
+            record_embedding_usage(self.provider_name, self.model, tokens or estimate_tokens(*batch), not tokens)
+        return vectors
+
+
+class EmbeddingDimensionMismatch(ValueError):
+    pass
+
+
+class HedgedEmbeddings(Embeddings):
+    """Embeddings hedged across providers that serve the same model.
+
+    Only the primary is called until it has reported the vector dimension; a
+    secondary that then answers with another dimension fails that attempt and
+    is dropped, so vectors from a different space never reach the index.
+    """
+
+    def __init__(
+        self,
+        hedger: ProviderHedger,
+        clients: list[tuple[str, Embeddings]],
+        batch_size: int = 64,
+    ):
+        self._hedger = hedger
+        self._clients = clients
+        self._batch_size = max(int(batch_size), 1)
+        self._dimension: int | None = None
+
+    def _checked(self, name: str, vectors: list[list[float]]) -> list[list[float]]:
+        dimensions = {len(vector) for vector in vectors}
+        if self._dimension is None and name == self._clients[0][0] and len(dimensions) == 1:
+            self._dimension = dimensions.pop()
+        elif dimensions - {self._dimension}:
+            self._clients = [client for client in self._clients if client[0] != name]
+            logger.warning("embedding_hedge_provider_dropped provider=%s dimensions=%s", name, sorted(dimensions))
+            raise EmbeddingDimensionMismatch(f"{name} returned dimensions {sorted(dimensions)}, not {self._dimension}")
+        return vectors
+
+    def _call(self, embed: Callable[[Embeddings], list[list[float]]], tokens: int) -> list[list[float]]:
+        clients = self._clients if self._dimension is not None else self._clients[:1]
+        return self._hedger.call(
+            "embedding",
+            [(name, lambda name=name, client=client: self._checked(name, embed(client))) for name, client in clients],
+            tokens=tokens,
+        )
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors: list[list[float]] = []
+        # Batches are scheduled one by one so chat calls can interleave with large ingests.
+        for start in range(0, len(texts), self._batch_size):
+            batch = texts[start : start + self._batch_size]
+            vectors.extend(self._call(lambda client: client.embed_documents(batch), estimate_tokens(*batch)))
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._call(lambda client: [client.embed_query(text)], estimate_tokens(text))[0]
+
+
+class HedgedChatModel(BaseChatModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    hedger: Any
+    clients: list[tuple[str, Any]]
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged-openai-compatible"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt_tokens = estimate_tokens(*(str(message.content) for message in messages))
+        message = self.hedger.call(
+            "llm",
+            [
+                (name, lambda name=name, client=client: self._invoke(name, client, messages, stop, **kwargs))
+                for name, client in self.clients
+            ],
+            tokens=prompt_tokens + ESTIMATED_COMPLETION_TOKENS,
+            measure=lambda message: (getattr(message, "usage_metadata", None) or {}).get("total_tokens"),
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @staticmethod
+    def _invoke(name: str, client, messages, stop, **kwargs):
+        message = client.invoke(messages, stop=stop, **kwargs)
+        # Every completed call is billed, including a hedge that lost the race.
+        usage = getattr(message, "usage_metadata", None) or {}
+        record_llm_usage(
+            name,
+            getattr(client, "model_name", ""),
+            usage.get("input_tokens") or estimate_tokens(*(str(item.content) for item in messages)),
+            usage.get("output_tokens") or estimate_tokens(str(message.content)),
+            estimated=not usage,
+        )
+        return message
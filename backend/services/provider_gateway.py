@@ -0,0 +1,156 @@
+import logging
+from typing import TYPE_CHECKING
+
+from core.providers import ProviderEndpoint
+from services.provider_hedging import ProviderHedger
+from services.provider_scheduler import ProviderCallScheduler
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+logger = logging.getLogger("rag_api.provider_gateway")
+
+
+class ProviderGateway:
+    """Builds provider clients and routes every LLM/embedding call through the scheduler and hedger."""
+
+    def __init__(
+        self,
+        endpoints: list[ProviderEndpoint],
+        ai_timeout_seconds: float = 20,
+        ai_max_retries: int = 1,
+        app_name: str | None = None,
+        app_url: str | None = None,
+        hedge_enabled: bool = False,
+        hedge_embeddings: bool = False,
+        hedge_percentile: float = 95,
+        hedge_min_delay_ms: float = 250,
+        hedge_initial_delay_ms: float = 2000,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_seconds: float = 30,
+        scheduler: ProviderCallScheduler | None = None,
+        embedding_batch_size: int = 64,
+    ):
+        if not endpoints:
+            raise ValueError("At least one provider endpoint is required.")
+        self.endpoints = list(endpoints)
+        self.ai_timeout_seconds = max(float(ai_timeout_seconds), 1.0)
+        self.ai_max_retries = max(int(ai_max_retries), 0)
+        self.app_name = app_name
+        self.app_url = app_url
+        # Secondary embedding providers must serve the same vector space as the index.
+        self.hedge_embeddings = bool(hedge_embeddings)
+        self.scheduler = scheduler or ProviderCallScheduler(interactive_timeout_seconds=self.ai_timeout_seconds)
+        self.hedger = ProviderHedger(
+            [endpoint.name for endpoint in self.endpoints],
+            hedge_enabled=hedge_enabled,
+            hedge_percentile=hedge_percentile,
+            hedge_min_delay_ms=hedge_min_delay_ms,
+            hedge_initial_delay_ms=hedge_initial_delay_ms,
+            breaker_failure_threshold=breaker_failure_threshold,
+            breaker_reset_seconds=breaker_reset_seconds,
+            scheduler=self.scheduler,
+        )
+        self.embedding_batch_size = max(int(embedding_batch_size), 1)
+        self._embeddings = None
+        self._llm = None
+
+    @property
+    def primary(self) -> ProviderEndpoint:
+        return self.endpoints[0]
+
+    def _default_headers(self, endpoint: ProviderEndpoint):
+        if "openrouter.ai" not in endpoint.base_url:
+            return None
+        headers = {}
+        if self.app_name:
+            headers["X-Title"] = self.app_name
+        if self.app_url:
+            headers["HTTP-Referer"] = self.app_url
+        return headers or None
+
+    def _require_api_key(self):
+        if not self.primary.api_key:
+            raise RuntimeError("API key is not set. Configure AI_API_KEY or the active provider key.")
+
+    def _build_embeddings(self, endpoint: ProviderEndpoint) -> "OpenAIEmbeddings":
+        from services.provider_clients import UsageReportingEmbeddings
+
+        return UsageReportingEmbeddings(
+            provider_name=endpoint.name,
+            api_key=endpoint.api_key,
+            base_url=endpoint.base_url,
+            model=endpoint.embedding_model,
+            timeout=self.ai_timeout_seconds,
+            max_retries=self.ai_max_retries,
+            default_headers=self._default_headers(endpoint),
+            # OpenAI-compatible embedding endpoints should receive raw text;
+            # local token counting can trigger unsupported tokenizer lookups.
+            check_embedding_ctx_length=False,
+        )
+
+    def _build_llm(self, endpoint: ProviderEndpoint) -> "ChatOpenAI":
+        from langchain_openai import ChatOpenAI
+
+        return ChatOpenAI(
+            api_key=endpoint.api_key,
+            base_url=endpoint.base_url,
+            model=endpoint.model,
+            temperature=0.2,
+            timeout=self.ai_timeout_seconds,
+            max_retries=self.ai_max_retries,
+            default_headers=self._default_headers(endpoint),
+        )
+
+    def embedding_endpoints(self) -> list[ProviderEndpoint]:
+        """The primary plus, when embedding hedging is on, secondaries serving the same embedding model."""
+        if not self.hedge_embeddings:
+            return self.endpoints[:1]
+        model = self.primary.embedding_model
+        skipped = [endpoint.name for endpoint in self.endpoints if endpoint.embedding_model != model]
+        if skipped:
+            logger.warning("embedding_hedge_skipped providers=%s reason=embedding_model_mismatch", ",".join(skipped))
+        return [endpoint for endpoint in self.endpoints if endpoint.embedding_model == model]
+
+    def get_embeddings(self) -> "Embeddings":
+        if self._embeddings is None:
+            self._require_api_key()
+            from services.provider_clients import HedgedEmbeddings
+
+            self._embeddings = HedgedEmbeddings(
+                self.hedger,
+                [(endpoint.name, self._build_embeddings(endpoint)) for endpoint in self.embedding_endpoints()],
+                batch_size=self.embedding_batch_size,
+            )
+        return self._embeddings
+
+    def get_llm(self) -> "BaseChatModel":
+        if self._llm is None:
+            self._require_api_key()
+            from services.provider_clients import HedgedChatModel
+
+            self._llm = HedgedChatModel(
+                hedger=self.hedger,
+                clients=[(endpoint.name, self._build_llm(endpoint)) for endpoint in self.endpoints],
+            )
+        return self._llm
+
+    def warm_up(self, ping: bool = False):
+        """Build the clients now; `ping` also sends one tiny embedding call to open the HTTP connection."""
+        embeddings = self.get_embeddings()
+        self.get_llm()
+        if ping:
+            embeddings.embed_query("warmup")
+
+    def health_snapshot(self) -> dict:
+        return {
+            "hedge_enabled": self.hedger.hedge_enabled,
+            "hedge_embeddings": self.hedge_embeddings,
+            "providers": self.hedger.snapshot(),
+            "scheduler": self.scheduler.snapshot(),
+        }
+
+    def shutdown(self):
+        self.hedger.shutdown()
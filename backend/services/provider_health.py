@@ -0,0 +1,132 @@
+import math
+import threading
+import time
+from collections import deque
+
+
+class ProviderUnavailableError(RuntimeError):
+    pass
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200):
+        self._samples: deque[float] = deque(maxlen=max(int(window), 1))
+        self._lock = threading.Lock()
+
+    def record(self, elapsed_ms: float):
+        with self._lock:
+            self._samples.append(float(elapsed_ms))
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, p: float) -> float:
+        with self._lock:
+            values = sorted(self._samples)
+        if not values:
+            return 0.0
+        rank = int(math.ceil((p / 100.0) * len(values))) - 1
+        return values[max(0, min(rank, len(values) - 1))]
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.reset_seconds = max(float(reset_seconds), 0.0)
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_seconds:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # Half-open lets exactly one probe through until it reports back.
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def release_probe(self):
+        """Hand back a half-open probe slot that `allow_request` granted but the caller never used."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+class ProviderHealth:
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30):
+        self.name = name
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+        self._latency: dict[str, LatencyTracker] = {}
+        self._calls: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def latency(self, operation: str) -> LatencyTracker:
+        with self._lock:
+            if operation not in self._latency:
+                self._latency[operation] = LatencyTracker()
+            return self._latency[operation]
+
+    def record(self, operation: str, elapsed_ms: float, ok: bool):
+        with self._lock:
+            self._calls[operation] = self._calls.get(operation, 0) + 1
+            if not ok:
+                self._errors[operation] = self._errors.get(operation, 0) + 1
+        if ok:
+            self.latency(operation).record(elapsed_ms)
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            operations = sorted(self._calls)
+            calls = dict(self._calls)
+            errors = dict(self._errors)
+        return {
+            "name": self.name,
+            "breaker": self.breaker.state,
+            "operations": {
+                operation: {
+                    "calls": calls.get(operation, 0),
+                    "errors": errors.get(operation, 0),
+                    "p50_ms": round(self.latency(operation).percentile(50), 2),
+                    "p95_ms": round(self.latency(operation).percentile(95), 2),
+                }
+                for operation in operations
+            },
+        }
@@ -0,0 +1,204 @@
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable
+
+from services.provider_health import ProviderHealth, ProviderUnavailableError
+from services.provider_scheduler import ProviderCallScheduler
+
+logger = logging.getLogger("rag_api.provider_hedging")
+
+ProviderCall = tuple[str, Callable[[], Any]]
+
+
+class ProviderHedger:
+    """Runs one logical provider call against an ordered list of providers.
+
+    Without hedging, providers are tried in order and the next one is used only
+    after a failure. With hedging, a duplicate request goes to the next provider
+    once the active one has been silent for longer than its latency percentile,
+    and the first successful answer wins.
+
+    With a scheduler, every attempt holds its own scheduler slot, so hedged
+    duplicates and failovers count against the shared RPM/TPM budget exactly
+    like the first request. A hedge is skipped while the budget is exhausted.
+    """
+
+    MIN_SAMPLES_FOR_PERCENTILE = 20
+
+    def __init__(
+        self,
+        provider_names: list[str],
+        hedge_enabled: bool = False,
+        hedge_percentile: float = 95,
+        hedge_min_delay_ms: float = 250,
+        hedge_initial_delay_ms: float = 2000,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_seconds: float = 30,
+        max_workers: int = 16,
+        scheduler: ProviderCallScheduler | None = None,
+    ):
+        self.hedge_enabled = bool(hedge_enabled)
+        self.hedge_percentile = min(max(float(hedge_percentile), 1.0), 100.0)
+        self.hedge_min_delay_ms = max(float(hedge_min_delay_ms), 0.0)
+        self.hedge_initial_delay_ms = max(float(hedge_initial_delay_ms), self.hedge_min_delay_ms)
+        self._health = {
+            name: ProviderHealth(name, breaker_failure_threshold, breaker_reset_seconds)
+            for name in provider_names
+        }
+        self.scheduler = scheduler
+        self._max_workers = max(int(max_workers), 1)
+        self._executor = None
+
+    def health(self, name: str) -> ProviderHealth:
+        return self._health[name]
+
+    def snapshot(self) -> list[dict]:
+        return [health.snapshot() for health in self._health.values()]
+
+    def hedge_delay_seconds(self, name: str, operation: str) -> float:
+        tracker = self._health[name].latency(operation)
+        if tracker.count() < self.MIN_SAMPLES_FOR_PERCENTILE:
+            delay_ms = self.hedge_initial_delay_ms
+        else:
+            delay_ms = max(tracker.percentile(self.hedge_percentile), self.hedge_min_delay_ms)
+        return delay_ms / 1000.0
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers,
+                thread_name_prefix="provider-hedge",
+            )
+        return self._executor
+
+    def _timed(self, name: str, operation: str, fn: Callable[[], Any]):
+        started = time.perf_counter()
+        try:
+            result = fn()
+        except Exception:
+            self._health[name].record(operation, (time.perf_counter() - started) * 1000, ok=False)
+            raise
+        self._health[name].record(operation, (time.perf_counter() - started) * 1000, ok=True)
+        return result
+
+    def _reserve(self, tokens: int, wait: bool = True):
+        if self.scheduler is None:
+            return None
+        return self.scheduler.acquire(tokens, wait=wait)
+
+    def _release(self, ticket):
+        if ticket is not None:
+            self.scheduler.release(ticket)
+
+    def _attempt(self, name: str, operation: str, fn: Callable[[], Any], ticket, measure):
+        try:
+            result = self._timed(name, operation, fn)
+            if ticket is not None and measure is not None:
+                ticket.actual_tokens = measure(result)
+            return result
+        finally:
+            self._release(ticket)
+
+    def call(
+        self,
+        operation: str,
+        calls: list[ProviderCall],
+        tokens: int = 1,
+        measure: Callable[[Any], int | None] | None = None,
+    ):
+        """Run `calls` in order; every attempt, hedge or failover, reserves `tokens` from the scheduler.
+
+        `measure` maps a successful result to the tokens it really used, so the
+        scheduler window is corrected once the provider reports usage.
+        """
+        if not self.hedge_enabled or len(calls) == 1:
+            return self._call_sequential(operation, calls, tokens, measure)
+        return self._call_hedged(operation, calls, tokens, measure)
+
+    def _call_sequential(self, operation: str, calls: list[ProviderCall], tokens: int, measure):
+        last_error: Exception | None = None
+        for name, fn in calls:
+            breaker = self._health[name].breaker
+            if not breaker.allow_request():
+                continue
+            # Outside the try: an exhausted budget fails the call instead of failing over. A half-open
+            # probe granted above goes back first, or the breaker would never let another through.
+            try:
+                ticket = self._reserve(tokens)
+            except BaseException:
+                breaker.release_probe()
+                raise
+            try:
+                return self._attempt(name, operation, fn, ticket, measure)
+            except Exception as exc:
+                last_error = exc
+                logger.warning("provider_call_failed provider=%s operation=%s error=%s", name, operation, exc)
+        if last_error is not None:
+            raise last_error
+        raise ProviderUnavailableError(f"All AI providers are unavailable for {operation} (circuit open).")
+
+    def _call_hedged(self, operation: str, calls: list[ProviderCall], tokens: int, measure):
+        queue = list(calls)
+        attempts = {}
+        last_error: Exception | None = None
+
+        def launch_next(hedge: bool = False):
+            if not queue:
+                return None
+            # A hedge is optional, so it never waits for budget; the first call and failovers do.
+            ticket = self._reserve(tokens, wait=not hedge)
+            if hedge and ticket is None and self.scheduler is not None:
+                logger.info("provider_hedge_skipped operation=%s reason=budget", operation)
+                return None
+            while queue:
+                name, fn = queue.pop(0)
+                if not self._health[name].breaker.allow_request():
+                    continue
+                context = contextvars.copy_context()
+                future = self._get_executor().submit(context.run, self._attempt, name, operation, fn, ticket, measure)
+                attempts[future] = name
+                return future
+            self._release(ticket)
+            return None
+
+        first = launch_next()
+        if first is None:
+            raise ProviderUnavailableError(f"All AI providers are unavailable for {operation} (circuit open).")
+
+        pending = {first}
+        while pending:
+            active_name = list(attempts.values())[-1]
+            timeout = self.hedge_delay_seconds(active_name, operation) if queue else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedge = launch_next(hedge=True)
+                if hedge is not None:
+                    pending.add(hedge)
+                    logger.info("provider_call_hedged operation=%s after=%s", operation, active_name)
+                continue
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    return future.result()
+                last_error = error
+                logger.warning(
+                    "provider_call_failed provider=%s operation=%s error=%s",
+                    attempts[future],
+                    operation,
+                    error,
+                )
+            if not pending:
+                failover = launch_next()
+                if failover is not None:
+                    pending.add(failover)
+
+        if last_error is not None:
+            raise last_error
+        raise ProviderUnavailableError(f"All AI providers are unavailable for {operation} (circuit open).")
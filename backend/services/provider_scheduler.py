@@ -0,0 +1,179 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from services.provider_health import LatencyTracker, ProviderUnavailableError
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_current_priority: contextvars.ContextVar[str] = contextvars.ContextVar("provider_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def provider_priority(priority: str):
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_provider_priority() -> str:
+    return _current_priority.get()
+
+
+def estimate_tokens(*texts: str) -> int:
+    # Roughly four characters per token across the OpenAI-compatible models we use.
+    return max(sum(len(text or "") for text in texts) // 4, 1)
+
+
+@dataclass
+class ProviderTicket:
+    priority: str
+    record: list
+    actual_tokens: int | None = None
+
+
+class ProviderCallScheduler:
+    """Admits provider calls against shared RPM/TPM budgets with priority classes.
+
+    Interactive calls may use the whole budget and always go first. Background
+    calls only start when no interactive call is waiting, are capped at
+    `background_concurrency`, and may use at most `1 - background_reserve` of each
+    budget, so the reserved headroom is always left for chat.
+    """
+
+    BLOCKED_POLL_SECONDS = 0.25
+
+    def __init__(
+        self,
+        rpm_limit: int = 0,
+        tpm_limit: int = 0,
+        background_reserve: float = 0.3,
+        background_concurrency: int = 2,
+        interactive_timeout_seconds: float = 20,
+        window_seconds: float = 60,
+    ):
+        self.rpm_limit = max(int(rpm_limit), 0)
+        self.tpm_limit = max(int(tpm_limit), 0)
+        self.background_reserve = min(max(float(background_reserve), 0.0), 0.95)
+        self.background_concurrency = max(int(background_concurrency), 1)
+        self.interactive_timeout_seconds = max(float(interactive_timeout_seconds), 0.0)
+        self.window_seconds = max(float(window_seconds), 1.0)
+        self._window: deque[list] = deque()
+        self._cond = threading.Condition()
+        self._waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._inflight = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._admitted = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._rejected = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._wait_ms = {INTERACTIVE: LatencyTracker(), BACKGROUND: LatencyTracker()}
+
+    def _prune(self, now: float):
+        while self._window and now - self._window[0][0] >= self.window_seconds:
+            self._window.popleft()
+
+    def _expiry_delay(self, drop_count: int, now: float) -> float:
+        index = min(max(drop_count, 1), len(self._window)) - 1
+        return max(self._window[index][0] + self.window_seconds - now, 0.01)
+
+    def _admission_delay(self, priority: str, tokens: int, now: float) -> float:
+        if priority == BACKGROUND:
+            if self._waiting[INTERACTIVE] or self._inflight[BACKGROUND] >= self.background_concurrency:
+                return self.BLOCKED_POLL_SECONDS
+            share = 1.0 - self.background_reserve
+        else:
+            share = 1.0
+        if not self._window:
+            # An empty window always admits, so one oversized call cannot deadlock.
+            return 0.0
+
+        delays = [0.0]
+        if self.rpm_limit:
+            allowed = max(int(self.rpm_limit * share), 1)
+            if len(self._window) + 1 > allowed:
+                delays.append(self._expiry_delay(len(self._window) + 1 - allowed, now))
+        if self.tpm_limit:
+            allowed_tokens = max(int(self.tpm_limit * share), 1)
+            used = sum(record[1] for record in self._window)
+            drop_count = 0
+            while used + tokens > allowed_tokens and drop_count < len(self._window):
+                used -= self._window[drop_count][1]
+                drop_count += 1
+            if drop_count:
+                delays.append(self._expiry_delay(drop_count, now))
+        return max(delays)
+
+    def acquire(self, estimated_tokens: int, priority: str | None = None, wait: bool = True) -> ProviderTicket | None:
+        """Reserve budget for one provider request; with `wait=False`, return None instead of waiting."""
+        priority = priority or current_provider_priority()
+        tokens = max(int(estimated_tokens), 1)
+        started = time.monotonic()
+        deadline = started + self.interactive_timeout_seconds if priority == INTERACTIVE else None
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._prune(now)
+                    delay = self._admission_delay(priority, tokens, now)
+                    if delay <= 0:
+                        break
+                    if not wait:
+                        return None
+                    if deadline is not None and now >= deadline:
+                        self._rejected[priority] += 1
+                        raise ProviderUnavailableError("AI provider rate budget is exhausted. Retry later.")
+                    self._cond.wait(delay if deadline is None else min(delay, deadline - now))
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+            record = [now, tokens]
+            self._window.append(record)
+            self._inflight[priority] += 1
+            self._admitted[priority] += 1
+        self._wait_ms[priority].record((time.monotonic() - started) * 1000)
+        return ProviderTicket(priority=priority, record=record)
+
+    def release(self, ticket: ProviderTicket):
+        with self._cond:
+            if ticket.actual_tokens is not None:
+                ticket.record[1] = max(int(ticket.actual_tokens), 1)
+            self._inflight[ticket.priority] = max(self._inflight[ticket.priority] - 1, 0)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, estimated_tokens: int, priority: str | None = None):
+        ticket = self.acquire(estimated_tokens, priority)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            self._prune(time.monotonic())
+            rpm_used = len(self._window)
+            tpm_used = sum(record[1] for record in self._window)
+            classes = {
+                priority: {
+                    "waiting": self._waiting[priority],
+                    "inflight": self._inflight[priority],
+                    "admitted": self._admitted[priority],
+                    "rejected": self._rejected[priority],
+                }
+                for priority in (INTERACTIVE, BACKGROUND)
+            }
+        for priority, stats in classes.items():
+            stats["wait_p95_ms"] = round(self._wait_ms[priority].percentile(95), 2)
+        return {
+            "rpm_limit": self.rpm_limit,
+            "tpm_limit": self.tpm_limit,
+            "rpm_used": rpm_used,
+            "tpm_used": tpm_used,
+            "background_reserve": self.background_reserve,
+            "classes": classes,
+        }
@@ -1,57 +1,46 @@
 import logging
-import shutil
-import threading
 import time
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from chromadb.config import Settings as ChromaSettings
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
-from langchain_community.vectorstores import Chroma
-from langchain_core.documents import Document
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-
+from core.metrics import stage_timer
 from services.functional_agent_runner import FunctionalAgentRunner
+from services.provider_gateway import ProviderGateway
+from services.provider_scheduler import BACKGROUND, provider_priority
 from services.rerank_service import EmbeddingRerankService
+from services.vector_index import VectorIndex
+
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+
+# chromadb, the LangChain loaders and the splitter are imported on first use
+# (or by the startup warmup), so workers that never touch RAG don't pay for them.
 
 logger = logging.getLogger("rag_api.rag_service")
 
 
 class RagService:
+    MIN_CHUNK_SIZE = 100
+
     def __init__(
         self,
         data_dir: Path,
         chroma_dir: Path,
-        api_key: str,
-        base_url: str,
-        model: str,
-        embedding_model: str,
-        ai_timeout_seconds: float = 20,
-        ai_max_retries: int = 1,
+        provider_gateway: ProviderGateway,
         chroma_anonymized_telemetry: bool = False,
-        app_name: str | None = None,
-        app_url: str | None = None,
         rerank_enabled: bool = False,
         rerank_fetch_k: int = 8,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 150,
     ):
         self.data_dir = data_dir
-        self.chroma_dir = chroma_dir
-        self.api_key = api_key
-        self.base_url = base_url
-        self.model = model
-        self.embedding_model = embedding_model
-        self.ai_timeout_seconds = max(float(ai_timeout_seconds), 1.0)
-        self.ai_max_retries = max(int(ai_max_retries), 0)
-        self.chroma_anonymized_telemetry = bool(chroma_anonymized_telemetry)
-        self.app_name = app_name
-        self.app_url = app_url
+        self.provider_gateway = provider_gateway
+        self.vector_index = VectorIndex(chroma_dir, self.get_embeddings, chroma_anonymized_telemetry)
         self.rerank_enabled = rerank_enabled
         self.rerank_fetch_k = max(rerank_fetch_k, 1)
+        self.chunk_size = max(chunk_size, self.MIN_CHUNK_SIZE)
+        self.chunk_overlap = min(max(chunk_overlap, 0), self.chunk_size // 2)
 
-        self._embeddings = None
-        self._llm = None
-        self._vectorstore = None
-        self._ingest_lock = threading.Lock()
         self._agent_runner = FunctionalAgentRunner(
             llm_factory=self.get_llm,
             retrieve_documents=self._retrieve_documents,
@@ -59,71 +48,26 @@ class RagService:
             format_context=self._format_retrieved_context,
         )
 
-    def _chroma_settings(self) -> ChromaSettings:
-        return ChromaSettings(
-            is_persistent=True,
-            persist_directory=str(self.chroma_dir),
-            anonymized_telemetry=self.chroma_anonymized_telemetry,
-        )
-
-    def _default_headers(self):
-        if "openrouter.ai" not in self.base_url:
-            return None
-        headers = {}
-        if self.app_name:
-            headers["X-Title"] = self.app_name
-        if self.app_url:
-            headers["HTTP-Referer"] = self.app_url
-        return headers or None
-
-    def _require_api_key(self):
-        if not self.api_key:
-            raise RuntimeError("API key is not set. Configure AI_API_KEY or the active provider key.")
+    @classmethod
+    def chunking_error(cls, chunk_size: int, chunk_overlap: int) -> str | None:
+        """Why the constructor would clamp this chunk_size/overlap pair, or None if it is used as given."""
+        if chunk_size < cls.MIN_CHUNK_SIZE:
+            return f"chunk_size must be at least {cls.MIN_CHUNK_SIZE}"
+        if not 0 <= chunk_overlap <= chunk_size // 2:
+            return f"overlap must be between 0 and chunk_size // 2 ({chunk_size // 2})"
+        return None
 
     def get_embeddings(self):
-        if self._embeddings is None:
-            self._require_api_key()
-            self._embeddings = OpenAIEmbeddings(
-                api_key=self.api_key,
-                base_url=self.base_url,
-                model=self.embedding_model,
-                timeout=self.ai_timeout_seconds,
-                max_retries=self.ai_max_retries,
-                default_headers=self._default_headers(),
-                # OpenAI-compatible embedding endpoints should receive raw text;
-                # local token counting can trigger unsupported tokenizer lookups.
-                check_embedding_ctx_length=False,
-            )
-        return self._embeddings
+        return self.provider_gateway.get_embeddings()
 
     def get_llm(self):
-        if self._llm is None:
-            self._require_api_key()
-            self._llm = ChatOpenAI(
-                api_key=self.api_key,
-                base_url=self.base_url,
-                model=self.model,
-                temperature=0.2,
-                timeout=self.ai_timeout_seconds,
-                max_retries=self.ai_max_retries,
-                default_headers=self._default_headers(),
-            )
-        return self._llm
+        return self.provider_gateway.get_llm()
 
     def has_index(self):
-        return self.chroma_dir.exists() and any(self.chroma_dir.iterdir())
+        return self.vector_index.has_index()
 
     def get_vectorstore(self):
-        if self._vectorstore is None:
-            if not self.has_index():
-                raise RuntimeError("Vector index not found. Run ingest first.")
-            self._vectorstore = Chroma(
-                collection_name="rag",
-                persist_directory=str(self.chroma_dir),
-                client_settings=self._chroma_settings(),
-                embedding_function=self.get_embeddings(),
-            )
-        return self._vectorstore
+        return self.vector_index.get()
 
     def collect_files(self):
         if not self.data_dir.exists():
@@ -133,6 +77,8 @@ class RagService:
 
     @staticmethod
     def load_documents(files):
+        from langchain_community.document_loaders import PyPDFLoader, TextLoader
+
         docs = []
         failed = []
         for path in files:
@@ -176,7 +122,7 @@ class RagService:
         return "\n".join(lines) if lines else "No conversation memory."
 
     @staticmethod
-    def _format_retrieved_context(docs: list[Document]) -> str:
+    def _format_retrieved_context(docs: list["Document"]) -> str:
         if not docs:
             return "No retrieved context."
         blocks = []
@@ -192,15 +138,19 @@ class RagService:
             blocks.append(f"{header}\n{text}")
         return "\n\n".join(blocks)
 
-    def _retrieve_documents(self, question: str, k: int) -> list[Document]:
+    def _retrieve_documents(self, question: str, k: int) -> list["Document"]:
         started = time.perf_counter()
         top_k = max(int(k), 1)
-        vectorstore = self.get_vectorstore()
         fetch_k = max(top_k, self.rerank_fetch_k) if self.rerank_enabled else top_k
-        docs = vectorstore.similarity_search(question, k=fetch_k)
+        # Embedding the query ourselves lets embed and vector-search time be measured apart.
+        with stage_timer("rag", "embed"):
+            query_vector = self.get_embeddings().embed_query(question)
+        with stage_timer("rag", "search"), self.vector_index.reading() as vectorstore:
+            docs = vectorstore.similarity_search_by_vector(query_vector, k=fetch_k)
         if self.rerank_enabled and docs:
             reranker = EmbeddingRerankService(self.get_embeddings)
-            docs = reranker.rerank(question=question, docs=docs, top_k=top_k)
+            with stage_timer("rag", "rerank"):
+                docs = reranker.rerank(question=question, docs=docs, top_k=top_k, question_vector=query_vector)
         final_docs = docs[:top_k]
         elapsed_ms = (time.perf_counter() - started) * 1000
         logger.info(
@@ -213,27 +163,38 @@ class RagService:
         return final_docs
 
     def run_ingest(self, reset: bool):
-        with self._ingest_lock:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        with self.vector_index.ingest_lock(), provider_priority(BACKGROUND):
             files = self.collect_files()
             if not files:
                 raise ValueError("No supported files in data/")
-            if reset and self.chroma_dir.exists():
-                shutil.rmtree(self.chroma_dir)
-            docs, failed = self.load_documents(files)
+            with stage_timer("ingest", "load"):
+                docs, failed = self.load_documents(files)
             if not docs:
                 raise ValueError("No documents loaded.")
-            splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=150)
+            splitter = RecursiveCharacterTextSplitter(chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap)
             chunks = splitter.split_documents(docs)
-            vectorstore = Chroma.from_documents(
-                chunks,
-                embedding=self.get_embeddings(),
-                persist_directory=str(self.chroma_dir),
-                collection_name="rag",
-                client_settings=self._chroma_settings(),
-            )
-            self._vectorstore = vectorstore
+            self.vector_index.write(chunks, reset=reset)
             return {"files": len(files), "chunks": len(chunks), "failed": failed}
 
+    @staticmethod
+    def import_dependencies():
+        """Import the vector store, loaders and splitter ahead of the first ingest or chat."""
+        import chromadb  # noqa: F401
+        from langchain_community.document_loaders import PyPDFLoader, TextLoader  # noqa: F401
+        from langchain_community.vectorstores import Chroma  # noqa: F401
+        from langchain_text_splitters import RecursiveCharacterTextSplitter  # noqa: F401
+
+    def warm_vectorstore(self) -> bool:
+        if not self.has_index():
+            return False
+        self.get_vectorstore()
+        return True
+
+    def warm_agent(self):
+        self._agent_runner.warm_up()
+
     def answer_question(
         self,
         question: str,
@@ -242,12 +203,13 @@ class RagService:
         request_id: str | None = None,
     ):
         started = time.perf_counter()
-        answer, docs = self._agent_runner.answer(
-            question=question,
-            k=max(int(k), 1),
-            memory=memory or [],
-            request_id=request_id,
-        )
+        with stage_timer("rag", "answer"):
+            answer, docs = self._agent_runner.answer(
+                question=question,
+                k=max(int(k), 1),
+                memory=memory or [],
+                request_id=request_id,
+            )
         elapsed_ms = (time.perf_counter() - started) * 1000
         logger.info(
             "rag_answer_completed request_id=%s duration_ms=%.2f k=%s docs=%s memory_turns=%s",
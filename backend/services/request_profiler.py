@@ -0,0 +1,250 @@
+import json
+import logging
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROFILED_PATHS = ("/chat", "/ingest")
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+_SAFE_REQUEST_ID = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+
+
+_labels: dict = {}
+
+
+def code_label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        label = _labels[code] = f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+    return label
+
+
+class StackSampler:
+    """Samples every thread's Python stack at a fixed interval from a background thread.
+
+    This is wall-clock sampling: time blocked on sockets or locks shows up
+    too, which is usually what explains a slow request.
+    """
+
+    def __init__(self, interval_seconds: float, max_depth: int = 64):
+        self.interval_seconds = max(float(interval_seconds), 0.001)
+        self.max_depth = max_depth
+        self.samples: list[tuple[int, tuple[str, ...]]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(code_label(frame.f_code))
+                    frame = frame.f_back
+                self.samples.append((ident, tuple(reversed(stack))))
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> list[tuple[int, tuple[str, ...]]]:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+
+class ProfileSession:
+    def __init__(self, request_id: str, sampler: StackSampler, started_tracemalloc: bool, before):
+        self.request_id = request_id
+        self.sampler = sampler
+        self.started_tracemalloc = started_tracemalloc
+        self.before = before
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.started = time.perf_counter()
+
+
+class RequestProfiler:
+    """Admin-triggered or sampled profiling of /chat and /ingest requests.
+
+    A request is profiled when it carries the admin token in `X-Profile-Token`
+    or wins the `sample_rate` draw. Only one request is profiled at a time;
+    others run normally. Each profile is written to `artifact_dir` as a
+    folded-stack file (flamegraph/speedscope input) and a JSON summary with
+    the hottest frames and a tracemalloc diff, keyed by request id.
+    """
+
+    def __init__(
+        self,
+        artifact_dir: Path,
+        admin_token: str = "",
+        sample_rate: float = 0.0,
+        interval_ms: float = 5,
+        max_artifacts: int = 50,
+        trace_memory: bool = True,
+        logger=None,
+    ):
+        self.artifact_dir = Path(artifact_dir)
+        self.admin_token = admin_token or ""
+        self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+        self.interval_seconds = max(float(interval_ms), 1.0) / 1000
+        self.max_artifacts = max(int(max_artifacts), 1)
+        self.trace_memory = bool(trace_memory)
+        self.logger = logger or logging.getLogger(__name__)
+        self._active = threading.Lock()
+        self._stats = {"profiled": 0, "skipped_busy": 0, "failed": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.admin_token) or self.sample_rate > 0
+
+    def is_admin(self, token: str | None) -> bool:
+        return bool(self.admin_token) and bool(token) and secrets.compare_digest(token, self.admin_token)
+
+    def should_profile(self, path: str, token: str | None) -> bool:
+        if path not in PROFILED_PATHS:
+            return False
+        return self.is_admin(token) or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def begin(self, request_id: str) -> ProfileSession | None:
+        if not _SAFE_REQUEST_ID.match(request_id):
+            return None
+        if not self._active.acquire(blocking=False):
+            self._stats["skipped_busy"] += 1
+            return None
+        started_tracemalloc = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            # One frame is enough for the per-line diff and keeps tracing overhead down.
+            tracemalloc.start(1)
+        before = None
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+        sampler = StackSampler(self.interval_seconds)
+        sampler.start()
+        return ProfileSession(request_id, sampler, started_tracemalloc, before)
+
+    def finish(
+        self, session: ProfileSession, thread_ids: set[int], anchor: str | None, meta: dict
+    ) -> dict | None:
+        """Stop sampling and write the artifacts.
+
+        Samples are kept for threads that recorded timeline spans for this
+        request, and for any thread whose stack contains `anchor` (the
+        endpoint function); other threads are concurrent, unrelated work.
+        """
+        try:
+            duration_ms = (time.perf_counter() - session.started) * 1000
+            samples = session.sampler.stop()
+            memory = None
+            if session.before is not None:
+                after = tracemalloc.take_snapshot().filter_traces(
+                    (tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__))
+                )
+                memory = self._memory_diff(session.before, after, *tracemalloc.get_traced_memory())
+            if session.started_tracemalloc:
+                tracemalloc.stop()
+            kept = [
+                (ident, stack)
+                for ident, stack in samples
+                if (ident in thread_ids or anchor in stack) and not stack[-1].startswith("select (selectors.py")
+            ]
+            stacks = [stack for _, stack in kept]
+            summary = {
+                "request_id": session.request_id,
+                "started_at": session.started_at,
+                "duration_ms": round(duration_ms, 2),
+                "sample_interval_ms": round(self.interval_seconds * 1000, 2),
+                "samples": len(stacks),
+                "threads": len({ident for ident, _ in kept}),
+                "top_self": self._top(Counter(stack[-1] for stack in stacks)),
+                "top_cumulative": self._top(Counter(label for stack in stacks for label in set(stack))),
+                "memory": memory,
+                **meta,
+            }
+            self._write(session.request_id, summary, Counter(";".join(stack) for stack in stacks))
+            self._stats["profiled"] += 1
+            self.logger.info(
+                "request_profiled request_id=%s samples=%s duration_ms=%.2f",
+                session.request_id,
+                summary["samples"],
+                duration_ms,
+            )
+            return summary
+        except Exception:
+            self._stats["failed"] += 1
+            self.logger.exception("request_profile_failed request_id=%s", session.request_id)
+            return None
+        finally:
+            self._active.release()
+
+    def _top(self, counts: Counter, limit: int = 25) -> list[dict]:
+        interval_ms = self.interval_seconds * 1000
+        return [
+            {"frame": label, "samples": count, "approx_ms": round(count * interval_ms, 2)}
+            for label, count in counts.most_common(limit)
+        ]
+
+    @staticmethod
+    def _memory_diff(before, after, current_bytes: int, peak_bytes: int, limit: int = 25) -> dict:
+        stats = after.compare_to(before, "lineno")
+        return {
+            "traced_current_bytes": current_bytes,
+            "traced_peak_bytes": peak_bytes,
+            "net_bytes": sum(stat.size_diff for stat in stats),
+            "top_allocations": [
+                {
+                    "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+    def _write(self, request_id: str, summary: dict, folded: Counter):
+        self.artifact_dir.mkdir(parents=True, exist_ok=True)
+        folded_text = "".join(f"{stack} {count}\n" for stack, count in folded.most_common())
+        (self.artifact_dir / f"{request_id}.folded.txt").write_text(folded_text, encoding="utf-8")
+        (self.artifact_dir / f"{request_id}.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        summaries = sorted(self.artifact_dir.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        for stale in summaries[: max(len(summaries) - self.max_artifacts, 0)]:
+            stale.unlink(missing_ok=True)
+            stale.with_name(stale.name[: -len(".json")] + ".folded.txt").unlink(missing_ok=True)
+
+    def artifact_path(self, request_id: str, kind: str) -> Path | None:
+        if not _SAFE_REQUEST_ID.match(request_id) or kind not in {"json", "folded"}:
+            return None
+        suffix = ".json" if kind == "json" else ".folded.txt"
+        path = self.artifact_dir / f"{request_id}{suffix}"
+        return path if path.is_file() else None
+
+    def list_artifacts(self) -> list[dict]:
+        if not self.artifact_dir.exists():
+            return []
+        summaries = sorted(self.artifact_dir.glob("*.json"), key=lambda path: path.stat().st_mtime, reverse=True)
+        return [
+            {
+                "request_id": path.name[: -len(".json")],
+                "created_at": datetime.fromtimestamp(path.stat().st_mtime, timezone.utc).isoformat(),
+                "bytes": path.stat().st_size,
+            }
+            for path in summaries
+        ]
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "header_trigger": bool(self.admin_token),
+            "sample_rate": self.sample_rate,
+            "trace_memory": self.trace_memory,
+            "active": self._active.locked(),
+            **self._stats,
+        }
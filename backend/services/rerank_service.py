@@ -1,5 +1,7 @@
 import math
 
+from core.metrics import stage_timer
+
 
 class EmbeddingRerankService:
     def __init__(self, embedding_provider):
@@ -14,19 +16,24 @@ class EmbeddingRerankService:
             return -1.0
         return numerator / (denom_a * denom_b)
 
-    def rerank(self, question: str, docs, top_k: int):
+    def rerank(self, question: str, docs, top_k: int, question_vector=None):
         if not docs:
             return []
 
         embeddings = self.embedding_provider()
-        question_vec = embeddings.embed_query(question)
+        question_vec = question_vector
+        if question_vec is None:
+            with stage_timer("rerank", "embed_query"):
+                question_vec = embeddings.embed_query(question)
         doc_texts = [doc.page_content for doc in docs]
-        doc_vecs = embeddings.embed_documents(doc_texts)
+        with stage_timer("rerank", "embed_documents"):
+            doc_vecs = embeddings.embed_documents(doc_texts)
 
-        scored_docs = []
-        for doc, vector in zip(docs, doc_vecs):
-            score = self._cosine_similarity(question_vec, vector)
-            scored_docs.append((score, doc))
+        with stage_timer("rerank", "score"):
+            scored_docs = []
+            for doc, vector in zip(docs, doc_vecs):
+                score = self._cosine_similarity(question_vec, vector)
+                scored_docs.append((score, doc))
 
-        scored_docs.sort(key=lambda item: item[0], reverse=True)
+            scored_docs.sort(key=lambda item: item[0], reverse=True)
         return [doc for _, doc in scored_docs[:top_k]]
@@ -1,8 +1,13 @@
+import asyncio
+import base64
+import binascii
+import json
 import re
 
 from fastapi import HTTPException
 
-from repositories import session_repository
+from repositories import async_archive_repository, async_session_repository, session_repository
+from repositories.session_repository import MAX_ROWID
 
 
 class SessionService:
@@ -10,6 +15,12 @@ class SessionService:
     MEMORY_QUESTION_CHAR_LIMIT = 180
     MEMORY_ANSWER_CHAR_LIMIT = 280
     MEMORY_SENTENCE_LIMIT = 2
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    def __init__(self, message_writer=None, archive_dir=None):
+        self.message_writer = message_writer
+        self.archive_dir = archive_dir
 
     @classmethod
     def _compact_memory_text(
@@ -40,48 +51,154 @@ class SessionService:
         return session_repository.create_session_for_user(user_id, title)
 
     @staticmethod
-    def ensure_session_owner(session_id: int, user_id: int):
-        if not session_repository.session_belongs_to_user(session_id, user_id):
+    async def acreate_session_for_user(user_id: int, title: str) -> int:
+        return await async_session_repository.create_session_for_user(user_id, title)
+
+    @staticmethod
+    async def aensure_session_owner(session_id: int, user_id: int):
+        if not await async_session_repository.session_belongs_to_user(session_id, user_id):
             raise HTTPException(status_code=404, detail="Session not found")
 
+    @classmethod
+    def _compact_turn(cls, question: str, answer: str) -> dict[str, str]:
+        return {
+            "question": cls._compact_memory_text(
+                question,
+                char_limit=cls.MEMORY_QUESTION_CHAR_LIMIT,
+            ),
+            "answer": cls._compact_memory_text(
+                answer,
+                char_limit=cls.MEMORY_ANSWER_CHAR_LIMIT,
+                sentence_limit=cls.MEMORY_SENTENCE_LIMIT,
+            ),
+        }
+
+    def save_message(self, session_id: int, question: str, answer: str):
+        memory_turn = self._compact_turn(question, answer)
+        if self.message_writer is not None:
+            self.message_writer.submit(session_id, question, answer, memory_turn=memory_turn)
+            return
+        session_repository.save_message(
+            session_id,
+            question,
+            answer,
+            memory_turn=memory_turn,
+            memory_limit=self.MEMORY_TURN_LIMIT,
+        )
+
     @staticmethod
-    def save_message(session_id: int, question: str, answer: str):
-        session_repository.save_message(session_id, question, answer)
+    def _writes_pending():
+        # Reading now would serve memory or history without the turns the client was already answered for.
+        raise HTTPException(
+            status_code=503,
+            detail="Earlier messages in this session are still being saved. Retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+    def _wait_for_writes(self, session_id: int):
+        if self.message_writer is not None and not self.message_writer.wait_for_session(session_id):
+            self._writes_pending()
+
+    async def _await_writes(self, session_id: int):
+        if self.message_writer is not None and self.message_writer.has_pending(session_id):
+            if not await asyncio.to_thread(self.message_writer.wait_for_session, session_id):
+                self._writes_pending()
 
     @staticmethod
     def list_sessions(user_id: int):
         return session_repository.list_sessions_by_user(user_id)
 
+    @classmethod
+    def _page_size(cls, limit: int | None) -> int:
+        return max(1, min(limit or cls.DEFAULT_PAGE_SIZE, cls.MAX_PAGE_SIZE))
+
+    @staticmethod
+    def _split_page(rows, limit: int, cursor_for=lambda row: int(row["id"])):
+        # One extra row is fetched to learn whether another page exists.
+        items = list(rows[:limit])
+        next_cursor = cursor_for(items[-1]) if len(rows) > limit else None
+        return items, next_cursor
+
+    @staticmethod
+    def encode_session_cursor(row) -> str:
+        return base64.urlsafe_b64encode(f"{row['updated_at']}|{int(row['id'])}".encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_session_cursor(cursor: str) -> tuple[str, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            updated_at, session_id = raw.rsplit("|", 1)
+            return updated_at, int(session_id)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    @classmethod
+    async def alist_sessions_page(cls, user_id: int, cursor: str | None = None, limit: int | None = None):
+        limit = cls._page_size(limit)
+        after = cls.decode_session_cursor(cursor) if cursor else None
+        rows = await async_session_repository.list_sessions_page(user_id, after, limit + 1)
+        return cls._split_page(rows, limit, cls.encode_session_cursor)
+
     @staticmethod
     def list_messages(session_id: int):
         return session_repository.list_messages_by_session(session_id)
 
+    async def alist_messages_page(
+        self,
+        session_id: int,
+        user_id: int,
+        before_id: int | None = None,
+        limit: int | None = None,
+    ):
+        """Return one page of messages in chronological order plus the cursor for older ones."""
+        await self._await_writes(session_id)
+        limit = self._page_size(limit)
+        rows = list(await async_session_repository.list_messages_page(session_id, before_id, limit + 1))
+        if len(rows) <= limit and self.archive_dir is not None:
+            # Hot history is exhausted; archived messages are all older than any hot row.
+            if await async_archive_repository.get_archived_count(session_id):
+                bound = int(rows[-1]["id"]) if rows else (before_id or MAX_ROWID)
+                rows += await async_archive_repository.read_archived_messages(
+                    self.archive_dir, user_id, session_id, bound, limit + 1 - len(rows)
+                )
+        items, next_cursor = self._split_page(rows, limit)
+        items.reverse()
+        return items, next_cursor
+
     @classmethod
+    def _rebuild_chat_memory(cls, session_id: int) -> list[dict[str, str]]:
+        return session_repository.rebuild_session_memory(session_id, cls.MEMORY_TURN_LIMIT, cls._compact_turn)
+
     def build_chat_memory(
-        cls,
+        self,
         session_id: int,
+        user_id: int,
         limit: int = MEMORY_TURN_LIMIT,
     ) -> list[dict[str, str]]:
-        rows = session_repository.list_messages_by_session(session_id, limit=limit)
-        return [
-            {
-                "question": cls._compact_memory_text(
-                    row["question"],
-                    char_limit=cls.MEMORY_QUESTION_CHAR_LIMIT,
-                ),
-                "answer": cls._compact_memory_text(
-                    row["answer"],
-                    char_limit=cls.MEMORY_ANSWER_CHAR_LIMIT,
-                    sentence_limit=cls.MEMORY_SENTENCE_LIMIT,
-                ),
-            }
-            for row in rows
-        ]
+        """Return the session's rolling compact memory, checking ownership in the same read."""
+        # Read-your-writes: turns still queued for this session must land before memory is read.
+        self._wait_for_writes(session_id)
+        row = session_repository.get_session_memory(session_id, user_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        if row["memory_json"] is None:
+            # Sessions created before the rolling memory column are backfilled once.
+            memory = self._rebuild_chat_memory(session_id)
+        else:
+            try:
+                memory = json.loads(row["memory_json"])
+            except json.JSONDecodeError:
+                memory = self._rebuild_chat_memory(session_id)
+        return memory[-limit:] if limit > 0 else []
 
     @staticmethod
     def get_session(session_id: int):
         return session_repository.get_session_by_id(session_id)
 
+    @staticmethod
+    async def aget_session(session_id: int):
+        return await async_session_repository.get_session_by_id(session_id)
+
     @staticmethod
     def make_session_title(question: str) -> str:
         cleaned = " ".join(question.split()).strip()
@@ -0,0 +1,94 @@
+import threading
+import time
+from typing import Callable
+
+
+class StartupWarmup:
+    """Runs the first-request setup (imports, clients, vectorstore, agent) in a background thread.
+
+    Steps run in order and are timed individually; a step that returns False
+    is recorded as skipped (e.g. no index yet) and a step that raises is
+    recorded as failed without stopping the rest. `ready` turns true once every
+    step has run without failing, so a readiness probe can hold traffic until
+    then. The snapshot also carries the CPU time spent importing the app and
+    the latency of the first request per route, so cold-start cost stays
+    visible after startup.
+    """
+
+    FIRST_REQUEST_ROUTES_LIMIT = 32
+
+    def __init__(
+        self,
+        logger,
+        steps: list[tuple[str, Callable[[], object]]],
+        enabled: bool = True,
+        import_cpu_ms: float | None = None,
+    ):
+        self.logger = logger
+        self.steps = list(steps)
+        self.enabled = bool(enabled)
+        self.import_cpu_ms = import_cpu_ms
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._status = "disabled" if not self.enabled else "pending"
+        self._results: list[dict] = []
+        self._duration_ms: float | None = None
+        self._first_requests: dict[str, float] = {}
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @property
+    def ready(self) -> bool:
+        return self._status in {"ready", "disabled"}
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._status = "running"
+        self._thread = threading.Thread(target=self.run, name="startup-warmup", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def run(self):
+        started = time.perf_counter()
+        failed = False
+        for name, step in self.steps:
+            step_started = time.perf_counter()
+            result = {"name": name, "status": "ok", "error": None}
+            try:
+                if step() is False:
+                    result["status"] = "skipped"
+            except Exception as exc:
+                failed = True
+                result.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+                self.logger.warning("startup_warmup_step_failed step=%s error=%s", name, exc)
+            result["duration_ms"] = round((time.perf_counter() - step_started) * 1000, 2)
+            with self._lock:
+                self._results.append(result)
+        self._duration_ms = round((time.perf_counter() - started) * 1000, 2)
+        self._status = "failed" if failed else "ready"
+        self.logger.info("startup_warmup_finished status=%s duration_ms=%.2f", self._status, self._duration_ms)
+
+    def observe_request(self, route: str, elapsed_ms: float):
+        # Lock-free fast path: after the first hit on a route this is one dict lookup.
+        if route in self._first_requests or len(self._first_requests) >= self.FIRST_REQUEST_ROUTES_LIMIT:
+            return
+        with self._lock:
+            self._first_requests.setdefault(route, round(elapsed_ms, 2))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "status": self._status,
+                "ready": self.ready,
+                "import_cpu_ms": self.import_cpu_ms,
+                "warmup_ms": self._duration_ms,
+                "steps": [dict(result) for result in self._results],
+                "first_request_ms": dict(self._first_requests),
+            }
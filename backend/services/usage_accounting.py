@@ -0,0 +1,121 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from core.metrics import REGISTRY
+
+
+@dataclass(frozen=True)
+class TokenPricing:
+    """USD per million tokens; zero prices keep cost accounting at 0."""
+
+    prompt_per_1m: float = 0.0
+    completion_per_1m: float = 0.0
+    embedding_per_1m: float = 0.0
+
+
+TOKENS_TOTAL = REGISTRY.counter(
+    "provider_tokens_total",
+    "Tokens sent to or generated by providers, by token type.",
+    ("provider", "model", "type"),
+)
+PROVIDER_COST_TOTAL = REGISTRY.counter(
+    "provider_cost_usd_total",
+    "Estimated provider spend from configured per-token prices.",
+    ("provider", "type"),
+)
+ESTIMATED_CALLS_TOTAL = REGISTRY.counter(
+    "provider_usage_estimated_total",
+    "Provider calls whose token counts were estimated because the response carried no usage.",
+    ("provider", "operation"),
+)
+
+_pricing = TokenPricing()
+_current_usage: ContextVar["TokenUsage | None"] = ContextVar("token_usage", default=None)
+
+
+def configure_pricing(pricing: TokenPricing):
+    global _pricing
+    _pricing = pricing
+
+
+class TokenUsage:
+    """Token totals for one request or ingest job, filled in by provider calls on any thread."""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.embedding_tokens = 0
+        self.llm_calls = 0
+        self.embedding_calls = 0
+        self.estimated = False
+        self.cost_usd = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens + self.embedding_tokens
+
+    def add_llm(self, prompt_tokens: int, completion_tokens: int, cost_usd: float, estimated: bool):
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.llm_calls += 1
+            self.cost_usd += cost_usd
+            self.estimated = self.estimated or estimated
+
+    def add_embedding(self, tokens: int, cost_usd: float, estimated: bool):
+        with self._lock:
+            self.embedding_tokens += tokens
+            self.embedding_calls += 1
+            self.cost_usd += cost_usd
+            self.estimated = self.estimated or estimated
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "embedding_tokens": self.embedding_tokens,
+                "total_tokens": self.total_tokens,
+                "llm_calls": self.llm_calls,
+                "embedding_calls": self.embedding_calls,
+                "estimated": self.estimated,
+                "cost_usd": round(self.cost_usd, 6),
+            }
+
+
+@contextmanager
+def usage_scope():
+    """Attribute provider usage inside the block (including copied contexts) to a fresh TokenUsage."""
+    usage = TokenUsage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def record_llm_usage(provider: str, model: str, prompt_tokens: int, completion_tokens: int, estimated: bool = False):
+    prompt_cost = prompt_tokens * _pricing.prompt_per_1m / 1_000_000
+    completion_cost = completion_tokens * _pricing.completion_per_1m / 1_000_000
+    TOKENS_TOTAL.inc(prompt_tokens, provider=provider, model=model, type="prompt")
+    TOKENS_TOTAL.inc(completion_tokens, provider=provider, model=model, type="completion")
+    PROVIDER_COST_TOTAL.inc(prompt_cost + completion_cost, provider=provider, type="llm")
+    if estimated:
+        ESTIMATED_CALLS_TOTAL.inc(provider=provider, operation="llm")
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.add_llm(prompt_tokens, completion_tokens, prompt_cost + completion_cost, estimated)
+
+
+def record_embedding_usage(provider: str, model: str, tokens: int, estimated: bool = False):
+    cost = tokens * _pricing.embedding_per_1m / 1_000_000
+    TOKENS_TOTAL.inc(tokens, provider=provider, model=model, type="embedding")
+    PROVIDER_COST_TOTAL.inc(cost, provider=provider, type="embedding")
+    if estimated:
+        ESTIMATED_CALLS_TOTAL.inc(provider=provider, operation="embedding")
+    usage = _current_usage.get()
+    if usage is not None:
+        usage.add_embedding(tokens, cost, estimated)
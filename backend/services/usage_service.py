@@ -0,0 +1,164 @@
+import asyncio
+import queue
+import threading
+
+from fastapi import HTTPException
+
+from repositories import async_usage_repository, usage_repository
+from schemas.api import SessionUsage, TokenUsageResponse, UsageTotals, UserUsageResponse
+from services.usage_accounting import TokenUsage
+
+
+class UsageService:
+    """Persists per-request token usage and serves the per-user/session/job rollups.
+
+    Once started, `record` only queues the row and a background thread inserts
+    queued rows in batches, so a chat response never waits on a commit. The
+    rollup reads wait for queued rows first, and `stop` refuses new rows and
+    drains the queue. Before `start` (scripts), or when the queue is full, rows
+    are written inline.
+    """
+
+    BATCH_SIZE = 128
+
+    def __init__(self, logger=None, max_queue: int = 10000):
+        self.logger = logger
+        self._queue: queue.Queue = queue.Queue(maxsize=max(int(max_queue), 1))
+        self._cond = threading.Condition()
+        self._pending = 0
+        self._thread: threading.Thread | None = None
+        self._stopping = False
+        self._stats = {"queued": 0, "inline": 0, "written": 0, "failed": 0}
+
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="usage-writer", daemon=True)
+        self._thread.start()
+
+    def record(
+        self,
+        kind: str,
+        usage: TokenUsage,
+        request_id: str | None = None,
+        user_id: int | None = None,
+        session_id: int | None = None,
+        ingest_job_id: int | None = None,
+    ):
+        if not usage.llm_calls and not usage.embedding_calls:
+            return
+        row = usage_repository.usage_row(kind, usage.to_dict(), request_id, user_id, session_id, ingest_job_id)
+        with self._cond:
+            # Checked under the lock so no row is queued after `stop` has begun draining.
+            if self._thread is not None and not self._stopping:
+                try:
+                    self._queue.put_nowait(row)
+                    self._pending += 1
+                    self._stats["queued"] += 1
+                    return
+                except queue.Full:
+                    pass
+        self._write([row], inline=True)
+
+    def _write(self, rows: list[tuple], inline: bool = False):
+        try:
+            usage_repository.insert_usage_rows(rows)
+            written, failed = len(rows), 0
+        except Exception:
+            # Retry row by row so one bad row does not lose the rest of the batch.
+            written = failed = 0
+            for row in rows:
+                try:
+                    usage_repository.insert_usage_rows([row])
+                    written += 1
+                except Exception:
+                    failed += 1
+                    if self.logger is not None:
+                        self.logger.exception("usage_record_failed request_id=%s kind=%s", row[0], row[1])
+        with self._cond:
+            self._stats["inline" if inline else "written"] += written
+            self._stats["failed"] += failed
+
+    def _run(self):
+        while True:
+            try:
+                rows = [self._queue.get(timeout=0.2)]
+            except queue.Empty:
+                if self._stopping:
+                    return
+                continue
+            while len(rows) < self.BATCH_SIZE:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(rows)
+            with self._cond:
+                self._pending -= len(rows)
+                self._cond.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending <= 0, timeout)
+
+    def stop(self, timeout: float = 10.0):
+        with self._cond:
+            if self._thread is None:
+                return
+            self._stopping = True
+            thread = self._thread
+        thread.join(timeout)
+        if thread.is_alive() and self.logger is not None:
+            self.logger.error("usage_writer_stop_timeout pending=%s", self._pending)
+        with self._cond:
+            self._thread = None
+
+    async def _await_pending(self):
+        if self._pending:
+            await asyncio.to_thread(self.flush)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {"running": self._thread is not None, "queue_depth": self._queue.qsize(), **self._stats}
+
+    @staticmethod
+    def _totals(row) -> dict:
+        totals = {key: row[key] for key in row.keys()}
+        totals["total_tokens"] = totals["prompt_tokens"] + totals["completion_tokens"] + totals["embedding_tokens"]
+        totals["cost_usd"] = round(float(totals["cost_usd"]), 6)
+        return totals
+
+    async def aget_user_usage(self, user_id: int, limit: int = 50) -> UserUsageResponse:
+        await self._await_pending()
+        totals = await async_usage_repository.get_usage_totals_for_user(user_id)
+        sessions = await async_usage_repository.list_session_usage_for_user(user_id, limit)
+        return UserUsageResponse(
+            totals=UsageTotals(**self._totals(totals)),
+            sessions=[SessionUsage(**self._totals(row)) for row in sessions],
+        )
+
+    async def aget_request_usage(self, request_id: str, user_id: int) -> TokenUsageResponse:
+        await self._await_pending()
+        row = await async_usage_repository.get_usage_by_request(request_id)
+        if row is None or row["user_id"] != user_id:
+            raise HTTPException(status_code=404, detail="Usage not found")
+        return TokenUsageResponse(
+            **{key: row[key] for key in usage_repository.USAGE_COLUMNS if key != "estimated"},
+            estimated=bool(row["estimated"]),
+            total_tokens=row["prompt_tokens"] + row["completion_tokens"] + row["embedding_tokens"],
+        )
+
+    async def aget_ingest_job_usage(self, ingest_job_id: int) -> UsageTotals:
+        await self._await_pending()
+        return UsageTotals(**self._totals(await async_usage_repository.get_usage_totals_for_ingest_job(ingest_job_id)))
+
+    async def asummary(self) -> dict:
+        await self._await_pending()
+        by_kind = await async_usage_repository.list_usage_totals_by_kind()
+        top_users = await async_usage_repository.list_top_users_by_usage()
+        return {
+            "by_kind": {row["kind"]: self._totals(row) for row in by_kind},
+            "top_users": [self._totals(row) for row in top_users],
+        }
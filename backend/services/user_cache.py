@@ -0,0 +1,88 @@
+import threading
+import time
+from collections import OrderedDict
+
+from services.provider_health import LatencyTracker
+
+
+class UserIdentityCache:
+    """Bounded TTL cache of verified identities keyed by (user id, token signature).
+
+    Keying on the signature means a cached entry only ever answers for the exact
+    token that was verified against the database. Entries expire after
+    `ttl_seconds` or at the token's own expiry, whichever comes first, and
+    `invalidate_user` drops every entry for a user whose row changed.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 10000):
+        self.ttl_seconds = max(float(ttl_seconds), 0.0)
+        self.max_entries = max(int(max_entries), 1)
+        self._entries: OrderedDict[tuple[int, str], tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._hit_ms = LatencyTracker(window=1000)
+        self._miss_ms = LatencyTracker(window=1000)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def get(self, user_id: int, signature: str) -> dict | None:
+        if not self.enabled:
+            return None
+        key = (user_id, signature)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return dict(entry[1])
+
+    def put(self, user_id: int, signature: str, user: dict, token_expires_at: float | None = None):
+        if not self.enabled:
+            return
+        expires = time.monotonic() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires = min(expires, time.monotonic() + max(token_expires_at - time.time(), 0.0))
+        with self._lock:
+            self._entries[(user_id, signature)] = (expires, dict(user))
+            self._entries.move_to_end((user_id, signature))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+            self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def record_lookup(self, hit: bool, elapsed_ms: float):
+        (self._hit_ms if hit else self._miss_ms).record(elapsed_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            size = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        hit_p50 = self._hit_ms.percentile(50)
+        miss_p50 = self._miss_ms.percentile(50)
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl_seconds,
+            "size": size,
+            **stats,
+            "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            "hit_p50_ms": round(hit_p50, 3),
+            "miss_p50_ms": round(miss_p50, 3),
+            "estimated_saved_ms": round(max(miss_p50 - hit_p50, 0.0) * stats["hits"], 1),
+        }
@@ -0,0 +1,259 @@
+import logging
+import shutil
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from core.file_lock import InterProcessLock
+from core.metrics import REGISTRY, stage_timer
+from repositories import index_repository
+
+logger = logging.getLogger("rag_api.vector_index")
+
+INDEX_RELOADS_TOTAL = REGISTRY.counter(
+    "rag_index_reloads_total",
+    "Times this process reopened the vector index because another ingest published a new generation.",
+)
+
+
+@dataclass
+class _Segment:
+    name: str
+    directory: Path
+    lease: InterProcessLock
+    store: Any = None
+    users: int = 0
+
+
+class SegmentedStore:
+    """Read view over the segments one CURRENT manifest named; results are merged by distance."""
+
+    def __init__(self, token, segments: list[_Segment]):
+        self.token = token
+        self.segments = segments
+        self.readers = 0
+        self.retired = False
+
+    def similarity_search_by_vector(self, embedding: list[float], k: int = 4, **kwargs):
+        if len(self.segments) == 1:
+            return self.segments[0].store.similarity_search_by_vector(embedding, k=k, **kwargs)
+        scored = []
+        for segment in self.segments:
+            scored.extend(segment.store.similarity_search_by_vector_with_relevance_scores(embedding, k=k, **kwargs))
+        scored.sort(key=lambda item: item[1])
+        return [doc for doc, _distance in scored[:k]]
+
+
+class VectorIndex:
+    """The Chroma index under `root`, shared safely by every worker process on the host.
+
+    Ingests take a file lock, write a new segment directory and publish it by
+    swapping the CURRENT manifest (see `repositories.index_repository`). Each
+    retrieval stats the manifest and reopens when it changed, reusing segments
+    it already has open. A replaced view is closed, and its segment leases
+    released, once its last in-flight query finishes.
+    """
+
+    COLLECTION = "rag"
+    # Appends past this many segments first compact the index into one segment.
+    MAX_SEGMENTS = 4
+    COMPACT_BATCH_SIZE = 1000
+
+    def __init__(self, root: Path, embeddings_factory: Callable[[], object], anonymized_telemetry: bool = False):
+        self.root = Path(root)
+        self.embeddings_factory = embeddings_factory
+        self.anonymized_telemetry = bool(anonymized_telemetry)
+        self._open_lock = threading.Lock()
+        self._segments: dict[str, _Segment] = {}
+        self._view: SegmentedStore | None = None
+        self._view_root: Path | None = None
+        self._retired: list[SegmentedStore] = []
+
+    def _settings(self, directory: Path):
+        from chromadb.config import Settings as ChromaSettings
+
+        return ChromaSettings(
+            is_persistent=True,
+            persist_directory=str(directory),
+            anonymized_telemetry=self.anonymized_telemetry,
+        )
+
+    def _open_store(self, directory: Path):
+        from langchain_community.vectorstores import Chroma
+
+        return Chroma(
+            collection_name=self.COLLECTION,
+            persist_directory=str(directory),
+            client_settings=self._settings(directory),
+            embedding_function=self.embeddings_factory(),
+        )
+
+    def has_index(self) -> bool:
+        return bool(index_repository.segment_dirs(self.root))
+
+    def _is_current(self, token) -> bool:
+        return self._view is not None and self._view_root == self.root and token == self._view.token
+
+    def get(self) -> SegmentedStore:
+        token = index_repository.marker_token(self.root)
+        with self._open_lock:
+            if not self._is_current(token):
+                self._open(token)
+            return self._view
+
+    @contextmanager
+    def reading(self):
+        """Yield the current view; it stays open (and its segments leased) until the block exits."""
+        token = index_repository.marker_token(self.root)
+        with self._open_lock:
+            if not self._is_current(token):
+                self._open(token)
+            view = self._view
+            view.readers += 1
+        try:
+            yield view
+        finally:
+            with self._open_lock:
+                view.readers -= 1
+                if view.retired and view.readers == 0:
+                    self._retired.remove(view)
+                    self._drop(view)
+
+    def _open(self, token, reload: bool = True):
+        # Lease before opening, then confirm CURRENT did not move: any prune that starts later sees the leases.
+        while True:
+            directories = index_repository.segment_dirs(self.root)
+            if not directories:
+                raise RuntimeError("Vector index not found. Run ingest first.")
+            segments = [self._acquire_segment(name, directory) for name, directory in directories.items()]
+            latest = index_repository.marker_token(self.root)
+            if latest == token:
+                break
+            for segment in segments:
+                self._release_segment(segment)
+            token = latest
+        for segment in segments:
+            if segment.store is None:
+                segment.store = self._open_store(segment.directory)
+        if reload and self._view is not None:
+            INDEX_RELOADS_TOTAL.inc()
+            logger.info("rag_index_reopened segments=%s", ",".join(directories))
+        old, self._view, self._view_root = self._view, SegmentedStore(token, segments), self.root
+        if old is not None:
+            old.retired = True
+            if old.readers:
+                self._retired.append(old)
+            else:
+                self._drop(old)
+
+    def _acquire_segment(self, name: str, directory: Path) -> _Segment:
+        key = str(directory)
+        segment = self._segments.get(key)
+        if segment is None:
+            lease = index_repository.lease_segment(self.root, name)
+            segment = self._segments[key] = _Segment(name, directory, lease)
+        segment.users += 1
+        return segment
+
+    def _release_segment(self, segment: _Segment):
+        segment.users -= 1
+        if segment.users > 0:
+            return
+        self._segments.pop(str(segment.directory), None)
+        if segment.store is not None:
+            self._close_store(segment.store)
+        index_repository.release_lease(segment.lease)
+
+    def _drop(self, view: SegmentedStore):
+        for segment in view.segments:
+            self._release_segment(segment)
+
+    @staticmethod
+    def _close_store(store):
+        client = getattr(store, "_client", None)
+        try:
+            if client is not None and hasattr(client, "close"):
+                client.close()
+        except Exception:
+            logger.warning("rag_index_close_failed", exc_info=True)
+
+    @contextmanager
+    def ingest_lock(self):
+        with InterProcessLock(index_repository.lock_path(self.root)):
+            yield
+
+    def write(self, chunks: list, reset: bool):
+        """Index `chunks` as a new segment and publish it; call while holding `ingest_lock()`.
+
+        A reset publishes the new segment alone. An append publishes it after
+        the current segments, so it costs the new chunks rather than the whole
+        index; past MAX_SEGMENTS (or over a legacy index) the current segments
+        are first compacted into one.
+        """
+        from langchain_community.vectorstores import Chroma
+
+        current = [] if reset else list(index_repository.segment_dirs(self.root).items())
+        if len(current) >= self.MAX_SEGMENTS or any(name == index_repository.LEGACY_SEGMENT for name, _ in current):
+            with stage_timer("ingest", "compact_index"):
+                compacted = self._compact([directory for _, directory in current])
+            current = [(compacted.name, compacted)]
+        segment = index_repository.new_segment_dir(self.root)
+        try:
+            with stage_timer("ingest", "embed_and_index"):
+                store = Chroma.from_documents(
+                    chunks,
+                    embedding=self.embeddings_factory(),
+                    persist_directory=str(segment),
+                    collection_name=self.COLLECTION,
+                    client_settings=self._settings(segment),
+                )
+        except BaseException:
+            shutil.rmtree(segment, ignore_errors=True)
+            raise
+        names = [name for name, _ in current] + [segment.name]
+        index_repository.publish_segments(self.root, names)
+        with self._open_lock:
+            # Adopt the store just built, then drop this process's own stale leases before pruning.
+            self._acquire_segment(segment.name, segment).store = store
+            self._open(index_repository.marker_token(self.root), reload=False)
+            self._release_segment(self._segments[str(segment)])
+        index_repository.prune_segments(self.root, keep=set(names))
+        logger.info("rag_index_published segments=%s reset=%s", ",".join(names), reset)
+        return store
+
+    def _compact(self, directories: list[Path]) -> Path:
+        """Copy the oldest segment's files and add the other segments' stored vectors, without re-embedding."""
+        target = index_repository.new_segment_dir(self.root)
+        try:
+            index_repository.copy_segment(directories[0], target)
+            merged = self._open_store(target)
+            try:
+                for directory in directories[1:]:
+                    source = self._open_store(directory)
+                    try:
+                        rows = source.get(include=["embeddings", "documents", "metadatas"])
+                    finally:
+                        self._close_store(source)
+                    for start in range(0, len(rows["ids"]), self.COMPACT_BATCH_SIZE):
+                        end = start + self.COMPACT_BATCH_SIZE
+                        merged._collection.add(
+                            ids=rows["ids"][start:end],
+                            embeddings=rows["embeddings"][start:end],
+                            documents=rows["documents"][start:end],
+                            metadatas=rows["metadatas"][start:end],
+                        )
+            finally:
+                self._close_store(merged)
+        except BaseException:
+            shutil.rmtree(target, ignore_errors=True)
+            raise
+        return target
+
+    def close(self):
+        with self._open_lock:
+            for view in [*self._retired, self._view]:
+                if view is not None:
+                    self._drop(view)
+            self._retired, self._view = [], None
@@ -94,8 +94,23 @@ export async function me() {
   return handleResponse(res);
 }
 
-export async function listSessions() {
-  const res = await fetch(`${API_BASE}/sessions`, {
+function pageQuery({ cursor = null, beforeId = null, limit = null } = {}) {
+  const params = new URLSearchParams();
+  if (cursor != null) {
+    params.set("cursor", cursor);
+  }
+  if (beforeId != null) {
+    params.set("before_id", String(beforeId));
+  }
+  if (limit != null) {
+    params.set("limit", String(limit));
+  }
+  const query = params.toString();
+  return query ? `?${query}` : "";
+}
+
+export async function listSessions(page = {}) {
+  const res = await fetch(`${API_BASE}/sessions${pageQuery(page)}`, {
     headers: { ...getAuthHeaders() },
   });
   return handleResponse(res);
@@ -113,8 +128,8 @@ export async function createSession(title = "New chat") {
   return handleResponse(res);
 }
 
-export async function getSessionMessages(sessionId) {
-  const res = await fetch(`${API_BASE}/sessions/${sessionId}/messages`, {
+export async function getSessionMessages(sessionId, page = {}) {
+  const res = await fetch(`${API_BASE}/sessions/${sessionId}/messages${pageQuery(page)}`, {
     headers: { ...getAuthHeaders() },
   });
   return handleResponse(res);
@@ -22,7 +22,16 @@ function SourceList({ copy, sources }) {
   );
 }
 
-function MessageThread({ conversation, copy, loading, onPickPrompt, starterPrompts }) {
+function MessageThread({
+  conversation,
+  copy,
+  hasOlderMessages,
+  loading,
+  loadingMore,
+  onLoadOlder,
+  onPickPrompt,
+  starterPrompts,
+}) {
   const scrollKey = `${loading ? "loading" : "idle"}:${conversation
     .map((item) => `${item.id}:${item.pending ? "pending" : "ready"}`)
     .join("|")}`;
@@ -50,6 +59,11 @@ function MessageThread({ conversation, copy, loading, onPickPrompt, starterPromp
 
   return (
     <section ref={containerRef} className="messageList" onScroll={handleScroll}>
+      {hasOlderMessages ? (
+        <button className="button ghost compact loadMoreButton" onClick={onLoadOlder} disabled={loadingMore}>
+          {loadingMore ? copy.loadingOlder : copy.loadOlder}
+        </button>
+      ) : null}
       {conversation.map((item) => (
         <article key={item.id} className={`messageBubble ${item.role}`}>
           <div className="messageMeta">
@@ -97,8 +111,9 @@ function Composer({ copy, draft, loading, onChange, onSend }) {
 }
 
 export default function ChatPanel({ workspace }) {
-  const { activeSession, authUser, conversation, draft, loading, sources, starterPrompts } = workspace;
-  const { send, setDraft, setPrompt } = workspace.actions;
+  const { activeSession, authUser, conversation, draft, hasOlderMessages, loading, loadingMore, sources, starterPrompts } =
+    workspace;
+  const { loadOlderMessages, send, setDraft, setPrompt } = workspace.actions;
   const questionCount = conversation.filter((item) => item.role === "user").length;
   const { copy } = useLocale();
   const chatCopy = copy.chat;
@@ -148,7 +163,10 @@ export default function ChatPanel({ workspace }) {
       <MessageThread
         conversation={conversation}
         copy={chatCopy}
+        hasOlderMessages={hasOlderMessages}
         loading={loading}
+        loadingMore={loadingMore}
+        onLoadOlder={loadOlderMessages}
         onPickPrompt={setPrompt}
         starterPrompts={starterPrompts}
       />
@@ -46,8 +46,9 @@ function AuthCard({ authForm, authUser, onChange, onLogin, onLogout, onRegister
 }
 
 export default function WorkspaceSidebar({ workspace }) {
-  const { activeSessionId, authForm, authUser, ingesting, sessions, status } = workspace;
-  const { createSession, ingest, login, logout, openSession, register, updateAuthField } = workspace.actions;
+  const { activeSessionId, authForm, authUser, hasMoreSessions, ingesting, loadingMore, sessions, status } = workspace;
+  const { createSession, ingest, loadMoreSessions, login, logout, openSession, register, updateAuthField } =
+    workspace.actions;
   const { copy, locale, locales, setLocale } = useLocale();
   const sidebarCopy = copy.sidebar;
   const getSessionTitle = (title) => (title === "New chat" ? sidebarCopy.newChatTitle : title);
@@ -65,7 +66,7 @@ export default function WorkspaceSidebar({ workspace }) {
           </div>
           <div>
             <p className="metricLabel">{sidebarCopy.sessions}</p>
-            <strong>{authUser ? sessions.length : "--"}</strong>
+            <strong>{authUser ? `${sessions.length}${hasMoreSessions ? "+" : ""}` : "--"}</strong>
           </div>
         </div>
       </div>
@@ -130,6 +131,11 @@ export default function WorkspaceSidebar({ workspace }) {
                   <small>#{session.id}</small>
                 </button>
               ))}
+              {hasMoreSessions ? (
+                <button className="button ghost compact loadMoreButton" onClick={loadMoreSessions} disabled={loadingMore}>
+                  {loadingMore ? sidebarCopy.loadingMore : sidebarCopy.loadMore}
+                </button>
+              ) : null}
             </div>
           ) : (
             <p className="emptyNote">{sidebarCopy.emptySaved}</p>
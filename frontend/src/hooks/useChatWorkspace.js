@@ -1,4 +1,5 @@
 import { useEffect, useEffectEvent, useState } from "react";
+import { useHistoryPaging } from "./useHistoryPaging.js";
 import { useLocale } from "./useLocale.js";
 import {
   createChatSession,
@@ -23,17 +24,19 @@ export function useChatWorkspace() {
   const [status, setStatus] = useState(makeStatus(statusCopy.ready));
   const [authForm, setAuthForm] = useState({ username: "", password: "" });
   const [authUser, setAuthUser] = useState(null);
-  const [sessions, setSessions] = useState([]);
   const [activeSessionId, setActiveSessionId] = useState(null);
-  const [conversation, setConversation] = useState([]);
   const [sources, setSources] = useState([]);
   const [loading, setLoading] = useState(false);
   const [ingesting, setIngesting] = useState(false);
+  const paging = useHistoryPaging(activeSessionId, (error) =>
+    setStatus(makeStatus(statusCopy.failedToLoadMore(error.message), "error")),
+  );
+  const { conversation, sessions, setConversation, showConversation, showSessions } = paging;
 
   const openSession = useEffectEvent(async (sessionId, announce = true) => {
-    const nextConversation = await loadSessionConversation(sessionId);
+    const page = await loadSessionConversation(sessionId);
     setActiveSessionId(sessionId);
-    setConversation(nextConversation);
+    showConversation(page.conversation, page.nextCursor);
     setSources([]);
     if (announce) {
       setStatus(makeStatus(statusCopy.sessionLoaded, "success"));
@@ -49,8 +52,8 @@ export function useChatWorkspace() {
   };
 
   const refreshSessions = useEffectEvent(async (preferredSessionId = null) => {
-    const rows = await listChatSessions();
-    setSessions(rows);
+    const { sessions: rows, nextCursor } = await listChatSessions();
+    showSessions(rows, nextCursor);
 
     const fallbackId = preferredSessionId ?? activeSessionId ?? rows[0]?.id ?? null;
     if (fallbackId && rows.some((row) => row.id === fallbackId)) {
@@ -59,7 +62,7 @@ export function useChatWorkspace() {
     }
 
     setActiveSessionId(null);
-    setConversation([]);
+    showConversation([]);
     setSources([]);
   });
 
@@ -114,9 +117,9 @@ export function useChatWorkspace() {
   const handleLogout = () => {
     logoutUser();
     setAuthUser(null);
-    setSessions([]);
+    showSessions([]);
     setActiveSessionId(null);
-    setConversation([]);
+    showConversation([]);
     setSources([]);
     setStatus(makeStatus(statusCopy.signedOut));
   };
@@ -193,6 +196,7 @@ export function useChatWorkspace() {
     authUser,
     conversation,
     draft,
+    ...paging.state,
     ingesting,
     loading,
     sessions,
@@ -202,6 +206,7 @@ export function useChatWorkspace() {
     actions: {
       createSession: handleCreateSession,
       ingest: handleIngest,
+      ...paging.actions,
       login: handleLogin,
       logout: handleLogout,
       openSession: handleOpenSession,
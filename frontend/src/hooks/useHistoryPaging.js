@@ -0,0 +1,63 @@
+import { useState } from "react";
+import { listChatSessions, loadSessionConversation } from "../services/chatWorkspaceService";
+
+export function useHistoryPaging(activeSessionId, onError) {
+  const [sessions, setSessions] = useState([]);
+  const [sessionsCursor, setSessionsCursor] = useState(null);
+  const [conversation, setConversation] = useState([]);
+  const [conversationCursor, setConversationCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const showSessions = (rows, nextCursor = null) => {
+    setSessions(rows);
+    setSessionsCursor(nextCursor);
+  };
+
+  const showConversation = (messages, nextCursor = null) => {
+    setConversation(messages);
+    setConversationCursor(nextCursor);
+  };
+
+  const loadMore = async (load) => {
+    setLoadingMore(true);
+    try {
+      await load();
+    } catch (error) {
+      onError(error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const loadMoreSessions = () =>
+    loadMore(async () => {
+      const page = await listChatSessions(sessionsCursor);
+      // A session can move to the top between pages; keep its first appearance only.
+      setSessions((current) => [
+        ...current,
+        ...page.sessions.filter((row) => !current.some((session) => session.id === row.id)),
+      ]);
+      setSessionsCursor(page.nextCursor);
+    });
+
+  const loadOlderMessages = () =>
+    loadMore(async () => {
+      const page = await loadSessionConversation(activeSessionId, conversationCursor);
+      setConversation((current) => [...page.conversation, ...current]);
+      setConversationCursor(page.nextCursor);
+    });
+
+  return {
+    conversation,
+    sessions,
+    setConversation,
+    showConversation,
+    showSessions,
+    state: {
+      hasMoreSessions: sessionsCursor !== null,
+      hasOlderMessages: conversationCursor !== null,
+      loadingMore,
+    },
+    actions: { loadMoreSessions, loadOlderMessages },
+  };
+}
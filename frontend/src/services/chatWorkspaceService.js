@@ -15,13 +15,13 @@ import {
 function toMessagePair(row, index) {
   return [
     {
-      id: `q-${row.created_at || index}`,
+      id: `q-${row.id ?? row.created_at ?? index}`,
       role: "user",
       content: row.question,
       createdAt: row.created_at || null,
     },
     {
-      id: `a-${row.created_at || index}`,
+      id: `a-${row.id ?? row.created_at ?? index}`,
       role: "assistant",
       content: row.answer,
       createdAt: row.created_at || null,
@@ -45,13 +45,16 @@ export async function restoreAuthUser() {
   }
 }
 
-export async function listChatSessions() {
-  return listSessions();
+export async function listChatSessions(cursor = null) {
+  // Sessions come newest first; `nextCursor` is null once the last page has been read.
+  const page = await listSessions({ cursor });
+  return { sessions: page.items, nextCursor: page.next_cursor ?? null };
 }
 
-export async function loadSessionConversation(sessionId) {
-  const rows = await getSessionMessages(sessionId);
-  return mapSessionRowsToConversation(rows);
+export async function loadSessionConversation(sessionId, beforeId = null) {
+  // Each page holds older messages than the previous one, in chronological order.
+  const page = await getSessionMessages(sessionId, { beforeId });
+  return { conversation: mapSessionRowsToConversation(page.items), nextCursor: page.next_cursor ?? null };
 }
 
 export async function registerUser(username, password) {
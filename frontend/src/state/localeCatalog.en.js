@@ -20,6 +20,8 @@ export const enMessages = {
     assistantRole: "System",
     processing: "Processing",
     logged: "Logged",
+    loadOlder: "Load earlier messages",
+    loadingOlder: "Loading...",
     waiting: "Waiting for the model to finish the current reply...",
     composerTitle: "Prompt Draft",
     composerHint: "Enter sends / Shift+Enter adds a new line",
@@ -88,6 +90,8 @@ export const enMessages = {
     systemStatus: "System status",
     languageEyebrow: "Language",
     languageTitle: "Interface language",
+    loadMore: "Load more sessions",
+    loadingMore: "Loading...",
     sessionEntry: (id) => `Entry #${id}`,
     newChatTitle: "New chat",
   },
@@ -95,6 +99,7 @@ export const enMessages = {
     ready: "Ready to start.",
     sessionLoaded: "Session loaded.",
     failedToLoadSession: (message) => `Failed to load session: ${message}`,
+    failedToLoadMore: (message) => `Failed to load more: ${message}`,
     signedInAs: (username) => `Signed in as ${username}.`,
     credentialsRequired: "Username and password are required.",
     registerSuccess: "Registered successfully. Please sign in.",
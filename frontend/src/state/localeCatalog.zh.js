@@ -20,6 +20,8 @@ export const zhMessages = {
     assistantRole: "系统",
     processing: "处理中",
     logged: "已记录",
+    loadOlder: "加载更早的消息",
+    loadingOlder: "加载中...",
     waiting: "正在等待模型完成当前回复...",
     composerTitle: "问题草稿",
     composerHint: "Enter 发送 / Shift+Enter 换行",
@@ -88,6 +90,8 @@ export const zhMessages = {
     systemStatus: "系统状态",
     languageEyebrow: "语言",
     languageTitle: "界面语言",
+    loadMore: "加载更多会话",
+    loadingMore: "加载中...",
     sessionEntry: (id) => `记录 #${id}`,
     newChatTitle: "新对话",
   },
@@ -95,6 +99,7 @@ export const zhMessages = {
     ready: "准备就绪。",
     sessionLoaded: "会话已加载。",
     failedToLoadSession: (message) => `加载会话失败：${message}`,
+    failedToLoadMore: (message) => `加载更多失败：${message}`,
     signedInAs: (username) => `已登录为 ${username}。`,
     credentialsRequired: "请输入用户名和密码。",
     registerSuccess: "注册成功，请登录。",